@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import httpx
+
+# =============================
+# LOAD BENCHMARK
+# =============================
+# Boots server.app in-process, seeds a database and drives concurrent load at
+# the hot endpoints, reporting latency percentiles, throughput and RSS.
+#
+# By default the app runs against an in-memory Motor stand-in
+# (mongomock-motor, `pip install -r requirements-dev.txt`), which measures the
+# application's own overhead. Pass --mongo-url (or set BENCH_MONGO_URL) to use
+# a real mongod; the benchmark database is dropped before seeding.
+#
+# Run from the backend directory:
+#
+#     python benchmarks/load.py --students 500 --concurrency 20 --duration 10
+#     python benchmarks/load.py --json results.json
+#     python benchmarks/load.py --baseline results.json   # fail on p95 regressions
+#
+# Client and server share one process and event loop, so absolute numbers are
+# lower than a deployed server; compare runs made on the same machine.
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SCENARIOS = [
+    "login", "students_list", "student_profile", "student_notifications", "public_downloads", "file_download"
+]
+SEED_PASSWORD = "benchmark-password"
+DOWNLOAD_SIZE = 256 * 1024
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load benchmark for the TWOEM backend")
+    parser.add_argument("--mongo-url", default=os.environ.get("BENCH_MONGO_URL"),
+                        help="MongoDB URL (default: in-memory stand-in)")
+    parser.add_argument("--db-name", default="twoem_benchmark")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--downloads", type=int, default=20)
+    parser.add_argument("--notifications", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed p95 increase over the baseline (default 25%%)")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Must run before server is imported: it reads its settings at import time."""
+    os.environ["DB_NAME"] = args.db_name
+    os.environ.setdefault("BLOB_DIR", tempfile.mkdtemp(prefix="twoem-bench-"))
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+    else:
+        try:
+            import mongomock_motor
+        except ImportError:
+            sys.exit("mongomock-motor is not installed; install it or pass --mongo-url")
+        import motor.motor_asyncio
+        motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def rss_mb() -> Dict[str, float]:
+    current = None
+    try:
+        with open("/proc/self/statm") as statm:
+            current = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return {"current": round(current, 1) if current is not None else None, "peak": round(peak, 1)}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def seed(server, args) -> dict:
+    from server import (
+        AcademicRecord, DownloadFile, FinanceRecord, Notification, Student, User,
+        blob_store, calculate_average_score, db, hash_password, notification_recipients
+    )
+
+    await server.client.drop_database(args.db_name)
+    await server.create_indexes()
+    await server.create_default_admin()
+    admin = await db.users.find_one({"role": "admin"})
+
+    # One bcrypt hash shared by every seeded account keeps seeding fast
+    hashed_password = await hash_password(SEED_PASSWORD)
+    await db.users.update_one({"id": admin["id"]}, {"$set": {"hashed_password": hashed_password}})
+
+    users, students = [], []
+    for i in range(args.students):
+        user = User(username=f"bench{i}", role="student", hashed_password=hashed_password, is_first_login=False)
+        academic_record = AcademicRecord(**{
+            subject: random.randint(30, 100)
+            for subject in ("ms_word", "ms_excel", "ms_powerpoint", "ms_access", "computer_intro")
+        })
+        total_fees = 15000.0
+        paid_amount = float(random.choice([5000, 10000, 15000]))
+        students.append(Student(
+            user_id=user.id,
+            full_name=f"Benchmark Student {i}",
+            id_number=str(30000000 + i),
+            phone="0712345678",
+            academic_record=academic_record,
+            finance_record=FinanceRecord(
+                total_fees=total_fees,
+                paid_amount=paid_amount,
+                balance=total_fees - paid_amount,
+                is_cleared=paid_amount >= total_fees
+            ),
+            average_score=calculate_average_score(academic_record),
+            name_key=f"benchmark student {i}"
+        ).model_dump())
+        users.append(user.model_dump())
+    if users:
+        await db.users.insert_many(users)
+        await db.students.insert_many(students)
+
+    download_ids = []
+    for i in range(args.downloads):
+        blob = await blob_store.put(os.urandom(DOWNLOAD_SIZE))
+        download = DownloadFile(
+            title=f"Form {i}",
+            filename=f"form-{i}.pdf",
+            file_hash=blob.sha256,
+            file_size=blob.size,
+            file_type="public",
+            uploaded_by=admin["id"]
+        )
+        await db.downloads.insert_one(download.model_dump())
+        download_ids.append(download.id)
+
+    student_ids = [student["id"] for student in students]
+    notifications = []
+    for i in range(args.notifications):
+        targeted = bool(student_ids) and i % 3 == 0
+        target_ids = random.sample(student_ids, min(5, len(student_ids))) if targeted else []
+        notifications.append(Notification(
+            title=f"Notice {i}",
+            content="<p>Benchmark notification</p>",
+            target_audience="specific" if targeted else "all",
+            target_student_ids=target_ids,
+            recipients=notification_recipients("specific" if targeted else "all", target_ids),
+            created_by=admin["id"]
+        ).model_dump())
+    if notifications:
+        await db.notifications.insert_many(notifications)
+
+    return {"admin_username": admin["username"], "download_ids": download_ids}
+
+
+async def login(client: httpx.AsyncClient, username: str) -> str:
+    response = await client.post("/api/auth/login", json={"username": username, "password": SEED_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def build_scenarios(context: dict, args) -> Dict[str, Callable]:
+    admin_headers = {"Authorization": f"Bearer {context['admin_token']}"}
+    student_headers = [{"Authorization": f"Bearer {token}"} for token in context["student_tokens"]]
+
+    async def login_scenario(client):
+        username = f"bench{random.randrange(args.students)}"
+        return await client.post("/api/auth/login", json={"username": username, "password": SEED_PASSWORD})
+
+    async def students_list(client):
+        return await client.get("/api/admin/students", params={"limit": 100}, headers=admin_headers)
+
+    async def student_profile(client):
+        return await client.get("/api/student/profile", headers=random.choice(student_headers))
+
+    async def student_notifications(client):
+        return await client.get("/api/student/notifications", headers=random.choice(student_headers))
+
+    async def public_downloads(client):
+        return await client.get("/api/downloads")
+
+    async def file_download(client):
+        return await client.get(f"/api/downloads/{random.choice(context['download_ids'])}")
+
+    return {
+        "login": login_scenario,
+        "students_list": students_list,
+        "student_profile": student_profile,
+        "student_notifications": student_notifications,
+        "public_downloads": public_downloads,
+        "file_download": file_download,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, request, concurrency: int, duration: float) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started_at = time.perf_counter()
+            try:
+                response = await request(client)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started_at)
+            errors += failed
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "rss_mb": rss_mb(),
+    }
+
+
+def compare_with_baseline(results: dict, baseline_path: str, tolerance: float) -> List[str]:
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)["scenarios"]
+    regressions = []
+    for name, result in results["scenarios"].items():
+        previous = baseline.get(name)
+        if previous and previous["p95_ms"] and result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms vs {previous['p95_ms']} ms in baseline")
+    return regressions
+
+
+async def main(args) -> int:
+    import server
+
+    # server configures INFO logging; httpx would log every benchmark request
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    async with server.app.router.lifespan_context(server.app):
+        context = await seed(server, args)
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            context["admin_token"] = await login(client, context["admin_username"])
+            context["student_tokens"] = [
+                await login(client, f"bench{i}") for i in range(min(args.students, 20))
+            ]
+            scenarios = build_scenarios(context, args)
+
+            results = {
+                "config": {
+                    "backend": "mongod" if args.mongo_url else "in-memory",
+                    "students": args.students,
+                    "downloads": args.downloads,
+                    "notifications": args.notifications,
+                    "concurrency": args.concurrency,
+                    "duration_seconds": args.duration,
+                },
+                "scenarios": {},
+            }
+            print(f"{'scenario':<18}{'requests':>9}{'errors':>8}{'req/s':>9}"
+                  f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'RSS MB':>9}")
+            for name in args.scenarios:
+                if name == "file_download" and not context["download_ids"]:
+                    continue
+                result = await run_scenario(client, scenarios[name], args.concurrency, args.duration)
+                results["scenarios"][name] = result
+                print(f"{name:<18}{result['requests']:>9}{result['errors']:>8}{result['throughput_rps']:>9}"
+                      f"{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}{result['rss_mb']['current'] or '-':>9}")
+            print(f"Peak RSS: {rss_mb()['peak']} MB")
+
+    if args.json_path:
+        with open(args.json_path, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    configure_environment(arguments)
+    sys.exit(asyncio.run(main(arguments)))
@@ -0,0 +1,67 @@
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+# =============================
+# REPORTING BENCHMARK
+# =============================
+# Times the admin report pipeline (column extraction, academic and finance
+# reports) on synthetic student documents shaped like the projected query
+# results. Database time is not included.
+#
+# Run from the backend directory:
+#
+#     python benchmarks/reporting.py [student counts...]
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reporting import SUBJECTS, academic_report, finance_report, student_frame  # noqa: E402
+
+DEFAULT_COUNTS = [10000, 50000]
+
+
+def make_rows(count: int) -> List[dict]:
+    now = datetime.utcnow()
+    rows = []
+    for _ in range(count):
+        total_fees = 15000.0
+        paid_amount = float(random.choice([0, 5000, 10000, 15000]))
+        rows.append({
+            "created_at": now - timedelta(days=random.randint(0, 365)),
+            "academic_record": {
+                subject: random.randint(20, 100) if random.random() < 0.9 else None for subject in SUBJECTS
+            },
+            "finance_record": {
+                "total_fees": total_fees,
+                "paid_amount": paid_amount,
+                "balance": total_fees - paid_amount,
+                "is_cleared": paid_amount >= total_fees,
+                "last_payment_date": now - timedelta(days=random.randint(0, 200)) if paid_amount else None,
+            },
+            **({"certificate": {"file_hash": "ab" * 32}} if random.random() < 0.3 else {}),
+        })
+    return rows
+
+
+def timed(step):
+    started_at = time.perf_counter()
+    result = step()
+    return result, (time.perf_counter() - started_at) * 1000
+
+
+def main(counts: List[int]):
+    print(f"{'students':>9}{'frame ms':>10}{'academics ms':>14}{'finance ms':>12}{'total ms':>10}")
+    for count in counts:
+        rows = make_rows(count)
+        frame, frame_ms = timed(lambda: student_frame(rows))
+        _, academics_ms = timed(lambda: academic_report(frame))
+        _, finance_ms = timed(lambda: finance_report(frame))
+        total_ms = frame_ms + academics_ms + finance_ms
+        print(f"{count:>9}{frame_ms:>10.1f}{academics_ms:>14.1f}{finance_ms:>12.1f}{total_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
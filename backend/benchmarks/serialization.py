@@ -0,0 +1,99 @@
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+# =============================
+# SERIALIZATION BENCHMARK
+# =============================
+# Compares the ways a page of /api/admin/students can be encoded:
+#
+#   jsonable   response_model validation + stdlib json (FastAPI's default)
+#   orjson     response_model validation + ORJSONResponse
+#   adapter    TypeAdapter.dump_json straight from the models (current)
+#
+# Run from the backend directory:
+#
+#     python benchmarks/serialization.py [page sizes...]
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from server import (  # noqa: E402
+    STUDENT_LIST_ADAPTER,
+    AcademicRecord,
+    CertificateSummary,
+    FinanceRecord,
+    ParentContact,
+    StudentResponse,
+)
+
+DEFAULT_PAGE_SIZES = [100, 500]
+MIN_SECONDS = 1.0
+
+
+def make_students(count: int) -> List[StudentResponse]:
+    now = datetime.utcnow()
+    return [
+        StudentResponse(
+            id=str(uuid.uuid4()),
+            username=f"student{i}",
+            full_name=f"Student Number {i}",
+            id_number=str(30000000 + i),
+            email=f"student{i}@example.com",
+            phone="0712345678",
+            parent_contacts=ParentContact(father_name="Father", father_phone="0700000000"),
+            academic_record=AcademicRecord(ms_word=70, ms_excel=65, ms_powerpoint=80, ms_access=55, computer_intro=90),
+            finance_record=FinanceRecord(total_fees=15000, paid_amount=10000, balance=5000, last_payment_date=now),
+            certificate=CertificateSummary(filename="cert.pdf", size=123456, sha256="ab" * 32, uploaded_at=now),
+            has_certificate=True,
+            can_download_certificate=False,
+            average_score=72.0,
+        )
+        for i in range(count)
+    ]
+
+
+def measure(encode) -> float:
+    """Return encodes per second, running for at least MIN_SECONDS."""
+    iterations = 0
+    started_at = time.perf_counter()
+    while True:
+        encode()
+        iterations += 1
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= MIN_SECONDS:
+            return iterations / elapsed
+
+
+def main(page_sizes: List[int]):
+    field = create_response_field(name="response", type_=List[StudentResponse], mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def through_response_model(students, response_class):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=students))
+        return response_class(content).body
+
+    for page_size in page_sizes:
+        students = make_students(page_size)
+        results = {
+            "jsonable": measure(lambda: through_response_model(students, JSONResponse)),
+            "orjson": measure(lambda: through_response_model(students, ORJSONResponse)),
+            "adapter": measure(lambda: STUDENT_LIST_ADAPTER.dump_json(students)),
+        }
+        baseline = results["jsonable"]
+        print(f"{page_size} students per page ({len(STUDENT_LIST_ADAPTER.dump_json(students)) // 1024} KiB)")
+        for name, pages_per_second in results.items():
+            print(f"  {name:<9} {pages_per_second:8.1f} pages/s  {1000 / pages_per_second:7.2f} ms/page  "
+                  f"x{pages_per_second / baseline:.2f}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_PAGE_SIZES)
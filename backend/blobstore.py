@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from bson import ObjectId
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pydantic import BaseModel
+
+# =============================
+# BLOB STORAGE
+# =============================
+# File payloads live outside the Mongo documents. Blobs are addressed by the
+# SHA-256 of their content, so identical uploads are only ever stored once and
+# documents just keep the hash (plus size) as a reference.
+
+
+class StoredBlob(BaseModel):
+    sha256: str
+    size: int
+
+
+class BlobNotFound(Exception):
+    pass
+
+
+# Bytes read from storage per chunk when streaming a blob out
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobReader(ABC):
+    """An opened blob that can be streamed in fixed-size chunks."""
+
+    size: int
+
+    @abstractmethod
+    async def read(self, size: int) -> bytes:
+        ...
+
+    @abstractmethod
+    async def seek(self, offset: int):
+        ...
+
+    async def close(self):
+        pass
+
+    async def iter_range(self, start: int = 0, end: Optional[int] = None,
+                         chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        # Yields bytes [start, end) and always closes the reader afterwards
+        end = self.size if end is None else end
+        try:
+            await self.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = await self.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await self.close()
+
+
+class LocalBlobReader(BlobReader):
+    def __init__(self, handle, size: int):
+        self.handle = handle
+        self.size = size
+
+    async def read(self, size: int) -> bytes:
+        return await asyncio.to_thread(self.handle.read, size)
+
+    async def seek(self, offset: int):
+        await asyncio.to_thread(self.handle.seek, offset)
+
+    async def close(self):
+        await asyncio.to_thread(self.handle.close)
+
+
+class GridFSBlobReader(BlobReader):
+    def __init__(self, grid_out):
+        self.grid_out = grid_out
+        self.size = grid_out.length
+
+    async def read(self, size: int) -> bytes:
+        return await self.grid_out.read(size)
+
+    # Motor only wraps GridOut.seek/close synchronously, and both may kill the
+    # server-side chunk cursor, so they run off the event loop
+    async def seek(self, offset: int):
+        await asyncio.to_thread(self.grid_out.seek, offset)
+
+    async def close(self):
+        await asyncio.to_thread(self.grid_out.close)
+
+
+class BlobWriter(ABC):
+    """Receives a blob chunk by chunk, hashing it as it is written.
+
+    The blob only becomes visible under its hash on commit(); if the same
+    content is already stored the new copy is discarded.
+    """
+
+    def __init__(self):
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    async def write(self, chunk: bytes):
+        self.hasher.update(chunk)
+        self.size += len(chunk)
+        await self._write(chunk)
+
+    @abstractmethod
+    async def _write(self, chunk: bytes):
+        ...
+
+    @abstractmethod
+    async def commit(self) -> StoredBlob:
+        ...
+
+    @abstractmethod
+    async def abort(self):
+        ...
+
+
+class LocalBlobWriter(BlobWriter):
+    def __init__(self, store: "LocalBlobStore", handle, temp_path: Path):
+        super().__init__()
+        self.store = store
+        self.handle = handle
+        self.temp_path = temp_path
+
+    async def _write(self, chunk: bytes):
+        await asyncio.to_thread(self.handle.write, chunk)
+
+    async def commit(self) -> StoredBlob:
+        sha256 = self.hasher.hexdigest()
+        await asyncio.to_thread(self._finalize, self.store.path_for(sha256))
+        return StoredBlob(sha256=sha256, size=self.size)
+
+    async def abort(self):
+        await asyncio.to_thread(self._discard)
+
+    def _finalize(self, path: Path):
+        self.handle.close()
+        if path.is_file():
+            self.temp_path.unlink()
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.temp_path, path)
+
+    def _discard(self):
+        self.handle.close()
+        self.temp_path.unlink(missing_ok=True)
+
+
+class GridFSBlobWriter(BlobWriter):
+    def __init__(self, store: "GridFSBlobStore", grid_in, file_id: ObjectId):
+        super().__init__()
+        self.store = store
+        self.grid_in = grid_in
+        self.file_id = file_id
+
+    async def _write(self, chunk: bytes):
+        await self.grid_in.write(chunk)
+
+    async def commit(self) -> StoredBlob:
+        sha256 = self.hasher.hexdigest()
+        await self.grid_in.close()
+        if await self.store.exists(sha256):
+            await self.store.bucket.delete(self.file_id)
+        else:
+            await self.store.bucket.rename(self.file_id, sha256)
+        return StoredBlob(sha256=sha256, size=self.size)
+
+    async def abort(self):
+        await self.grid_in.abort()
+
+
+class BlobStore(ABC):
+    @abstractmethod
+    async def writer(self) -> BlobWriter:
+        ...
+
+    async def put(self, data: bytes) -> StoredBlob:
+        writer = await self.writer()
+        try:
+            await writer.write(data)
+        except BaseException:
+            await writer.abort()
+            raise
+        return await writer.commit()
+
+    @abstractmethod
+    async def get(self, sha256: str) -> bytes:
+        ...
+
+    @abstractmethod
+    async def exists(self, sha256: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def open(self, sha256: str) -> BlobReader:
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        # In-progress uploads live on the same filesystem so commit is a rename
+        self.temp_dir = self.root / "tmp"
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, sha256: str) -> Path:
+        # Fan out into two directory levels to keep directories small
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    async def exists(self, sha256: str) -> bool:
+        return await asyncio.to_thread(self.path_for(sha256).is_file)
+
+    async def writer(self) -> BlobWriter:
+        temp_path = self.temp_dir / f"{uuid.uuid4().hex}.tmp"
+        handle = await asyncio.to_thread(open, temp_path, "wb")
+        return LocalBlobWriter(self, handle, temp_path)
+
+    async def get(self, sha256: str) -> bytes:
+        try:
+            return await asyncio.to_thread(self.path_for(sha256).read_bytes)
+        except FileNotFoundError:
+            raise BlobNotFound(sha256)
+
+    async def open(self, sha256: str) -> BlobReader:
+        path = self.path_for(sha256)
+        try:
+            handle = await asyncio.to_thread(open, path, "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(sha256)
+        return LocalBlobReader(handle, os.fstat(handle.fileno()).st_size)
+
+
+class GridFSBlobStore(BlobStore):
+    def __init__(self, db, bucket_name: str = "blobs"):
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
+        self.files = db[f"{bucket_name}.files"]
+
+    async def exists(self, sha256: str) -> bool:
+        return await self.files.find_one({"filename": sha256}, {"_id": 1}) is not None
+
+    async def writer(self) -> BlobWriter:
+        # Uploaded under a temporary name and renamed to its hash on commit
+        file_id = ObjectId()
+        grid_in = self.bucket.open_upload_stream_with_id(file_id, f"tmp-{uuid.uuid4().hex}")
+        return GridFSBlobWriter(self, grid_in, file_id)
+
+    async def get(self, sha256: str) -> bytes:
+        reader = await self.open(sha256)
+        try:
+            return await reader.grid_out.read()
+        finally:
+            await reader.close()
+
+    async def open(self, sha256: str) -> BlobReader:
+        try:
+            grid_out = await self.bucket.open_download_stream_by_name(sha256)
+        except NoFile:
+            raise BlobNotFound(sha256)
+        return GridFSBlobReader(grid_out)
+
+
+def create_blob_store(backend: str, db, root: Path) -> BlobStore:
+    if backend == "local":
+        return LocalBlobStore(root)
+    if backend == "gridfs":
+        return GridFSBlobStore(db)
+    raise ValueError(f"Unknown blob storage backend: {backend}")
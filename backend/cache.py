@@ -0,0 +1,137 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# =============================
+# IN-PROCESS CACHES
+# =============================
+
+
+class CacheBackend(ABC):
+    """Minimal key/value interface so a shared cache can replace the local one."""
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any):
+        ...
+
+    @abstractmethod
+    def delete(self, key: Hashable):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+
+class TTLCache(CacheBackend):
+    """LRU cache whose entries also expire after a fixed time-to-live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class PrincipalCache:
+    """Authenticated users keyed by token subject and token version.
+
+    An entry only matches a token carrying the same token version, so a
+    version bump (password change, revocation) misses the cache even before
+    the entry is invalidated explicitly.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def get(self, username: str, token_version: int):
+        entry = self.backend.get(username)
+        if entry is None:
+            return None
+        cached_version, user = entry
+        return user if cached_version == token_version else None
+
+    def set(self, username: str, token_version: int, user):
+        self.backend.set(username, (token_version, user))
+
+    def invalidate(self, username: str):
+        self.backend.delete(username)
+
+
+class ResponseCache:
+    """Pre-serialized responses (body bytes and ETag) for read-heavy public endpoints.
+
+    Concurrent misses for the same key share a single build, so an
+    invalidation doesn't send a burst of identical queries to the database.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.pending: Dict[Hashable, asyncio.Future] = {}
+
+    async def get_or_build(self, key: Hashable, build: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.backend.get(key)
+        if value is not None:
+            return value
+        if key in self.pending:
+            return await asyncio.shield(self.pending[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        try:
+            value = await build()
+            self.backend.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as error:
+            future.set_exception(error)
+            # Mark retrieved so an unawaited failure isn't logged
+            future.exception()
+            raise
+        finally:
+            del self.pending[key]
+
+    def invalidate(self, key: Hashable):
+        self.backend.delete(key)
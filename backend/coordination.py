@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import os
+import socket
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+# =============================
+# CROSS-WORKER COORDINATION
+# =============================
+# With several worker processes (gunicorn/uvicorn --workers) each worker runs
+# the startup hooks and keeps its own in-process caches. Startup work is
+# serialised with a lease-based lock document, and cache invalidations are
+# broadcast to every worker through a small MongoDB collection.
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process in lock and invalidation documents
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Overlap between polls so clock skew between workers can't hide a document
+POLL_OVERLAP = timedelta(seconds=5)
+
+
+class LockNotAcquired(Exception):
+    pass
+
+
+class MongoLock:
+    """Lease-based mutex stored as a single document keyed by name.
+
+    The lease expires after `lease` seconds so a worker that dies while
+    holding the lock cannot block the others forever.
+    """
+
+    def __init__(self, collection, name: str, lease: float = 60.0):
+        self.collection = collection
+        self.name = name
+        self.lease = lease
+
+    async def try_acquire(self) -> bool:
+        now = datetime.utcnow()
+        try:
+            # Matches only a free (expired) lock; otherwise the upsert collides on _id
+            await self.collection.update_one(
+                {"_id": self.name, "expires_at": {"$lt": now}},
+                {"$set": {"owner": WORKER_ID, "acquired_at": now, "expires_at": now + timedelta(seconds=self.lease)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def acquire(self, timeout: float, poll_interval: float = 0.5):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not await self.try_acquire():
+            if asyncio.get_running_loop().time() >= deadline:
+                raise LockNotAcquired(f"Timed out waiting for lock {self.name}")
+            await asyncio.sleep(poll_interval)
+
+    async def release(self, completed: bool = True):
+        update = {"expires_at": datetime.utcnow()}
+        if completed:
+            update["completed_at"] = update["expires_at"]
+        await self.collection.update_one({"_id": self.name, "owner": WORKER_ID}, {"$set": update})
+
+    async def completed_since(self, since: datetime) -> bool:
+        doc = await self.collection.find_one({"_id": self.name}, {"completed_at": 1})
+        return bool(doc and doc.get("completed_at") and doc["completed_at"] >= since)
+
+    @asynccontextmanager
+    async def hold(self, timeout: float):
+        await self.acquire(timeout)
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            await self.release(completed)
+
+
+async def run_once(collection, name: str, task: Callable, timeout: float = 120.0, fresh_for: float = 300.0):
+    """Run an idempotent startup task in one worker at a time.
+
+    Workers that start while another holds the lock wait for it, then skip the
+    task if it completed within the last `fresh_for` seconds.
+    """
+    lock = MongoLock(collection, name, lease=timeout)
+    since = datetime.utcnow() - timedelta(seconds=fresh_for)
+    async with lock.hold(timeout):
+        if await lock.completed_since(since):
+            logger.info(f"Startup task {name} already completed by another worker")
+            return
+        await task()
+
+
+class WatermarkPoller:
+    """Reads the documents of a collection newer than a watermark.
+
+    The watermark is the newest `field` timestamp seen. Polls re-read from
+    POLL_OVERLAP before it, skipping documents already seen by _id. For
+    documents updated in place, pass dedupe=False and handle them
+    idempotently, since an update can keep the same timestamp (BSON dates
+    are millisecond precision). With `from_now`, the first poll only sets
+    the watermark; otherwise it reads the whole collection.
+    """
+
+    def __init__(self, collection, field: str = "created_at", from_now: bool = True, dedupe: bool = True):
+        self.collection = collection
+        self.field = field
+        self.from_now = from_now
+        self.dedupe = dedupe
+        self.watermark: Optional[datetime] = None
+        self.seen: Dict[object, datetime] = {}
+
+    def accept(self, doc: dict) -> bool:
+        """Record a document, also one received another way (a change stream); False if already seen."""
+        timestamp = doc[self.field]
+        if self.dedupe:
+            if doc["_id"] in self.seen:
+                return False
+            self.seen[doc["_id"]] = timestamp
+        if self.watermark is None or timestamp > self.watermark:
+            self.watermark = timestamp
+            # Anything older than the overlap can't be read again
+            since = self.watermark - POLL_OVERLAP
+            self.seen = {doc_id: seen_at for doc_id, seen_at in self.seen.items() if seen_at >= since}
+        return True
+
+    async def poll(self, projection: Optional[dict] = None) -> AsyncIterator[dict]:
+        if self.watermark is None and self.from_now:
+            self.watermark = datetime.utcnow()
+            return
+        query = {} if self.watermark is None else {self.field: {"$gte": self.watermark - POLL_OVERLAP}}
+        async for doc in self.collection.find(query, projection).sort([(self.field, 1), ("_id", 1)]):
+            if self.accept(doc):
+                yield doc
+
+
+class InvalidationBus:
+    """Broadcast cache invalidations to the other worker processes.
+
+    Messages are documents in a collection with a TTL index on created_at;
+    every worker polls for new ones and hands them to the channel handlers.
+    Messages published by this worker are skipped, since the publisher has
+    already invalidated its own cache.
+    """
+
+    def __init__(self, collection, poll_interval: float = 2.0):
+        self.collection = collection
+        self.poll_interval = poll_interval
+        self.handlers: Dict[str, List[Callable[[str], None]]] = {}
+        # Only messages published after this worker started are relevant
+        self.poller = WatermarkPoller(collection)
+        self.task: Optional[asyncio.Task] = None
+
+    def subscribe(self, channel: str, handler: Callable[[str], None]):
+        self.handlers.setdefault(channel, []).append(handler)
+
+    async def publish(self, channel: str, key: str = ""):
+        try:
+            await self.collection.insert_one({
+                "channel": channel,
+                "key": key,
+                "origin": WORKER_ID,
+                "created_at": datetime.utcnow()
+            })
+        except PyMongoError as error:
+            # Other workers fall back to their cache TTLs
+            logger.warning(f"Could not publish invalidation {channel}:{key}: {error}")
+
+    def _dispatch(self, message: dict):
+        for handler in self.handlers.get(message["channel"], []):
+            try:
+                handler(message["key"])
+            except Exception:
+                logger.exception(f"Invalidation handler for {message['channel']} failed")
+
+    async def refresh(self):
+        async for message in self.poller.poll():
+            if message["origin"] != WORKER_ID:
+                self._dispatch(message)
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except PyMongoError as error:
+                logger.warning(f"Invalidation poll failed: {error}")
+
+    async def start(self):
+        await self.refresh()
+        self.task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Hashable, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+# =============================
+# WRITE-BEHIND DOWNLOAD COUNTERS
+# =============================
+# Serving a download only bumps an in-memory counter. Increments are
+# coalesced per file and flushed with one bulk_write per collection on an
+# interval and at shutdown, so a popular file costs one update per flush
+# instead of one per download. Each flush also maintains a per-day series in
+# download_stats ({download_id, day, count}).
+
+logger = logging.getLogger(__name__)
+
+
+def day_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, moment.day)
+
+
+async def write_increments(collection, increments: Counter, operation: Callable[[Hashable, int], UpdateOne]) -> Counter:
+    """Apply increments with one unordered bulk_write; returns those that were not applied."""
+    keys = list(increments)
+    try:
+        await collection.bulk_write([operation(key, increments[key]) for key in keys], ordered=False)
+    except BulkWriteError as error:
+        # Unordered: every operation without a write error was applied, so only those are retried
+        failed = [keys[write_error["index"]] for write_error in error.details.get("writeErrors", [])]
+        logger.warning(f"{collection.name} flush failed for {len(failed)} of {len(keys)} updates: {error}")
+        return Counter({key: increments[key] for key in failed})
+    except PyMongoError as error:
+        logger.warning(f"{collection.name} flush failed: {error}")
+        return increments
+    return Counter()
+
+
+class DownloadCounter:
+    def __init__(self, downloads, download_stats, flush_interval: float = 10.0):
+        self.downloads = downloads
+        self.download_stats = download_stats
+        self.flush_interval = flush_interval
+        self.pending: Counter = Counter()
+        self.pending_daily: "Counter[Tuple[str, datetime]]" = Counter()
+        self.task: Optional[asyncio.Task] = None
+        self.flushing: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.flushed_increments = 0
+
+    def increment(self, download_id: str):
+        self.pending[download_id] += 1
+        self.pending_daily[(download_id, day_start(datetime.utcnow()))] += 1
+
+    async def flush(self):
+        # The batch is taken out of pending before it is written, so the write
+        # runs in its own task: cancelling the flush loop (stop()) must not drop it
+        self.flushing = asyncio.create_task(self._flush())
+        await asyncio.shield(self.flushing)
+
+    async def _flush(self):
+        pending, self.pending = self.pending, Counter()
+        pending_daily, self.pending_daily = self.pending_daily, Counter()
+
+        if pending:
+            unapplied = await write_increments(
+                self.downloads, pending,
+                lambda download_id, count: UpdateOne({"id": download_id}, {"$inc": {"download_count": count}})
+            )
+            # Keep failed increments, and their daily series, for the next flush
+            self.pending.update(unapplied)
+            for key in [key for key in pending_daily if key[0] in unapplied]:
+                self.pending_daily[key] += pending_daily.pop(key)
+            if len(unapplied) < len(pending):
+                self.flushes += 1
+                self.flushed_increments += sum(pending.values()) - sum(unapplied.values())
+
+        if pending_daily:
+            # download_count is already written; retrying only the series avoids double counting
+            self.pending_daily.update(await write_increments(
+                self.download_stats, pending_daily,
+                lambda key, count: UpdateOne({"download_id": key[0], "day": key[1]}, {"$inc": {"count": count}}, upsert=True)
+            ))
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        if self.flushing:
+            # Let a write the loop was waiting on finish before the final flush
+            await self.flushing
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "flush_interval_seconds": self.flush_interval,
+            "pending_files": len(self.pending),
+            "pending_increments": sum(self.pending.values()),
+            "flushes": self.flushes,
+            "flushed_increments": self.flushed_increments,
+        }
@@ -0,0 +1,264 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Set
+
+import orjson
+from bson import ObjectId
+from pydantic import BaseModel, Field
+from pymongo.errors import PyMongoError
+
+from coordination import WatermarkPoller
+
+# =============================
+# SERVER-SENT EVENTS
+# =============================
+# Events carry a list of topics ("admins", "students", "student:<id>") and are
+# fanned out to the connected SSE subscribers whose topics overlap. Where the
+# events come from is pluggable: LocalEventSource delivers within this
+# process, MongoEventSource writes them to a collection and every worker
+# reads them back from a change stream (or by polling on a standalone server).
+#
+# Event ids are ObjectId strings, so they sort by creation time and a client
+# reconnecting with Last-Event-ID is replayed whatever it missed.
+
+logger = logging.getLogger(__name__)
+
+# Sent to clients as the reconnection delay
+RETRY_MILLISECONDS = 5000
+
+
+class Event(BaseModel):
+    id: str = Field(default_factory=lambda: str(ObjectId()))
+    type: str
+    topics: List[str]
+    data: dict
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+def format_sse(event: Event) -> bytes:
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+        event.id.encode(), event.type.encode(), orjson.dumps(event.data)
+    )
+
+
+class EventSource(ABC):
+    """Publishes events and hands every event (from any worker) to `deliver`."""
+
+    @abstractmethod
+    async def start(self, deliver: Callable[[Event], None]):
+        ...
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def publish(self, event: Event):
+        ...
+
+    @abstractmethod
+    async def replay(self, topics: Set[str], after: str) -> List[Event]:
+        ...
+
+
+class LocalEventSource(EventSource):
+    """Single-process delivery; keeps the last `history` events for resumes."""
+
+    def __init__(self, history: int = 500):
+        self.history: deque = deque(maxlen=history)
+        self.deliver: Optional[Callable[[Event], None]] = None
+
+    async def start(self, deliver: Callable[[Event], None]):
+        self.deliver = deliver
+
+    async def publish(self, event: Event):
+        self.history.append(event)
+        if self.deliver:
+            self.deliver(event)
+
+    async def replay(self, topics: Set[str], after: str) -> List[Event]:
+        return [event for event in self.history if event.id > after and topics.intersection(event.topics)]
+
+
+class MongoEventSource(EventSource):
+    """Cross-worker delivery through a collection with a TTL index on created_at.
+
+    Every worker, including the publisher, receives events from a change
+    stream; on a standalone server (no change streams) it polls instead.
+    """
+
+    def __init__(self, collection, poll_interval: float = 1.0, replay_limit: int = 500):
+        self.collection = collection
+        self.poll_interval = poll_interval
+        self.replay_limit = replay_limit
+        self.deliver: Optional[Callable[[Event], None]] = None
+        self.poller = WatermarkPoller(collection)
+        self.task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _to_event(doc: dict) -> Event:
+        return Event(id=str(doc["_id"]), type=doc["type"], topics=doc["topics"], data=doc["data"],
+                     created_at=doc["created_at"])
+
+    async def publish(self, event: Event):
+        await self.collection.insert_one({
+            "_id": ObjectId(event.id),
+            **event.model_dump(exclude={"id"})
+        })
+
+    async def replay(self, topics: Set[str], after: str) -> List[Event]:
+        cursor = self.collection.find(
+            {"_id": {"$gt": ObjectId(after)}, "topics": {"$in": sorted(topics)}}
+        ).sort("_id", 1).limit(self.replay_limit)
+        return [self._to_event(doc) async for doc in cursor]
+
+    async def refresh(self):
+        async for doc in self.poller.poll():
+            self.deliver(self._to_event(doc))
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except PyMongoError as error:
+                logger.warning(f"Event poll failed: {error}")
+
+    async def _watch(self):
+        try:
+            async with self.collection.watch([{"$match": {"operationType": "insert"}}]) as stream:
+                # Catch anything written between startup and opening the stream
+                await self.refresh()
+                async for change in stream:
+                    if self.poller.accept(change["fullDocument"]):
+                        self.deliver(self._to_event(change["fullDocument"]))
+        except PyMongoError as error:
+            logger.warning(f"Event change stream unavailable, polling instead: {error}")
+            await self._poll()
+
+    async def start(self, deliver: Callable[[Event], None]):
+        self.deliver = deliver
+        await self.refresh()
+        self.task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+
+class Subscription:
+    def __init__(self, topics: Iterable[str], max_queued: int):
+        self.topics = set(topics)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)  # wake the stream up
+        except asyncio.QueueFull:
+            pass
+
+
+class EventBroker:
+    """Fans events out to this worker's connected SSE subscribers."""
+
+    def __init__(self, source: EventSource, max_queued: int = 100):
+        self.source = source
+        self.max_queued = max_queued
+        self.subscriptions: Set[Subscription] = set()
+        self.published = 0
+        self.delivered = 0
+        self.dropped_subscribers = 0
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(topics, self.max_queued)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+
+    def deliver(self, event: Event):
+        for subscription in list(self.subscriptions):
+            if not subscription.topics.intersection(event.topics):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                # Slow client: end its stream, it resumes from Last-Event-ID
+                self.dropped_subscribers += 1
+                self.unsubscribe(subscription)
+                subscription.closed = True
+
+    async def publish(self, event_type: str, topics: List[str], data: dict):
+        if not topics:
+            return
+        try:
+            await self.source.publish(Event(type=event_type, topics=topics, data=data))
+            self.published += 1
+        except PyMongoError as error:
+            # Clients still see the change on their next refresh
+            logger.warning(f"Could not publish {event_type} event: {error}")
+
+    async def stream(
+        self,
+        topics: Iterable[str],
+        last_event_id: Optional[str],
+        is_active: Callable[[], Awaitable[bool]],
+        heartbeat: float = 15.0
+    ) -> AsyncIterator[bytes]:
+        """SSE body for one client; ends when is_active() turns false.
+
+        is_active() is checked on every heartbeat and after every event, so a
+        busy stream still ends when its session expires or is revoked.
+        """
+        subscription = self.subscribe(topics)
+        try:
+            yield b"retry: %d\n\n" % RETRY_MILLISECONDS
+            replayed = set()
+            if last_event_id and ObjectId.is_valid(last_event_id):
+                for event in await self.source.replay(subscription.topics, last_event_id):
+                    replayed.add(event.id)
+                    yield format_sse(event)
+
+            while not subscription.closed:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    if not await is_active():
+                        break
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                if event.id not in replayed:
+                    yield format_sse(event)
+                if not await is_active():
+                    break
+        finally:
+            self.unsubscribe(subscription)
+
+    async def start(self):
+        await self.source.start(self.deliver)
+
+    async def stop(self):
+        for subscription in list(self.subscriptions):
+            subscription.close()
+        await self.source.stop()
+
+    def stats(self) -> dict:
+        return {
+            "source": type(self.source).__name__,
+            "subscribers": len(self.subscriptions),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
@@ -0,0 +1,166 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from blobstore import BlobNotFound, BlobStore
+
+# =============================
+# FILE DOWNLOAD RESPONSES
+# =============================
+# Files are piped from the blob store to the client in fixed-size chunks, so a
+# download never holds more than one chunk in memory and never touches a
+# temporary file. Blobs are content-addressed, so the hash doubles as a strong
+# ETag; together with Last-Modified this lets clients revalidate (304) and
+# resume interrupted downloads with Range requests (206).
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def http_date(value: datetime) -> str:
+    # Stored datetimes are naive UTC; HTTP dates have one-second resolution
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.replace(microsecond=0), usegmt=True)
+
+
+def parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison function
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        since = parse_http_date(if_modified_since)
+        if since is not None:
+            return parse_http_date(http_date(last_modified)) <= since
+    return False
+
+
+def if_range_matches(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # If-Range requires the strong comparison function
+        return if_range == etag
+    return last_modified is not None and if_range == http_date(last_modified)
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single byte range into [start, end).
+
+    Returns None when the header should be ignored (malformed or multiple
+    ranges) and raises HTTP 416 when the range cannot be satisfied.
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first, sep, last = ranges.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(0, size - length), size
+        else:
+            start = int(first)
+            end = int(last) + 1 if last else size
+            if start < 0 or (last and end <= start):
+                return None
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size)
+
+
+def counts_as_download(response: Response) -> bool:
+    # Revalidations and resumed transfers are not new downloads
+    if response.status_code == 200:
+        return True
+    return response.status_code == 206 and response.headers.get("content-range", "").startswith("bytes 0-")
+
+
+async def blob_response(
+    request: Request,
+    blob_store: BlobStore,
+    sha256: str,
+    filename: str,
+    media_type: str,
+    last_modified: Optional[datetime] = None
+) -> Response:
+    etag = f'"{sha256}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+    }
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        reader = await blob_store.open(sha256)
+    except BlobNotFound:
+        raise HTTPException(status_code=404, detail="File content not found")
+
+    headers["Content-Disposition"] = content_disposition(filename)
+    status_code = 200
+    start, end = 0, reader.size
+
+    range_header = request.headers.get("range")
+    if range_header and if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, reader.size)
+        except HTTPException:
+            await reader.close()
+            raise
+        if byte_range:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{reader.size}"
+
+    headers["Content-Length"] = str(end - start)
+    return StreamingResponse(
+        reader.iter_range(start, end),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
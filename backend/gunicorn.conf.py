@@ -0,0 +1,31 @@
+import multiprocessing
+import os
+
+# =============================
+# GUNICORN (multi-worker mode)
+# =============================
+# gunicorn -c gunicorn.conf.py server:app
+#
+# Each worker is a separate process with its own event loop, MongoDB client
+# and in-process caches. One-off startup work runs under a MongoDB lock and
+# cache invalidations are broadcast between workers (see coordination.py).
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Events published by one worker must reach clients connected to the others;
+# the workers are forked after this runs, so they inherit the setting
+if workers > 1:
+    os.environ.setdefault("EVENT_SOURCE", "mongo")
+
+# The app must not be imported before forking: the Motor client and the
+# bcrypt thread pool are per process.
+preload_app = False
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
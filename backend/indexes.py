@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+# =============================
+# INDEX REGISTRY
+# =============================
+# Every index the application relies on is declared here and created
+# idempotently at startup. Run from the backend directory to inspect a live
+# database:
+#
+#     python indexes.py report   # missing, unused and undeclared indexes
+#     python indexes.py apply    # create missing indexes
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSpec(BaseModel):
+    collection: str
+    keys: List[Tuple[str, int]]
+    unique: bool = False
+    expire_after_seconds: Optional[int] = None  # TTL index
+
+    @property
+    def name(self) -> str:
+        # Same naming scheme MongoDB uses for unnamed indexes
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+    def to_index_model(self) -> IndexModel:
+        options = {"name": self.name, "unique": self.unique}
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        return IndexModel(self.keys, **options)
+
+
+INDEXES = [
+    # Users: login / token subject lookups and id joins
+    IndexSpec(collection="users", keys=[("username", 1)], unique=True),
+    IndexSpec(collection="users", keys=[("id", 1)], unique=True),
+    IndexSpec(collection="users", keys=[("role", 1)]),
+
+    # Students: profile lookups plus the sort orders and filters of the admin listing
+    IndexSpec(collection="students", keys=[("id", 1)], unique=True),
+    IndexSpec(collection="students", keys=[("user_id", 1)], unique=True),
+    IndexSpec(collection="students", keys=[("created_at", 1), ("id", 1)]),
+    IndexSpec(collection="students", keys=[("name_key", 1), ("id", 1)]),
+    IndexSpec(collection="students", keys=[("finance_record.is_cleared", 1), ("created_at", 1), ("id", 1)]),
+    IndexSpec(collection="students", keys=[("average_score", 1)]),
+
+    IndexSpec(collection="downloads", keys=[("id", 1)], unique=True),
+    IndexSpec(collection="downloads", keys=[("is_active", 1), ("file_type", 1)]),
+    # Per-day download series: one document per file per day
+    IndexSpec(collection="download_stats", keys=[("download_id", 1), ("day", 1)], unique=True),
+    IndexSpec(collection="download_stats", keys=[("day", 1)]),
+
+    IndexSpec(collection="notifications", keys=[("id", 1)], unique=True),
+    # Student feed: multikey on recipients ("*" or student ids), newest first
+    IndexSpec(collection="notifications", keys=[("is_active", 1), ("recipients", 1), ("created_at", -1), ("id", -1)]),
+
+    # Read receipts; uniqueness keeps the unread counters exact
+    IndexSpec(collection="notification_reads", keys=[("student_id", 1), ("notification_id", 1)], unique=True),
+    IndexSpec(collection="notification_reads", keys=[("notification_id", 1)]),
+
+    IndexSpec(collection="student_resources", keys=[("id", 1)], unique=True),
+    IndexSpec(collection="student_resources", keys=[("is_active", 1)]),
+
+    IndexSpec(collection="password_resets", keys=[("id", 1)], unique=True),
+    IndexSpec(collection="password_resets", keys=[("status", 1)]),
+    IndexSpec(collection="password_resets", keys=[("student_username", 1), ("reset_code", 1), ("status", 1)]),
+
+    IndexSpec(collection="token_revocations", keys=[("username", 1)], unique=True),
+    IndexSpec(collection="token_revocations", keys=[("updated_at", 1)]),
+
+    # Cross-worker cache invalidation messages expire after an hour
+    IndexSpec(collection="cache_invalidations", keys=[("created_at", 1)], expire_after_seconds=3600),
+    # Server-sent events (EVENT_SOURCE=mongo): resumable for an hour
+    IndexSpec(collection="push_events", keys=[("created_at", 1)], expire_after_seconds=3600),
+    IndexSpec(collection="push_events", keys=[("topics", 1), ("_id", 1)]),
+    # Single-use SSE tickets are removed once expired
+    IndexSpec(collection="event_tickets", keys=[("expires_at", 1)], expire_after_seconds=0),
+
+    IndexSpec(collection="eulogies", keys=[("id", 1)], unique=True),
+    IndexSpec(collection="eulogies", keys=[("is_active", 1), ("expires_at", 1)]),
+]
+
+
+def indexes_by_collection(specs: List[IndexSpec]) -> Dict[str, List[IndexSpec]]:
+    grouped: Dict[str, List[IndexSpec]] = {}
+    for spec in specs:
+        grouped.setdefault(spec.collection, []).append(spec)
+    return grouped
+
+
+async def ensure_indexes(db, specs: List[IndexSpec] = INDEXES) -> List[str]:
+    """Create any missing registry index. Returns the names that failed."""
+    failed = []
+    for collection, collection_specs in indexes_by_collection(specs).items():
+        for spec in collection_specs:
+            try:
+                await db[collection].create_indexes([spec.to_index_model()])
+            except OperationFailure as error:
+                # e.g. duplicates blocking a unique index, or an existing index
+                # with the same keys but different options. Keep serving.
+                logger.error(f"Could not create index {collection}.{spec.name}: {error}")
+                failed.append(f"{collection}.{spec.name}")
+    return failed
+
+
+async def index_report(db, specs: List[IndexSpec] = INDEXES) -> Dict[str, list]:
+    """Compare the registry with the live database using $indexStats."""
+    report = {"missing": [], "unused": [], "undeclared": []}
+    grouped = indexes_by_collection(specs)
+    collections = set(grouped) | set(await db.list_collection_names())
+
+    for collection in sorted(collections):
+        declared = {tuple(spec.keys): spec for spec in grouped.get(collection, [])}
+        existing = await db[collection].index_information()
+        existing_keys = {
+            tuple((field, int(direction)) for field, direction in info["key"]): name
+            for name, info in existing.items()
+        }
+
+        for keys, spec in declared.items():
+            if keys not in existing_keys:
+                report["missing"].append(f"{collection}.{spec.name}")
+
+        for keys, name in existing_keys.items():
+            if name != "_id_" and keys not in declared:
+                report["undeclared"].append(f"{collection}.{name}")
+
+        if existing:
+            async for stats in db[collection].aggregate([{"$indexStats": {}}]):
+                if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0:
+                    since = stats["accesses"]["since"]
+                    report["unused"].append(f"{collection}.{stats['name']} (no ops since {since})")
+    return report
+
+
+async def main(command: str):
+    from server import client, db
+
+    if command == "apply":
+        failed = await ensure_indexes(db)
+        print("All indexes present" if not failed else f"Failed: {', '.join(failed)}")
+    elif command == "report":
+        report = await index_report(db)
+        for section in ("missing", "unused", "undeclared"):
+            print(f"{section.capitalize()} indexes:")
+            for entry in report[section] or ["(none)"]:
+                print(f"  {entry}")
+    else:
+        print("Usage: python indexes.py [report|apply]")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "report"))
@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import base64
+import logging
+
+from blobstore import LocalBlobStore
+
+# =============================
+# DATA MIGRATIONS
+# =============================
+# One-shot migrations for existing databases. Every step is idempotent, so the
+# script can be re-run safely. Run from the backend directory:
+#
+#     python migrations.py
+#
+# Inline files are deleted from the documents once copied to the blob store,
+# so with BLOB_BACKEND=local they are only moved when BLOB_DIR is on
+# persistent storage and --allow-local-blobs is passed.
+
+logger = logging.getLogger(__name__)
+
+# (collection, inline base64 field, blob hash field, blob size field)
+INLINE_FILE_FIELDS = [
+    ("downloads", "file_data", "file_hash", "file_size"),
+    ("eulogies", "file_data", "file_hash", "file_size"),
+    ("student_resources", "file_data", "file_hash", "file_size"),
+    ("notifications", "attachment_data", "attachment_hash", "attachment_size"),
+    ("students", "certificate.file_data", "certificate.file_hash", "certificate.file_size"),
+]
+
+
+def _get_path(doc: dict, dotted: str):
+    for part in dotted.split("."):
+        doc = doc[part]
+    return doc
+
+
+class UnsafeBlobStore(Exception):
+    pass
+
+
+async def migrate_inline_files(db, blob_store, allow_local: bool = False) -> int:
+    """Drain base64 payloads stored inside documents into the blob store."""
+    if isinstance(blob_store, LocalBlobStore) and not allow_local:
+        raise UnsafeBlobStore(
+            "Refusing to move inline files to a local blob store: the inline copies are "
+            "removed afterwards. Use BLOB_BACKEND=gridfs, or pass --allow-local-blobs "
+            "if BLOB_DIR is on persistent storage."
+        )
+
+    migrated = 0
+    for collection, data_field, hash_field, size_field in INLINE_FILE_FIELDS:
+        cursor = db[collection].find(
+            {data_field: {"$type": "string"}},
+            {"_id": 1, data_field: 1}
+        )
+        async for doc in cursor:
+            blob = await blob_store.put(base64.b64decode(_get_path(doc, data_field)))
+            await db[collection].update_one(
+                {"_id": doc["_id"]},
+                {"$set": {hash_field: blob.sha256, size_field: blob.size}, "$unset": {data_field: ""}}
+            )
+            migrated += 1
+
+        # Documents without a file (e.g. notifications without attachment) keep a null field
+        await db[collection].update_many({data_field: {"$exists": True, "$eq": None}}, {"$unset": {data_field: ""}})
+        logger.info(f"{collection}: inline file data migrated to blob store")
+    return migrated
+
+
+async def backfill_student_search_fields(db) -> int:
+    """Populate the denormalized fields used to filter and sort the student list."""
+    from server import AcademicRecord, calculate_average_score
+
+    updated = 0
+    cursor = db.students.find(
+        {"$or": [{"name_key": {"$exists": False}}, {"average_score": {"$exists": False}}]},
+        {"_id": 1, "full_name": 1, "academic_record": 1}
+    )
+    async for doc in cursor:
+        academic_record = doc.get("academic_record")
+        average_score = calculate_average_score(AcademicRecord(**academic_record)) if academic_record else None
+        await db.students.update_one(
+            {"_id": doc["_id"]},
+            {"$set": {"name_key": doc["full_name"].lower(), "average_score": average_score}}
+        )
+        updated += 1
+    return updated
+
+
+async def backfill_notification_recipients(db) -> int:
+    """Populate the recipients field the student notification feed is indexed on."""
+    from server import notification_recipients
+
+    updated = 0
+    cursor = db.notifications.find(
+        {"recipients": {"$exists": False}},
+        {"_id": 1, "target_audience": 1, "target_student_ids": 1}
+    )
+    async for doc in cursor:
+        recipients = notification_recipients(doc.get("target_audience", "all"), doc.get("target_student_ids", []))
+        await db.notifications.update_one({"_id": doc["_id"]}, {"$set": {"recipients": recipients}})
+        updated += 1
+    return updated
+
+
+async def rebuild_notification_counters(db) -> int:
+    """Recompute the unread counters from the notifications and read receipts."""
+    from server import ALL_COUNTER_ID, ALL_RECIPIENTS, student_counter_id
+
+    active_ids = await db.notifications.distinct("id", {"is_active": True})
+    counters = {ALL_COUNTER_ID: {"_id": ALL_COUNTER_ID, "count": await db.notifications.count_documents(
+        {"is_active": True, "recipients": ALL_RECIPIENTS}
+    )}}
+
+    def student_counter(student_id):
+        counter_id = student_counter_id(student_id)
+        return counters.setdefault(counter_id, {"_id": counter_id, "targeted": 0, "read": 0})
+
+    async for row in db.notifications.aggregate([
+        {"$match": {"is_active": True}},
+        {"$unwind": "$recipients"},
+        {"$match": {"recipients": {"$ne": ALL_RECIPIENTS}}},
+        {"$group": {"_id": "$recipients", "count": {"$sum": 1}}},
+    ]):
+        student_counter(row["_id"])["targeted"] = row["count"]
+    async for row in db.notification_reads.aggregate([
+        {"$match": {"notification_id": {"$in": active_ids}}},
+        {"$group": {"_id": "$student_id", "count": {"$sum": 1}}},
+    ]):
+        student_counter(row["_id"])["read"] = row["count"]
+
+    await db.notification_counters.delete_many({})
+    await db.notification_counters.insert_many(list(counters.values()))
+    return len(counters)
+
+
+async def run_all(allow_local_blobs: bool = False):
+    from server import blob_store, client, db
+
+    migrated = await migrate_inline_files(db, blob_store, allow_local=allow_local_blobs)
+    logger.info(f"Moved {migrated} inline files into the blob store")
+
+    backfilled = await backfill_student_search_fields(db)
+    logger.info(f"Backfilled search fields for {backfilled} students")
+
+    backfilled = await backfill_notification_recipients(db)
+    logger.info(f"Backfilled recipients for {backfilled} notifications")
+
+    rebuilt = await rebuild_notification_counters(db)
+    logger.info(f"Rebuilt {rebuilt} notification counters")
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the data migrations")
+    parser.add_argument("--allow-local-blobs", action="store_true",
+                        help="move inline files into BLOB_BACKEND=local (BLOB_DIR must be persistent)")
+    asyncio.run(run_all(parser.parse_args().allow_local_blobs))
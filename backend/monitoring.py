@@ -0,0 +1,550 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+import bson
+from bson import SON, json_util
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+# =============================
+# MONGODB POOL MONITORING
+# =============================
+# PyMongo calls listeners synchronously on the thread performing the
+# operation; with Motor that is one of its executor threads. Per-thread state
+# is kept in a threading.local and shared counters behind a lock.
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool metrics: how long operations wait for a connection.
+
+    Each wait is also recorded in the metrics' mongo_pool_wait histogram,
+    exported on /metrics.
+    """
+
+    def __init__(self, metrics: Optional["AppMetrics"] = None):
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.failures: Dict[str, int] = {}
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.pool_clears = 0
+
+    def _finish_wait(self) -> float:
+        started_at = getattr(self.local, "started_at", None)
+        self.local.started_at = None
+        return time.perf_counter() - started_at if started_at is not None else 0.0
+
+    def connection_check_out_started(self, event):
+        self.local.started_at = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = self._finish_wait()
+        with self.lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        if self.metrics:
+            self.metrics.mongo_pool_wait.observe(waited, "checked_out")
+
+    def connection_check_out_failed(self, event):
+        waited = self._finish_wait()
+        with self.lock:
+            self.failures[event.reason] = self.failures.get(event.reason, 0) + 1
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        if self.metrics:
+            self.metrics.mongo_pool_wait.observe(waited, "failed")
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self.lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self.lock:
+            self.connections_closed += 1
+
+    def pool_cleared(self, event):
+        with self.lock:
+            self.pool_clears += 1
+
+    # Remaining pool events are not tracked
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "checkout_failures": dict(self.failures),
+                "avg_wait_ms": round(self.total_wait_seconds * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "connections_open": self.connections_created - self.connections_closed,
+                "connections_created": self.connections_created,
+                "pool_clears": self.pool_clears,
+            }
+
+
+# =============================
+# REQUEST METRICS
+# =============================
+# MetricsMiddleware binds a RequestMetrics to a context variable for the
+# duration of each request. Motor copies the context into its executor
+# threads, so the command listener below can attribute every MongoDB round
+# trip to the request that issued it. Metrics are per process; with several
+# workers each scrape of /metrics reports the worker that served it
+# (labelled by pid).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Checkouts from an idle pool take microseconds; waits show up as the tail
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+current_request: ContextVar[Optional["RequestMetrics"]] = ContextVar("current_request", default=None)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *label_values):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...], labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labels = labels
+        # label values -> [bucket counts..., sum, count]
+        self.series: Dict[Tuple[str, ...], list] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for label_values, series in sorted(self.series.items()):
+                for index, bound in enumerate(self.buckets):
+                    labels = _format_labels(self.labels, label_values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {series[index]}")
+                labels = _format_labels(self.labels, label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {series[-2]}")
+                lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class RequestMetrics:
+    """What one request spent its time on; reported in Server-Timing."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.db_calls = 0
+        self.db_seconds = 0.0
+        self.db_sent_bytes = 0
+        self.db_received_bytes = 0
+        self.timings: Dict[str, float] = {}
+
+    def add_db_call(self, seconds: float, sent_bytes: int, received_bytes: int):
+        with self.lock:
+            self.db_calls += 1
+            self.db_seconds += seconds
+            self.db_sent_bytes += sent_bytes
+            self.db_received_bytes += received_bytes
+
+    def add_timing(self, name: str, seconds: float):
+        with self.lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def server_timing(self, total_seconds: float) -> str:
+        entries = [f"app;dur={total_seconds * 1000:.1f}"]
+        if self.db_calls:
+            entries.append(f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_calls} queries"')
+        for name, seconds in self.timings.items():
+            entries.append(f"{name};dur={seconds * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def record_timing(name: str, seconds: float):
+    """Attribute time spent on `name` (e.g. bcrypt) to the current request."""
+    request_metrics = current_request.get()
+    if request_metrics is not None:
+        request_metrics.add_timing(name, seconds)
+
+
+class AppMetrics:
+    def __init__(self):
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "HTTP request latency", LATENCY_BUCKETS, ("method", "route", "status"))
+        self.response_size = Histogram(
+            "http_response_size_bytes", "HTTP response body size", SIZE_BUCKETS, ("method", "route"))
+        self.request_db_calls = Histogram(
+            "http_request_mongo_commands", "MongoDB round trips per request", COUNT_BUCKETS, ("method", "route"))
+        self.request_db_bytes = Counter(
+            "http_request_mongo_bytes_total", "MongoDB bytes sent and received by requests (estimated from sampled commands)",
+            ("method", "route", "direction"))
+        self.mongo_command_duration = Histogram(
+            "mongo_command_duration_seconds", "MongoDB command latency", LATENCY_BUCKETS, ("command",))
+        self.mongo_command_failures = Counter(
+            "mongo_command_failures_total", "Failed MongoDB commands", ("command",))
+        self.mongo_pool_wait = Histogram(
+            "mongo_pool_wait_seconds", "Time spent waiting to check out a MongoDB connection",
+            POOL_WAIT_BUCKETS, ("outcome",))
+        self.event_loop_lag = Histogram(
+            "event_loop_lag_seconds", "Delay of a timer on the event loop beyond its deadline", LATENCY_BUCKETS)
+        self.max_event_loop_lag = 0.0
+        self.event_loop_task: Optional[asyncio.Task] = None
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float,
+                        response_bytes: int, request_metrics: RequestMetrics):
+        self.request_duration.observe(seconds, method, route, str(status))
+        self.response_size.observe(response_bytes, method, route)
+        self.request_db_calls.observe(request_metrics.db_calls, method, route)
+        self.request_db_bytes.inc(request_metrics.db_sent_bytes, method, route, "sent")
+        self.request_db_bytes.inc(request_metrics.db_received_bytes, method, route, "received")
+
+    def render(self) -> str:
+        lines = []
+        for metric in (
+            self.request_duration, self.response_size, self.request_db_calls, self.request_db_bytes,
+            self.mongo_command_duration, self.mongo_command_failures, self.mongo_pool_wait,
+            self.event_loop_lag,
+        ):
+            lines.extend(metric.render())
+        lines.append("# HELP event_loop_lag_max_seconds Largest event loop lag seen")
+        lines.append("# TYPE event_loop_lag_max_seconds gauge")
+        lines.append(f"event_loop_lag_max_seconds {self.max_event_loop_lag}")
+        lines.append("# HELP process_worker_pid Worker process serving this scrape")
+        lines.append("# TYPE process_worker_pid gauge")
+        lines.append(f"process_worker_pid {os.getpid()}")
+        return "\n".join(lines) + "\n"
+
+    async def _monitor_event_loop(self, interval: float):
+        # A blocked loop (bcrypt inline, large json encodes) delays this timer
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - expected)
+            self.event_loop_lag.observe(lag)
+            self.max_event_loop_lag = max(self.max_event_loop_lag, lag)
+
+    def start(self, interval: float = 0.5):
+        self.event_loop_task = asyncio.create_task(self._monitor_event_loop(interval))
+
+    async def stop(self):
+        if self.event_loop_task:
+            self.event_loop_task.cancel()
+            try:
+                await self.event_loop_task
+            except asyncio.CancelledError:
+                pass
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Attribute MongoDB round trips, time and bytes to the current request.
+
+    The driver doesn't report message sizes, and re-encoding every command and
+    reply costs as much as the driver's own encoding, so sizes are measured on
+    a `size_sample_rate` fraction of commands (0 disables it) and scaled up.
+    Byte totals are therefore estimates; round trips and times are exact.
+    """
+
+    def __init__(self, metrics: AppMetrics, size_sample_rate: float = 0.01):
+        self.metrics = metrics
+        self.size_sample_rate = size_sample_rate
+        self.local = threading.local()
+
+    def started(self, event):
+        self.local.sampled = self.size_sample_rate > 0 and random.random() < self.size_sample_rate
+        # Encoded size of the command as sent (approximately the wire size)
+        self.local.sent_bytes = self._scaled_size(event.command) if self.local.sampled else 0
+
+    def _scaled_size(self, document) -> int:
+        return round(len(bson.encode(document)) / self.size_sample_rate)
+
+    def _finish(self, event, received_bytes: int):
+        seconds = event.duration_micros / 1_000_000
+        sent_bytes = getattr(self.local, "sent_bytes", 0)
+        self.local.sent_bytes = 0
+        self.local.sampled = False
+        self.metrics.mongo_command_duration.observe(seconds, event.command_name)
+        request_metrics = current_request.get()
+        if request_metrics is not None:
+            request_metrics.add_db_call(seconds, sent_bytes, received_bytes)
+
+    def succeeded(self, event):
+        self._finish(event, self._scaled_size(event.reply) if getattr(self.local, "sampled", False) else 0)
+
+    def failed(self, event):
+        self.metrics.mongo_command_failures.inc(1, event.command_name)
+        self._finish(event, 0)
+
+
+class MetricsMiddleware:
+    def __init__(self, app, metrics: AppMetrics, excluded_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.metrics = metrics
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        request_metrics = RequestMetrics()
+        token = current_request.set(request_metrics)
+        started_at = time.perf_counter()
+        status = 500
+        response_bytes = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Handlers have finished by now, except for streamed bodies
+                server_timing = request_metrics.server_timing(time.perf_counter() - started_at)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", server_timing.encode("latin-1"))
+                ]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            current_request.reset(token)
+            # Label by route template so ids in paths don't create new series
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            self.metrics.observe_request(
+                scope["method"], route_label, status,
+                time.perf_counter() - started_at, response_bytes, request_metrics
+            )
+
+
+# =============================
+# SLOW OPERATION LOG
+# =============================
+# Logs every MongoDB command slower than a threshold with its collection,
+# filter, duration, documents returned and reply size. In explain mode the
+# first slow occurrence of each query shape is explained (queryPlanner) and
+# collection scans are flagged. Explains run on the event loop, never on the
+# listener's thread.
+
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "delete", "update", "findAndModify"}
+# Session and transport fields that must not be repeated inside an explain
+EXPLAIN_STRIP_FIELDS = {
+    "lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "autocommit",
+    "startTransaction", "readConcern", "writeConcern",
+}
+# Where each command keeps its filter (or pipeline / write statements)
+QUERY_FIELDS = ("filter", "query", "pipeline", "updates", "deletes")
+MAX_LOGGED_FILTER_CHARS = 500
+
+slow_logger = logging.getLogger("mongo.slow")
+
+
+def query_shape(value):
+    """Replace literal values with 1, keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in sorted(value.items())}
+    if isinstance(value, list):
+        return [query_shape(value[0])] if value else []
+    return 1
+
+
+def plan_stages(plan: dict):
+    yield plan.get("stage")
+    for child_key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(child_key), dict):
+            yield from plan_stages(plan[child_key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+def documents_returned(reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if "n" in reply:
+        return reply["n"]
+    return 1 if reply.get("value") is not None else 0
+
+
+class SlowOperationLog(monitoring.CommandListener):
+    def __init__(self, threshold_ms: float, explain: bool = False, keep: int = 100):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.lock = threading.Lock()
+        self.in_flight: Dict[Tuple, dict] = {}
+        self.recent: Deque[dict] = deque(maxlen=keep)
+        self.explained_shapes: set = set()
+        self.client = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self, client):
+        """Enable explain mode; needs the Motor client and the running loop."""
+        self.client = client
+        self.loop = asyncio.get_running_loop()
+
+    def started(self, event):
+        if event.command_name == "explain":
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        with self.lock:
+            self.in_flight[(event.connection_id, event.request_id)] = {
+                "command": command,
+                "collection": collection if isinstance(collection, str) else command.get("collection"),
+                "database": event.database_name,
+            }
+
+    def _pop(self, event) -> Optional[dict]:
+        with self.lock:
+            return self.in_flight.pop((event.connection_id, event.request_id), None)
+
+    def succeeded(self, event):
+        started = self._pop(event)
+        if started is None or event.duration_micros < self.threshold_ms * 1000:
+            return
+        self._record(event, started, documents_returned(event.reply), len(bson.encode(event.reply)))
+
+    def failed(self, event):
+        started = self._pop(event)
+        if started is not None and event.duration_micros >= self.threshold_ms * 1000:
+            self._record(event, started, 0, 0, failure=str(event.failure))
+
+    def _record(self, event, started: dict, docs: int, reply_bytes: int, failure: Optional[str] = None):
+        command = started["command"]
+        query = next((command[field] for field in QUERY_FIELDS if field in command), None)
+        entry = {
+            "command": event.command_name,
+            "collection": started["collection"],
+            "duration_ms": round(event.duration_micros / 1000, 1),
+            "docs": docs,
+            "reply_bytes": reply_bytes,
+            "filter": json_util.dumps(query)[:MAX_LOGGED_FILTER_CHARS] if query is not None else None,
+            "at": datetime.utcnow().isoformat(),
+        }
+        if failure:
+            entry["failure"] = failure
+        with self.lock:
+            self.recent.append(entry)
+        slow_logger.warning(
+            f"Slow MongoDB {entry['command']} on {entry['collection']}: {entry['duration_ms']} ms, "
+            f"{docs} docs, {reply_bytes} bytes, filter={entry['filter']}"
+        )
+
+        if self.explain and self.client is not None and event.command_name in EXPLAINABLE_COMMANDS:
+            shape = json_util.dumps([event.command_name, started["collection"], query_shape(query)])
+            with self.lock:
+                if shape in self.explained_shapes:
+                    return
+                self.explained_shapes.add(shape)
+            self.loop.call_soon_threadsafe(
+                lambda: asyncio.ensure_future(self._explain(started, entry))
+            )
+
+    async def _explain(self, started: dict, entry: dict):
+        command = SON((key, value) for key, value in started["command"].items() if key not in EXPLAIN_STRIP_FIELDS)
+        try:
+            result = await self.client[started["database"]].command(
+                {"explain": command, "verbosity": "queryPlanner"}
+            )
+        except PyMongoError as error:
+            slow_logger.info(f"Could not explain {entry['command']} on {entry['collection']}: {error}")
+            return
+
+        planner = result.get("queryPlanner") or {}
+        # Aggregations nest the planner under their $cursor stage
+        if not planner:
+            for stage in result.get("stages", []):
+                planner = stage.get("$cursor", {}).get("queryPlanner", {})
+                if planner:
+                    break
+        stages = [stage for stage in plan_stages(planner.get("winningPlan", {})) if stage]
+        entry["plan"] = stages
+        if "COLLSCAN" in stages:
+            entry["collection_scan"] = True
+            slow_logger.warning(
+                f"COLLSCAN: {entry['command']} on {entry['collection']} filter={entry['filter']} "
+                f"has no supporting index (plan: {' <- '.join(stages)})"
+            )
+        else:
+            slow_logger.info(f"Plan for slow {entry['command']} on {entry['collection']}: {' <- '.join(stages)}")
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "threshold_ms": self.threshold_ms,
+                "explain": self.explain,
+                "recent": list(self.recent)[-20:],
+            }
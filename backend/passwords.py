@@ -0,0 +1,76 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from monitoring import record_timing
+
+# =============================
+# PASSWORD HASHING
+# =============================
+# bcrypt is deliberately slow (~250 ms per call at cost 12). Running it inline
+# blocks the event loop for every other request, so hashing and verification
+# run on a small dedicated thread pool; bcrypt releases the GIL while it works.
+# A semaphore bounds concurrency so a login storm queues here instead of
+# starving the default executor that Motor also relies on.
+
+
+class PasswordHasher:
+    def __init__(self, max_workers: int, rounds: int):
+        self.max_workers = max_workers
+        self.rounds = rounds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self.semaphore = asyncio.Semaphore(max_workers)
+
+        # Metrics (only touched from the event loop thread)
+        self.waiting = 0
+        self.active = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed.decode('utf-8')
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(bcrypt.checkpw, password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    async def _run(self, fn, *args):
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        self.total_wait_seconds += started_at - queued_at
+        self.active += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            run_seconds = time.perf_counter() - started_at
+            self.active -= 1
+            self.completed += 1
+            self.total_run_seconds += run_seconds
+            self.semaphore.release()
+            record_timing("bcrypt", time.perf_counter() - queued_at)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "rounds": self.rounds,
+            "queue_depth": self.waiting,
+            "peak_queue_depth": self.peak_waiting,
+            "active": self.active,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.total_wait_seconds * 1000 / self.completed, 2) if self.completed else 0.0,
+            "avg_run_ms": round(self.total_run_seconds * 1000 / self.completed, 2) if self.completed else 0.0,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,157 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# =============================
+# REPORTING
+# =============================
+# Admin reports over every student. Only the academic and finance fields are
+# fetched (projected, in large cursor batches), turned into one column per
+# field, and aggregated with numpy/pandas instead of per-student Python
+# loops. Building the frame and the reports is CPU-bound, so callers run
+# those steps in a worker thread.
+
+SUBJECTS = ["ms_word", "ms_excel", "ms_powerpoint", "ms_access", "computer_intro"]
+
+# Average score needed for a certificate (see can_download_certificate)
+PASS_MARK = 60
+
+# Upper bounds (days since the last payment) of the fee ageing buckets
+AGEING_BUCKET_DAYS = (30, 60, 90)
+
+STUDENT_REPORT_PROJECTION = {
+    "_id": 0,
+    "created_at": 1,
+    "certificate.filename": 1,
+    **{f"academic_record.{subject}": 1 for subject in SUBJECTS},
+    "finance_record.total_fees": 1,
+    "finance_record.paid_amount": 1,
+    "finance_record.balance": 1,
+    "finance_record.is_cleared": 1,
+    "finance_record.last_payment_date": 1,
+}
+
+
+async def fetch_student_rows(collection, batch_size: int = 5000) -> List[dict]:
+    cursor = collection.find({}, STUDENT_REPORT_PROJECTION, batch_size=batch_size)
+    rows: List[dict] = []
+    while True:
+        batch = await cursor.to_list(batch_size)
+        if not batch:
+            return rows
+        rows.extend(batch)
+
+
+def student_frame(rows: List[dict]) -> pd.DataFrame:
+    """One row per student; missing scores are NaN and missing dates NaT."""
+    academic = [row.get("academic_record") or {} for row in rows]
+    finance = [row.get("finance_record") or {} for row in rows]
+
+    columns = {
+        subject: np.array([record.get(subject) for record in academic], dtype=float)
+        for subject in SUBJECTS
+    }
+    for field in ("total_fees", "paid_amount", "balance"):
+        columns[field] = np.array([record.get(field) or 0.0 for record in finance], dtype=float)
+    columns["is_cleared"] = np.array([bool(record.get("is_cleared")) for record in finance], dtype=bool)
+    columns["has_certificate"] = np.array([bool(row.get("certificate")) for row in rows], dtype=bool)
+    columns["last_payment_date"] = pd.to_datetime([record.get("last_payment_date") for record in finance])
+    columns["created_at"] = pd.to_datetime([row.get("created_at") for row in rows])
+    return pd.DataFrame(columns)
+
+
+def score_summary(scores: np.ndarray, pass_mark: float, edges: np.ndarray) -> dict:
+    graded = scores[~np.isnan(scores)]
+    counts, _ = np.histogram(graded, bins=edges)
+    distribution = [
+        {"range": f"{int(low)}-{int(high)}", "count": int(count)}
+        for low, high, count in zip(edges[:-1], edges[1:], counts)
+    ]
+    if not graded.size:
+        return {
+            "graded": 0, "mean": None, "median": None, "std": None, "p25": None, "p75": None,
+            "passed": 0, "pass_rate": None, "distribution": distribution,
+        }
+
+    p25, median, p75 = np.percentile(graded, [25, 50, 75])
+    passed = int(np.count_nonzero(graded >= pass_mark))
+    return {
+        "graded": int(graded.size),
+        "mean": round(float(graded.mean()), 2),
+        "median": round(float(median), 2),
+        "std": round(float(graded.std()), 2),
+        "p25": round(float(p25), 2),
+        "p75": round(float(p75), 2),
+        "passed": passed,
+        "pass_rate": round(passed / graded.size, 4),
+        "distribution": distribution,
+    }
+
+
+def academic_report(frame: pd.DataFrame, pass_mark: float = PASS_MARK, bin_width: int = 10) -> dict:
+    edges = np.arange(0, 100 + bin_width, bin_width, dtype=float)
+    scores = frame[SUBJECTS]
+    # Mean of the graded subjects, like calculate_average_score
+    averages = scores.mean(axis=1, skipna=True).to_numpy()
+    eligible = (averages >= pass_mark) & frame["is_cleared"].to_numpy()
+
+    return {
+        "students": len(frame),
+        "pass_mark": pass_mark,
+        "subjects": {
+            subject: score_summary(scores[subject].to_numpy(), pass_mark, edges) for subject in SUBJECTS
+        },
+        "average": score_summary(averages, pass_mark, edges),
+        "certificate_eligible": int(np.count_nonzero(eligible)),
+        "certificates_issued": int(np.count_nonzero(eligible & frame["has_certificate"].to_numpy())),
+    }
+
+
+def ageing_labels(bucket_days: Sequence[int]) -> List[str]:
+    bounds = [0, *bucket_days]
+    labels = [f"{low + 1 if low else 0}-{high}" for low, high in zip(bounds[:-1], bounds[1:])]
+    return labels + [f"{bucket_days[-1]}+"]
+
+
+def finance_report(
+    frame: pd.DataFrame,
+    now: Optional[datetime] = None,
+    bucket_days: Sequence[int] = AGEING_BUCKET_DAYS
+) -> dict:
+    now = now or datetime.utcnow()
+    balance = frame["balance"]
+    owing = frame[balance > 0]
+
+    # Age of each outstanding balance: days since the last payment, or since
+    # enrolment for students who have never paid
+    since = owing["last_payment_date"].fillna(owing["created_at"])
+    age_days = (pd.Timestamp(now) - since).dt.days
+    labels = ageing_labels(bucket_days)
+    buckets = pd.cut(age_days, bins=[-np.inf, *bucket_days, np.inf], labels=labels)
+    ageing = owing["balance"].groupby(buckets, observed=False).agg(["count", "sum"])
+
+    fees_billed = float(frame["total_fees"].sum())
+    fees_collected = float(frame["paid_amount"].sum())
+    return {
+        "students": len(frame),
+        "cleared_students": int(frame["is_cleared"].sum()),
+        "students_with_balance": len(owing),
+        "never_paid": int(((frame["paid_amount"] <= 0) & (frame["total_fees"] > 0)).sum()),
+        "fees_billed": round(fees_billed, 2),
+        "fees_collected": round(fees_collected, 2),
+        "fees_outstanding": round(float(owing["balance"].sum()), 2),
+        "credit_balance": round(float(balance[balance < 0].abs().sum()), 2),
+        "collection_rate": round(fees_collected / fees_billed, 4) if fees_billed else None,
+        "ageing": [
+            {"bucket": label, "students": int(ageing.loc[label, "count"]), "outstanding": round(float(ageing.loc[label, "sum"]), 2)}
+            for label in labels
+        ],
+    }
+
+
+def report_students(rows: List[dict]) -> Dict[str, dict]:
+    """Both reports from one fetch; meant for asyncio.to_thread."""
+    frame = student_frame(rows)
+    return {"academics": academic_report(frame), "finance": finance_report(frame)}
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from pymongo.errors import PyMongoError
+
+from coordination import WatermarkPoller
+
+# =============================
+# TOKEN REVOCATION
+# =============================
+# Access tokens carry the user's token version ("tv" claim). Bumping the
+# version (password change, reset, account deletion) revokes every older
+# token. Each process keeps a compact in-memory map of the minimum valid
+# version per username, so validating a token never needs a database read.
+#
+# The map is refreshed incrementally from the token_revocations collection:
+# either by polling updated_at, or from a change stream when the deployment
+# is a replica set.
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocations:
+    def __init__(self, collection, source: str = "poll", poll_interval: float = 5.0):
+        self.collection = collection
+        self.source = source
+        self.poll_interval = poll_interval
+        self.min_versions: Dict[str, int] = {}
+        # The first refresh loads every revocation; documents are updated in
+        # place and applying one twice is harmless
+        self.poller = WatermarkPoller(collection, field="updated_at", from_now=False, dedupe=False)
+        self.task: Optional[asyncio.Task] = None
+
+    def is_revoked(self, username: str, token_version: int) -> bool:
+        return token_version < self.min_versions.get(username, 0)
+
+    def min_version(self, username: str) -> int:
+        return self.min_versions.get(username, 0)
+
+    def _apply(self, doc: dict):
+        username = doc["username"]
+        self.min_versions[username] = max(self.min_versions.get(username, 0), doc["token_version"])
+
+    async def revoke(self, username: str, min_version: int):
+        """Reject every token for username older than min_version."""
+        now = datetime.utcnow()
+        self._apply({"username": username, "token_version": min_version})
+        await self.collection.update_one(
+            {"username": username},
+            {"$max": {"token_version": min_version}, "$set": {"updated_at": now}},
+            upsert=True
+        )
+
+    async def refresh(self):
+        async for doc in self.poller.poll({"username": 1, "token_version": 1, "updated_at": 1}):
+            self._apply(doc)
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except PyMongoError as error:
+                logger.warning(f"Token revocation refresh failed: {error}")
+
+    async def _watch(self):
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        while True:
+            try:
+                async with self.collection.watch(pipeline, full_document="updateLookup") as stream:
+                    # Catch anything written between the last refresh and opening the stream
+                    await self.refresh()
+                    async for change in stream:
+                        if change.get("fullDocument") and self.poller.accept(change["fullDocument"]):
+                            self._apply(change["fullDocument"])
+            except PyMongoError as error:
+                logger.warning(f"Token revocation change stream failed, polling instead: {error}")
+                await self._poll()
+
+    async def start(self):
+        await self.refresh()
+        self.task = asyncio.create_task(self._watch() if self.source == "change_stream" else self._poll())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
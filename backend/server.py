@@ -1,22 +1,42 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, Request, Response, Query
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import FileResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+import asyncio
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter
+from typing import List, Optional, Dict, Type
 import uuid
+import base64
+import hashlib
+import hmac
 from datetime import datetime, timedelta
 import jwt
-import bcrypt
-import base64
 import random
+import secrets
 import string
+import time
+import re
+import json
 from typing import Union
+from blobstore import create_blob_store
+from cache import PrincipalCache, ResponseCache, TTLCache
+from coordination import InvalidationBus, run_once
+from counters import DownloadCounter, day_start
+from events import EventBroker, LocalEventSource, MongoEventSource
+from file_responses import blob_response, content_disposition, counts_as_download, etag_matches
+from indexes import ensure_indexes
+from monitoring import AppMetrics, CommandMetrics, MetricsMiddleware, PoolMonitor, SlowOperationLog
+from passwords import PasswordHasher
+from reporting import PASS_MARK, SUBJECTS, fetch_student_rows, report_students
+from revocations import TokenRevocations
+from upload_pipeline import UploadSizeLimitMiddleware, store_upload
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -26,26 +46,146 @@ SECRET_KEY = "your-super-secret-jwt-key-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Password hashing: bcrypt cost factor and size of the hashing thread pool
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+password_hasher = PasswordHasher(max_workers=PASSWORD_HASH_WORKERS, rounds=BCRYPT_ROUNDS)
+
+# Authenticated users are cached briefly so each request doesn't re-read them
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', '60'))
+PRINCIPAL_CACHE_SIZE = int(os.environ.get('PRINCIPAL_CACHE_SIZE', '10000'))
+principal_cache_backend = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+principal_cache = PrincipalCache(principal_cache_backend)
+
+# Public listings (/api/downloads, /api/eulogies) are cached as serialized JSON;
+# browsers and CDNs may reuse them for PUBLIC_LISTING_MAX_AGE_SECONDS
+PUBLIC_LISTING_CACHE_TTL_SECONDS = float(os.environ.get('PUBLIC_LISTING_CACHE_TTL_SECONDS', '30'))
+PUBLIC_LISTING_MAX_AGE_SECONDS = int(os.environ.get('PUBLIC_LISTING_MAX_AGE_SECONDS', '60'))
+public_listing_cache_backend = TTLCache(maxsize=16, ttl=PUBLIC_LISTING_CACHE_TTL_SECONDS)
+public_listing_cache = ResponseCache(public_listing_cache_backend)
+
+# The admin dashboard aggregates are cached until a write invalidates them
+ADMIN_OVERVIEW_CACHE_TTL_SECONDS = float(os.environ.get('ADMIN_OVERVIEW_CACHE_TTL_SECONDS', '300'))
+admin_overview_cache_backend = TTLCache(maxsize=1, ttl=ADMIN_OVERVIEW_CACHE_TTL_SECONDS)
+admin_overview_cache = ResponseCache(admin_overview_cache_backend)
+
 # MongoDB connection
 mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'twoem_database')]
+DB_NAME = os.environ.get('DB_NAME', 'twoem_database')
+
+# Connection pool and wire compression (e.g. "zstd,snappy,zlib"; zstd and
+# snappy need the zstandard / python-snappy packages)
+MONGO_POOL_OPTIONS = {
+    "maxPoolSize": int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+    "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+    "maxIdleTimeMS": int(os.environ['MONGO_MAX_IDLE_TIME_MS']) if os.environ.get('MONGO_MAX_IDLE_TIME_MS') else None,
+    "waitQueueTimeoutMS": int(os.environ['MONGO_WAIT_QUEUE_TIMEOUT_MS']) if os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS') else None,
+}
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')
+if MONGO_COMPRESSORS:
+    MONGO_POOL_OPTIONS["compressors"] = MONGO_COMPRESSORS
+
+# Read preferences: the default for all traffic, and one for read-heavy
+# public listings that can tolerate slightly stale data from a secondary
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
+MONGO_PUBLIC_READ_PREFERENCE = os.environ.get('MONGO_PUBLIC_READ_PREFERENCE', 'secondaryPreferred')
+
+# Request, MongoDB and event loop metrics, served on /metrics. Set
+# METRICS_TOKEN to require "Authorization: Bearer <token>" for scrapes.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+app_metrics = AppMetrics()
+
+# MongoDB commands slower than SLOW_OP_THRESHOLD_MS are logged ("mongo.slow"
+# logger). SLOW_OP_EXPLAIN=true also explains the first slow occurrence of
+# each query shape and flags collection scans (debugging only).
+SLOW_OP_THRESHOLD_MS = float(os.environ.get('SLOW_OP_THRESHOLD_MS', '100'))
+SLOW_OP_EXPLAIN = os.environ.get('SLOW_OP_EXPLAIN', 'false').lower() == 'true'
+slow_op_log = SlowOperationLog(threshold_ms=SLOW_OP_THRESHOLD_MS, explain=SLOW_OP_EXPLAIN)
+
+# Fraction of MongoDB commands whose encoded size is measured for the
+# per-request byte metrics (0 turns the measurement off)
+MONGO_COMMAND_SIZE_SAMPLE_RATE = float(os.environ.get('MONGO_COMMAND_SIZE_SAMPLE_RATE', '0.01'))
+
+pool_monitor = PoolMonitor(app_metrics)
+client = AsyncIOMotorClient(
+    mongo_url,
+    event_listeners=[pool_monitor, CommandMetrics(app_metrics, size_sample_rate=MONGO_COMMAND_SIZE_SAMPLE_RATE), slow_op_log],
+    readPreference=MONGO_READ_PREFERENCE,
+    **{option: value for option, value in MONGO_POOL_OPTIONS.items() if value is not None}
+)
+db = client[DB_NAME]
+public_db = client.get_database(DB_NAME, read_preference=READ_PREFERENCES[MONGO_PUBLIC_READ_PREFERENCE])
+
+# Token revocation map refresh: "poll" or "change_stream" (replica sets only)
+TOKEN_REVOCATION_SOURCE = os.environ.get('TOKEN_REVOCATION_SOURCE', 'poll')
+TOKEN_REVOCATION_POLL_SECONDS = float(os.environ.get('TOKEN_REVOCATION_POLL_SECONDS', '5'))
+token_revocations = TokenRevocations(
+    db.token_revocations,
+    source=TOKEN_REVOCATION_SOURCE,
+    poll_interval=TOKEN_REVOCATION_POLL_SECONDS
+)
 
-# Create the main app without a prefix
-app = FastAPI()
+# Cache invalidations are broadcast to the other worker processes
+CACHE_INVALIDATION_POLL_SECONDS = float(os.environ.get('CACHE_INVALIDATION_POLL_SECONDS', '2'))
+# Admin reports scan every student; the computed reports are reused for a while
+REPORT_CACHE_TTL_SECONDS = float(os.environ.get('REPORT_CACHE_TTL_SECONDS', '60'))
+REPORT_BATCH_SIZE = int(os.environ.get('REPORT_BATCH_SIZE', '5000'))
+report_cache_backend = TTLCache(maxsize=1, ttl=REPORT_CACHE_TTL_SECONDS)
+report_cache = ResponseCache(report_cache_backend)
+
+invalidation_bus = InvalidationBus(db.cache_invalidations, poll_interval=CACHE_INVALIDATION_POLL_SECONDS)
+invalidation_bus.subscribe("principal", principal_cache.invalidate)
+invalidation_bus.subscribe("public_listing", public_listing_cache.invalidate)
+invalidation_bus.subscribe("admin_overview", admin_overview_cache.invalidate)
+
+# Download counts are aggregated in memory and flushed in batches
+DOWNLOAD_COUNTER_FLUSH_SECONDS = float(os.environ.get('DOWNLOAD_COUNTER_FLUSH_SECONDS', '10'))
+download_counter = DownloadCounter(db.downloads, db.download_stats, flush_interval=DOWNLOAD_COUNTER_FLUSH_SECONDS)
+
+# Server-sent events: "local" (single worker) or "mongo" (shared by all workers
+# through the push_events collection; change stream, else polling)
+EVENT_SOURCE = os.environ.get('EVENT_SOURCE', 'local')
+EVENT_POLL_SECONDS = float(os.environ.get('EVENT_POLL_SECONDS', '1'))
+EVENT_HEARTBEAT_SECONDS = float(os.environ.get('EVENT_HEARTBEAT_SECONDS', '15'))
+# EventSource cannot send headers, so streams are opened with a single-use
+# ticket instead of the session token (which would end up in access logs)
+EVENT_TICKET_TTL_SECONDS = int(os.environ.get('EVENT_TICKET_TTL_SECONDS', '30'))
+event_broker = EventBroker(
+    MongoEventSource(db.push_events, poll_interval=EVENT_POLL_SECONDS)
+    if EVENT_SOURCE == "mongo" else LocalEventSource()
+)
+
+# Blob storage for uploaded files: "gridfs" (inside MongoDB) or "local"
+# (files under BLOB_DIR). Local files only survive redeploys on a persistent
+# disk, so local storage is the default only when BLOB_DIR is set.
+BLOB_BACKEND = os.environ.get('BLOB_BACKEND', 'local' if os.environ.get('BLOB_DIR') else 'gridfs')
+BLOB_DIR = Path(os.environ.get('BLOB_DIR', ROOT_DIR / "uploads" / "blobs"))
+blob_store = create_blob_store(BLOB_BACKEND, db, BLOB_DIR)
+
+# Maximum upload sizes per endpoint (in MB)
+MB = 1024 * 1024
+MAX_CERTIFICATE_UPLOAD_BYTES = int(os.environ.get('MAX_CERTIFICATE_UPLOAD_MB', '10')) * MB
+MAX_EULOGY_UPLOAD_BYTES = int(os.environ.get('MAX_EULOGY_UPLOAD_MB', '20')) * MB
+MAX_DOWNLOAD_UPLOAD_BYTES = int(os.environ.get('MAX_DOWNLOAD_UPLOAD_MB', '50')) * MB
+MAX_NOTIFICATION_ATTACHMENT_BYTES = int(os.environ.get('MAX_NOTIFICATION_ATTACHMENT_MB', '20')) * MB
+MAX_RESOURCE_UPLOAD_BYTES = int(os.environ.get('MAX_RESOURCE_UPLOAD_MB', '50')) * MB
+
+# Create the main app without a prefix (responses are encoded with orjson)
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 # Security
 security = HTTPBearer()
-
-# Ensure uploads directory exists
-UPLOAD_DIR = Path(ROOT_DIR) / "uploads" / "certificates"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-EULOGY_DIR = Path(ROOT_DIR) / "uploads" / "eulogies"
-EULOGY_DIR.mkdir(parents=True, exist_ok=True)
+optional_security = HTTPBearer(auto_error=False)
 
 # =============================
 # MODELS
@@ -58,6 +198,7 @@ class User(BaseModel):
     role: str  # "admin" or "student"
     hashed_password: str
     is_first_login: bool = True
+    token_version: int = 0  # bumped to revoke all previously issued tokens
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class UserCreate(BaseModel):
@@ -119,7 +260,9 @@ class FinanceRecord(BaseModel):
 
 class Certificate(BaseModel):
     filename: str
-    file_data: str  # base64 encoded
+    # None until migrations.py moves a legacy inline file to the blob store
+    file_hash: Optional[str] = None  # blob store SHA-256
+    file_size: Optional[int] = None
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
     uploaded_by: str  # admin user id
 
@@ -128,7 +271,8 @@ class Eulogy(BaseModel):
     title: str
     description: Optional[str] = None
     filename: str
-    file_data: str  # base64 encoded
+    file_hash: str  # blob store SHA-256
+    file_size: int
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
     expires_at: datetime = Field(default_factory=lambda: datetime.utcnow() + timedelta(days=7))
     uploaded_by: str  # admin user id
@@ -153,7 +297,8 @@ class DownloadFile(BaseModel):
     title: str
     description: Optional[str] = None
     filename: str
-    file_data: str  # base64 encoded
+    file_hash: str  # blob store SHA-256
+    file_size: int
     file_type: str  # "private" or "public"
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
     uploaded_by: str  # admin user id
@@ -175,6 +320,89 @@ class DownloadFileResponse(BaseModel):
     download_count: int
     is_active: bool
 
+class DownloadDayCount(BaseModel):
+    date: str  # YYYY-MM-DD (UTC)
+    count: int
+
+class DownloadTopFile(BaseModel):
+    download_id: str
+    title: Optional[str] = None
+    count: int
+
+class DownloadStatsResponse(BaseModel):
+    days: List[DownloadDayCount]
+    total: int
+    top: List[DownloadTopFile]
+
+class OverviewStudent(BaseModel):
+    id: str
+    username: Optional[str] = None
+    full_name: str
+    average_score: Optional[float] = None
+    is_cleared: bool = False
+    has_certificate: bool = False
+    can_download_certificate: bool = False
+    created_at: datetime
+
+class AdminOverviewResponse(BaseModel):
+    total_students: int
+    cleared_students: int
+    uncleared_students: int
+    fees_billed: float
+    fees_collected: float
+    fees_outstanding: float
+    average_score: Optional[float] = None
+    subject_averages: Dict[str, Optional[float]]
+    certificates_issued: int
+    pending_password_resets: int
+    active_downloads: int
+    active_resources: int
+    active_notifications: int
+    recent_students: List[OverviewStudent]
+    generated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ScoreBin(BaseModel):
+    range: str
+    count: int
+
+class ScoreSummary(BaseModel):
+    graded: int
+    mean: Optional[float] = None
+    median: Optional[float] = None
+    std: Optional[float] = None
+    p25: Optional[float] = None
+    p75: Optional[float] = None
+    passed: int
+    pass_rate: Optional[float] = None
+    distribution: List[ScoreBin]
+
+class AcademicReportResponse(BaseModel):
+    students: int
+    pass_mark: float
+    subjects: Dict[str, ScoreSummary]
+    average: ScoreSummary  # per-student average across graded subjects
+    certificate_eligible: int
+    certificates_issued: int
+    generated_at: datetime
+
+class FeeAgeingBucket(BaseModel):
+    bucket: str  # days since last payment (or enrolment if never paid)
+    students: int
+    outstanding: float
+
+class FinanceReportResponse(BaseModel):
+    students: int
+    cleared_students: int
+    students_with_balance: int
+    never_paid: int
+    fees_billed: float
+    fees_collected: float
+    fees_outstanding: float
+    credit_balance: float
+    collection_rate: Optional[float] = None
+    ageing: List[FeeAgeingBucket]
+    generated_at: datetime
+
 class PasswordResetRecord(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     student_username: str
@@ -201,9 +429,11 @@ class Notification(BaseModel):
     title: str
     content: str  # Rich text content
     attachment_filename: Optional[str] = None
-    attachment_data: Optional[str] = None  # base64 encoded
+    attachment_hash: Optional[str] = None  # blob store SHA-256
+    attachment_size: Optional[int] = None
     target_audience: str = "all"  # "all", "specific", "student_id"
     target_student_ids: List[str] = []  # if target_audience is "specific"
+    recipients: List[str] = []  # multikey-indexed: ALL_RECIPIENTS or student ids
     created_by: str  # admin user id
     created_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = True
@@ -228,6 +458,16 @@ class NotificationResponse(BaseModel):
     created_at: datetime
     is_active: bool
     priority: str
+    is_read: Optional[bool] = None  # set on the student feed only
+
+class NotificationRead(BaseModel):
+    student_id: str
+    notification_id: str
+    read_at: datetime = Field(default_factory=datetime.utcnow)
+
+class EventTicketResponse(BaseModel):
+    ticket: str
+    expires_in: int  # seconds
 
 class StudentResource(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -235,7 +475,8 @@ class StudentResource(BaseModel):
     description: Optional[str] = None
     subject: str  # Subject category
     filename: str
-    file_data: str  # base64 encoded PDF
+    file_hash: str  # blob store SHA-256 of the PDF
+    file_size: int
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
     uploaded_by: str  # admin user id
     is_active: bool = True
@@ -284,6 +525,8 @@ class Student(BaseModel):
     academic_record: Optional[AcademicRecord] = None
     finance_record: Optional[FinanceRecord] = Field(default_factory=FinanceRecord)
     certificate: Optional[Certificate] = None
+    average_score: Optional[float] = None  # denormalized for filtering
+    name_key: Optional[str] = None  # lowercased full_name for prefix search and sorting
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -313,6 +556,12 @@ class FinanceUpdate(BaseModel):
     paid_amount: Optional[float] = None
     payment_reference: Optional[str] = None
 
+class CertificateSummary(BaseModel):
+    filename: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+    uploaded_at: datetime
+
 class StudentResponse(BaseModel):
     id: str
     username: str
@@ -323,7 +572,7 @@ class StudentResponse(BaseModel):
     parent_contacts: Optional[ParentContact] = None
     academic_record: Optional[AcademicRecord] = None
     finance_record: Optional[FinanceRecord] = None
-    certificate: Optional[Certificate] = None
+    certificate: Optional[CertificateSummary] = None  # file itself is served by the download routes
     has_certificate: bool = False
     can_download_certificate: bool = False
     average_score: Optional[float] = None
@@ -332,11 +581,11 @@ class StudentResponse(BaseModel):
 # UTILITY FUNCTIONS
 # =============================
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
 
-def verify_password(password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -348,6 +597,139 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def projection_for(model: Type[BaseModel]) -> Dict[str, int]:
+    # Load only the fields a response model can use; file blobs and other
+    # internal fields never leave Mongo for list endpoints
+    projection = {name: 1 for name in model.model_fields}
+    projection["_id"] = 0
+    return projection
+
+DOWNLOAD_LIST_PROJECTION = projection_for(DownloadFileResponse)
+EULOGY_LIST_PROJECTION = projection_for(EulogyResponse)
+NOTIFICATION_LIST_PROJECTION = projection_for(NotificationResponse)
+PASSWORD_RESET_LIST_PROJECTION = projection_for(PasswordResetResponse)
+RESOURCE_LIST_PROJECTION = projection_for(StudentResourceResponse)
+DOWNLOAD_LIST_ADAPTER = TypeAdapter(List[DownloadFileResponse])
+EULOGY_LIST_ADAPTER = TypeAdapter(List[EulogyResponse])
+STUDENT_LIST_ADAPTER = TypeAdapter(List[StudentResponse])
+# Never load inline certificate bytes left over from before the blob store migration
+STUDENT_PROJECTION = {"_id": 0, "certificate.file_data": 0}
+
+# Sort options for the admin student listing: sort key -> Mongo field
+STUDENT_SORT_FIELDS = {
+    "created_at": "created_at",
+    "full_name": "name_key",
+}
+
+def cursor_signature(payload: bytes) -> str:
+    digest = hmac.new(SECRET_KEY.encode("utf-8"), payload, hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).decode("ascii")
+
+def encode_cursor(sort_value, last_id: str) -> str:
+    # Signed so that clients can only hand back cursors this server issued
+    if isinstance(sort_value, datetime):
+        sort_value = {"$date": sort_value.isoformat()}
+    payload = base64.urlsafe_b64encode(
+        json.dumps([sort_value, last_id], separators=(",", ":")).encode("utf-8")
+    )
+    return f"{payload.decode('ascii')}.{cursor_signature(payload)}"
+
+def decode_cursor(cursor: str):
+    try:
+        payload, _, signature = cursor.encode("ascii").partition(b".")
+        if not hmac.compare_digest(signature, cursor_signature(payload).encode("ascii")):
+            raise ValueError("bad signature")
+        sort_value, last_id = json.loads(base64.urlsafe_b64decode(payload))
+        if isinstance(sort_value, dict):
+            sort_value = datetime.fromisoformat(sort_value["$date"])
+        return sort_value, str(last_id)
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def serialize_listing(adapter: TypeAdapter, items: list):
+    body = adapter.dump_json(items)
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+async def cached_public_listing(request: Request, key: str, build) -> Response:
+    body, etag = await public_listing_cache.get_or_build(key, build)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={PUBLIC_LISTING_MAX_AGE_SECONDS}, "
+                         f"stale-while-revalidate={PUBLIC_LISTING_MAX_AGE_SECONDS}"
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def invalidate_public_listing(key: str):
+    public_listing_cache.invalidate(key)
+    await invalidation_bus.publish("public_listing", key)
+
+ADMIN_OVERVIEW_KEY = "overview"
+
+async def invalidate_admin_overview():
+    admin_overview_cache.invalidate(ADMIN_OVERVIEW_KEY)
+    await invalidation_bus.publish("admin_overview", ADMIN_OVERVIEW_KEY)
+
+# recipients value of a notification addressed to every student
+ALL_RECIPIENTS = "*"
+
+def notification_recipients(target_audience: str, target_student_ids: List[str]) -> List[str]:
+    return [ALL_RECIPIENTS] if target_audience == "all" else list(target_student_ids)
+
+# Unread counters live in notification_counters: an "all" document counting
+# active notifications addressed to everyone, and one document per student
+# with the active notifications targeted at them and how many of their active
+# notifications they have read. unread = all + targeted - read.
+ALL_COUNTER_ID = "all"
+
+# MongoDB error code of a unique index violation
+DUPLICATE_KEY_ERROR = 11000
+
+def student_counter_id(student_id: str) -> str:
+    return f"student:{student_id}"
+
+async def adjust_notification_counters(recipients: List[str], delta: int):
+    if ALL_RECIPIENTS in recipients:
+        await db.notification_counters.update_one(
+            {"_id": ALL_COUNTER_ID}, {"$inc": {"count": delta}}, upsert=True
+        )
+    targeted = [recipient for recipient in recipients if recipient != ALL_RECIPIENTS]
+    if targeted:
+        await db.notification_counters.bulk_write([
+            UpdateOne({"_id": student_counter_id(student_id)}, {"$inc": {"targeted": delta}}, upsert=True)
+            for student_id in targeted
+        ], ordered=False)
+
+async def adjust_read_counters(student_ids: List[str], delta: int):
+    if student_ids:
+        await db.notification_counters.bulk_write([
+            UpdateOne({"_id": student_counter_id(student_id)}, {"$inc": {"read": delta}}, upsert=True)
+            for student_id in student_ids
+        ], ordered=False)
+
+async def unread_notification_count(student_id: str) -> int:
+    counters = {
+        doc["_id"]: doc
+        async for doc in db.notification_counters.find({"_id": {"$in": [ALL_COUNTER_ID, student_counter_id(student_id)]}})
+    }
+    own = counters.get(student_counter_id(student_id), {})
+    unread = counters.get(ALL_COUNTER_ID, {}).get("count", 0) + own.get("targeted", 0) - own.get("read", 0)
+    return max(0, unread)
+
+# Event topics: admins, every student, or one student
+ADMIN_TOPIC = "admins"
+ALL_STUDENTS_TOPIC = "students"
+
+def student_topic(student_id: str) -> str:
+    return f"student:{student_id}"
+
+def notification_topics(recipients: List[str]) -> List[str]:
+    if ALL_RECIPIENTS in recipients:
+        return [ALL_STUDENTS_TOPIC]
+    return [student_topic(student_id) for student_id in recipients]
+
 def generate_reset_code() -> str:
     return ''.join(random.choices(string.digits, k=6))
 
@@ -355,13 +737,7 @@ def calculate_average_score(academic_record: Optional[AcademicRecord]) -> Option
     if not academic_record:
         return None
     
-    scores = [
-        academic_record.ms_word,
-        academic_record.ms_excel,
-        academic_record.ms_powerpoint,
-        academic_record.ms_access,
-        academic_record.computer_intro
-    ]
+    scores = [getattr(academic_record, subject) for subject in SUBJECTS]
     
     valid_scores = [score for score in scores if score is not None]
     if not valid_scores:
@@ -370,25 +746,95 @@ def calculate_average_score(academic_record: Optional[AcademicRecord]) -> Option
     return sum(valid_scores) / len(valid_scores)
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await authenticate_token(credentials.credentials)
+
+def decode_session_token(token: str) -> dict:
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    if payload.get("sub") is None:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    return payload
+
+async def authenticate_token(token: str) -> User:
+    payload = decode_session_token(token)
+    return await load_principal(payload["sub"], payload.get("tv", 0))
+
+async def load_principal(username: str, token_version: int) -> User:
+    # Revoked sessions are rejected from memory, without a database read
+    if token_revocations.is_revoked(username, token_version):
+        raise HTTPException(status_code=401, detail="Session has been revoked")
+    
+    cached_user = principal_cache.get(username, token_version)
+    if cached_user is not None:
+        return cached_user
     
     user = await db.users.find_one({"username": username})
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
     
-    return User(**user)
+    user = User(**user)
+    if token_version < user.token_version:
+        raise HTTPException(status_code=401, detail="Session has been revoked")
+    principal_cache.set(username, token_version, user)
+    return user
 
 async def get_admin_user(current_user: User = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
+async def get_current_student_id(current_user: User) -> str:
+    if current_user.role != "student":
+        raise HTTPException(status_code=403, detail="Student access required")
+    student = await db.students.find_one({"user_id": current_user.id}, {"_id": 0, "id": 1})
+    if not student:
+        raise HTTPException(status_code=404, detail="Student profile not found")
+    return student["id"]
+
+async def record_notification_reads(student_id: str, notification_ids: List[str]) -> int:
+    # The unique (student_id, notification_id) index makes repeat reads no-ops;
+    # only the receipts actually inserted are counted
+    if not notification_ids:
+        return 0
+    try:
+        await db.notification_reads.insert_many([
+            NotificationRead(student_id=student_id, notification_id=notification_id).model_dump()
+            for notification_id in notification_ids
+        ], ordered=False)
+        inserted_ids = list(notification_ids)
+    except BulkWriteError as error:
+        if any(write_error["code"] != DUPLICATE_KEY_ERROR for write_error in error.details["writeErrors"]):
+            raise
+        duplicates = {write_error["index"] for write_error in error.details["writeErrors"]}
+        inserted_ids = [notification_id for index, notification_id in enumerate(notification_ids) if index not in duplicates]
+    if not inserted_ids:
+        return 0
+    await adjust_read_counters([student_id], len(inserted_ids))
+    inactive_ids = await retire_inactive_reads(student_id, inserted_ids)
+    return len(inserted_ids) - len(inactive_ids)
+
+async def retire_inactive_reads(student_id: str, notification_ids: List[str]) -> List[str]:
+    # A notification deleted while its receipt was being written may have missed
+    # it; retire such receipts here so they only count while the notification is
+    # active. Whichever side marks a receipt retired first uncounts it.
+    active_ids = await db.notifications.distinct("id", {"id": {"$in": notification_ids}, "is_active": True})
+    inactive_ids = [notification_id for notification_id in notification_ids if notification_id not in active_ids]
+    if inactive_ids:
+        result = await db.notification_reads.update_many(
+            {"student_id": student_id, "notification_id": {"$in": inactive_ids}, "retired": {"$exists": False}},
+            {"$set": {"retired": str(uuid.uuid4())}}
+        )
+        if result.modified_count:
+            await adjust_read_counters([student_id], -result.modified_count)
+    return inactive_ids
+
+async def invalidate_principal(username: str):
+    # Drop the cached user here and in every other worker
+    principal_cache.invalidate(username)
+    await invalidation_bus.publish("principal", username)
+
 # =============================
 # AUTHENTICATION ROUTES
 # =============================
@@ -396,12 +842,13 @@ async def get_admin_user(current_user: User = Depends(get_current_user)):
 @api_router.post("/auth/login", response_model=Token)
 async def login(user_credentials: UserLogin):
     user = await db.users.find_one({"username": user_credentials.username})
-    if not user or not verify_password(user_credentials.password, user["hashed_password"]):
+    if not user or not await verify_password(user_credentials.password, user["hashed_password"]):
         raise HTTPException(status_code=400, detail="Incorrect username or password")
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user["username"], "role": user["role"]}, expires_delta=access_token_expires
+        data={"sub": user["username"], "role": user["role"], "tv": user.get("token_version", 0)},
+        expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -418,7 +865,13 @@ async def forgot_password(request: ForgotPasswordRequest):
         reset_code=""  # Empty until admin approves
     )
     
-    await db.password_resets.insert_one(reset_record.dict())
+    await db.password_resets.insert_one(reset_record.model_dump())
+    await event_broker.publish("password_reset_requested", [ADMIN_TOPIC], {
+        "id": reset_record.id,
+        "student_username": reset_record.student_username,
+        "requested_at": reset_record.requested_at
+    })
+    await invalidate_admin_overview()
     
     return {"message": "Password reset request submitted. Please contact admin for approval."}
 
@@ -438,12 +891,17 @@ async def reset_password(request: PasswordResetRequest):
     if datetime.utcnow() > reset_record["expires_at"]:
         raise HTTPException(status_code=400, detail="Reset code has expired")
     
-    # Update user password
-    hashed_password = hash_password(request.new_password)
-    await db.users.update_one(
+    # Update user password and revoke existing sessions
+    hashed_password = await hash_password(request.new_password)
+    user = await db.users.find_one_and_update(
         {"username": request.username},
-        {"$set": {"hashed_password": hashed_password, "is_first_login": False}}
+        {"$set": {"hashed_password": hashed_password, "is_first_login": False}, "$inc": {"token_version": 1}},
+        projection={"token_version": 1},
+        return_document=ReturnDocument.AFTER
     )
+    if user:
+        await token_revocations.revoke(request.username, user.get("token_version", 0))
+    await invalidate_principal(request.username)
     
     # Mark reset record as used
     await db.password_resets.update_one(
@@ -455,12 +913,25 @@ async def reset_password(request: PasswordResetRequest):
 
 @api_router.post("/auth/change-password")
 async def change_password(password_change: PasswordChange, current_user: User = Depends(get_current_user)):
-    hashed_password = hash_password(password_change.new_password)
-    await db.users.update_one(
+    hashed_password = await hash_password(password_change.new_password)
+    user = await db.users.find_one_and_update(
         {"id": current_user.id},
-        {"$set": {"hashed_password": hashed_password, "is_first_login": False}}
+        {"$set": {"hashed_password": hashed_password, "is_first_login": False}, "$inc": {"token_version": 1}},
+        projection={"token_version": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Revoke all other sessions and hand this one a fresh token
+    token_version = user.get("token_version", 0)
+    await token_revocations.revoke(current_user.username, token_version)
+    await invalidate_principal(current_user.username)
+    access_token = create_access_token(
+        data={"sub": current_user.username, "role": current_user.role, "tv": token_version},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    return {"message": "Password changed successfully"}
+    return {"message": "Password changed successfully", "access_token": access_token, "token_type": "bearer"}
 
 @api_router.get("/auth/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
@@ -484,15 +955,17 @@ async def create_student(student_data: StudentCreate, admin_user: User = Depends
         raise HTTPException(status_code=400, detail="Username already exists")
     
     # Create user account
-    hashed_password = hash_password(student_data.password)
+    hashed_password = await hash_password(student_data.password)
     user = User(
         username=student_data.username,
         email=student_data.email,
         role="student",
         hashed_password=hashed_password,
-        is_first_login=True
+        is_first_login=True,
+        # Tokens of a deleted account with the same username must stay revoked
+        token_version=token_revocations.min_version(student_data.username)
     )
-    await db.users.insert_one(user.dict())
+    await db.users.insert_one(user.model_dump())
     
     # Create student profile
     student = Student(
@@ -500,36 +973,108 @@ async def create_student(student_data: StudentCreate, admin_user: User = Depends
         full_name=student_data.full_name,
         id_number=student_data.id_number,
         email=student_data.email,
-        phone=student_data.phone
+        phone=student_data.phone,
+        name_key=student_data.full_name.lower()
     )
-    await db.students.insert_one(student.dict())
-    
-    return await get_student_response(student)
+    await db.students.insert_one(student.model_dump())
+    await invalidate_admin_overview()
+    
+    return build_student_response(student, user.username)
+
+def keyset_after(sort_field: str, direction: int, sort_value, last_id: str) -> dict:
+    # Students not yet backfilled have no sort value. MongoDB sorts those first
+    # ascending and last descending, and range operators never match null, so
+    # they need their own branches to be paged through rather than skipped.
+    comparison = "$gt" if direction == 1 else "$lt"
+    after_id = {sort_field: sort_value, "id": {comparison: last_id}}
+    if sort_value is None:
+        branches = [after_id, {sort_field: {"$ne": None}}] if direction == 1 else [after_id]
+    else:
+        branches = [{sort_field: {comparison: sort_value}}, after_id]
+        if direction == -1:
+            branches.append({sort_field: None})
+    return {"$or": branches}
 
 @api_router.get("/admin/students", response_model=List[StudentResponse])
-async def get_all_students(admin_user: User = Depends(get_admin_user)):
-    students = await db.students.find().to_list(1000)
-    return [await get_student_response(Student(**student)) for student in students]
+async def get_all_students(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    sort: str = Query("created_at", pattern="^(created_at|full_name)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    cleared: Optional[bool] = None,
+    has_certificate: Optional[bool] = None,
+    min_average: Optional[float] = Query(None, ge=0, le=100),
+    max_average: Optional[float] = Query(None, ge=0, le=100),
+    name_prefix: Optional[str] = None,
+    admin_user: User = Depends(get_admin_user)
+):
+    # Keyset pagination: the next page starts after the last (sort value, id)
+    # pair, so paging stays stable and index-backed however deep it goes.
+    # X-Next-Cursor is returned while more students remain.
+    conditions = []
+    if cleared is not None:
+        conditions.append({"finance_record.is_cleared": True} if cleared else {"finance_record.is_cleared": {"$ne": True}})
+    if has_certificate is not None:
+        conditions.append({"certificate": {"$ne": None}} if has_certificate else {"certificate": None})
+    if min_average is not None or max_average is not None:
+        score_range = {}
+        if min_average is not None:
+            score_range["$gte"] = min_average
+        if max_average is not None:
+            score_range["$lte"] = max_average
+        conditions.append({"average_score": score_range})
+    if name_prefix:
+        conditions.append({"name_key": {"$regex": "^" + re.escape(name_prefix.lower())}})
+    
+    sort_field = STUDENT_SORT_FIELDS[sort]
+    direction = 1 if order == "asc" else -1
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        conditions.append(keyset_after(sort_field, direction, sort_value, last_id))
+    
+    query = {"$and": conditions} if conditions else {}
+    students = await db.students.find(query, STUDENT_PROJECTION).sort(
+        [(sort_field, direction), ("id", direction)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    headers = {}
+    if len(students) > limit:
+        students = students[:limit]
+        last = students[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.get(sort_field), last["id"])
+    
+    # The models are already valid; dump them straight to JSON bytes instead of
+    # re-validating them against the response model
+    responses = await get_student_responses([Student(**student) for student in students])
+    return Response(content=STUDENT_LIST_ADAPTER.dump_json(responses), media_type="application/json", headers=headers)
 
 @api_router.get("/admin/students/{student_id}", response_model=StudentResponse)
 async def get_student(student_id: str, admin_user: User = Depends(get_admin_user)):
-    student = await db.students.find_one({"id": student_id})
+    student = await db.students.find_one({"id": student_id}, STUDENT_PROJECTION)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return await get_student_response(Student(**student))
+    responses = await get_student_responses([Student(**student)])
+    return responses[0]
 
 @api_router.delete("/admin/students/{student_id}")
 async def delete_student(student_id: str, admin_user: User = Depends(get_admin_user)):
-    student = await db.students.find_one({"id": student_id})
+    student = await db.students.find_one({"id": student_id}, {"_id": 0, "user_id": 1})
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
     # Delete the student's user account
     user_id = student["user_id"]
-    await db.users.delete_one({"id": user_id})
+    user = await db.users.find_one_and_delete({"id": user_id}, {"username": 1, "token_version": 1})
+    if user:
+        await token_revocations.revoke(user["username"], user.get("token_version", 0) + 1)
+        await invalidate_principal(user["username"])
     
-    # Delete the student profile
+    # Delete the student profile and notification state
     await db.students.delete_one({"id": student_id})
+    await db.notification_reads.delete_many({"student_id": student_id})
+    await db.notifications.update_many({"recipients": student_id}, {"$pull": {"recipients": student_id}})
+    await db.notification_counters.delete_one({"_id": student_counter_id(student_id)})
+    await invalidate_admin_overview()
     
     return {"message": "Student deleted successfully"}
 
@@ -539,17 +1084,20 @@ async def update_student_profile(
     profile_data: StudentUpdate,
     admin_user: User = Depends(get_admin_user)
 ):
-    student = await db.students.find_one({"id": student_id})
+    student = await db.students.find_one({"id": student_id}, {"_id": 0, "id": 1})
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    update_data = profile_data.dict(exclude_unset=True)
+    update_data = profile_data.model_dump(exclude_unset=True)
+    if update_data.get("full_name"):
+        update_data["name_key"] = update_data["full_name"].lower()
     update_data["updated_at"] = datetime.utcnow()
     
     await db.students.update_one(
         {"id": student_id},
         {"$set": {**update_data, "updated_at": datetime.utcnow()}}
     )
+    await invalidate_admin_overview()
     return {"message": "Student profile updated successfully"}
 
 @api_router.put("/admin/students/{student_id}/academic")
@@ -558,17 +1106,23 @@ async def update_student_academic(
     academic_data: AcademicUpdate,
     admin_user: User = Depends(get_admin_user)
 ):
-    student = await db.students.find_one({"id": student_id})
+    student = await db.students.find_one({"id": student_id}, {"_id": 0, "id": 1})
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    update_data = academic_data.dict(exclude_unset=True)
+    update_data = academic_data.model_dump(exclude_unset=True)
     update_data["updated_at"] = datetime.utcnow()
+    average_score = calculate_average_score(AcademicRecord(**update_data))
     
     await db.students.update_one(
         {"id": student_id},
-        {"$set": {"academic_record": update_data, "updated_at": datetime.utcnow()}}
+        {"$set": {
+            "academic_record": update_data,
+            "average_score": average_score,
+            "updated_at": datetime.utcnow()
+        }}
     )
+    await invalidate_admin_overview()
     return {"message": "Academic record updated successfully"}
 
 @api_router.put("/admin/students/{student_id}/finance")
@@ -577,7 +1131,7 @@ async def update_student_finance(
     finance_data: FinanceUpdate,
     admin_user: User = Depends(get_admin_user)
 ):
-    student = await db.students.find_one({"id": student_id})
+    student = await db.students.find_one({"id": student_id}, {"_id": 0, "finance_record": 1})
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
@@ -604,6 +1158,7 @@ async def update_student_finance(
         {"id": student_id},
         {"$set": {"finance_record": update_dict, "updated_at": datetime.utcnow()}}
     )
+    await invalidate_admin_overview()
     return {"message": "Finance record updated successfully"}
 
 @api_router.post("/admin/students/{student_id}/certificate")
@@ -612,29 +1167,177 @@ async def upload_certificate(
     file: UploadFile = File(...),
     admin_user: User = Depends(get_admin_user)
 ):
-    student = await db.students.find_one({"id": student_id})
+    student = await db.students.find_one({"id": student_id}, {"_id": 0, "id": 1})
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    # Read file content and encode to base64
-    file_content = await file.read()
-    file_data = base64.b64encode(file_content).decode('utf-8')
+    # Stream the PDF into the blob store
+    blob = await store_upload(blob_store, file, MAX_CERTIFICATE_UPLOAD_BYTES, require_pdf=True)
     
     certificate = Certificate(
         filename=file.filename,
-        file_data=file_data,
+        file_hash=blob.sha256,
+        file_size=blob.size,
         uploaded_by=admin_user.id
     )
     
     await db.students.update_one(
         {"id": student_id},
-        {"$set": {"certificate": certificate.dict(), "updated_at": datetime.utcnow()}}
+        {"$set": {"certificate": certificate.model_dump(), "updated_at": datetime.utcnow()}}
     )
+    await invalidate_admin_overview()
     return {"message": "Certificate uploaded successfully"}
 
+async def certificate_response(request: Request, student_query: dict, certificate: Certificate) -> Response:
+    if certificate.file_hash:
+        # Stream file data from the blob store
+        return await blob_response(
+            request,
+            blob_store,
+            certificate.file_hash,
+            filename=certificate.filename,
+            media_type="application/pdf",
+            last_modified=certificate.uploaded_at
+        )
+
+    # Uploaded before the blob store migration: the file is still inline
+    student = await db.students.find_one(student_query, {"_id": 0, "certificate.file_data": 1})
+    file_data = ((student or {}).get("certificate") or {}).get("file_data")
+    if not file_data:
+        raise HTTPException(status_code=404, detail="No certificate available")
+    return Response(
+        content=base64.b64decode(file_data),
+        media_type="application/pdf",
+        headers={"Content-Disposition": content_disposition(certificate.filename)}
+    )
+
+@api_router.get("/admin/students/{student_id}/certificate")
+async def download_student_certificate_admin(
+    student_id: str,
+    request: Request,
+    admin_user: User = Depends(get_admin_user)
+):
+    student = await db.students.find_one({"id": student_id}, {"_id": 0, "certificate": 1})
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    if not student.get("certificate"):
+        raise HTTPException(status_code=404, detail="No certificate available")
+    
+    certificate = Certificate(**student["certificate"])
+    return await certificate_response(request, {"id": student_id}, certificate)
+
+@api_router.get("/admin/runtime-stats")
+async def get_runtime_stats(admin_user: User = Depends(get_admin_user)):
+    return {
+        "password_hashing": password_hasher.stats(),
+        "principal_cache": principal_cache_backend.stats(),
+        "public_listing_cache": public_listing_cache_backend.stats(),
+        "admin_overview_cache": admin_overview_cache_backend.stats(),
+        "report_cache": report_cache_backend.stats(),
+        "download_counter": download_counter.stats(),
+        "slow_operations": slow_op_log.stats(),
+        "events": event_broker.stats(),
+        "mongo_pool": {
+            "max_pool_size": MONGO_POOL_OPTIONS["maxPoolSize"],
+            "min_pool_size": MONGO_POOL_OPTIONS["minPoolSize"],
+            **pool_monitor.stats()
+        }
+    }
+
+async def build_admin_overview() -> AdminOverviewResponse:
+    # All student figures come from one $facet pass; $facet cannot reach other
+    # collections, so their counts run alongside it
+    student_facets, pending_resets, active_downloads, active_resources, active_notifications = await asyncio.gather(
+        db.students.aggregate([{"$facet": {
+            "totals": [{"$group": {
+                "_id": None,
+                "total_students": {"$sum": 1},
+                "cleared_students": {"$sum": {"$cond": [{"$eq": ["$finance_record.is_cleared", True]}, 1, 0]}},
+                "fees_billed": {"$sum": "$finance_record.total_fees"},
+                "fees_collected": {"$sum": "$finance_record.paid_amount"},
+                "fees_outstanding": {"$sum": {"$max": ["$finance_record.balance", 0]}},  # credit balances don't offset debts
+                "average_score": {"$avg": "$average_score"},
+                **{subject: {"$avg": f"$academic_record.{subject}"} for subject in SUBJECTS}
+            }}],
+            # Same rule as can_download_certificate
+            "certificates_issued": [
+                {"$match": {"certificate": {"$ne": None}, "average_score": {"$gte": PASS_MARK}, "finance_record.is_cleared": True}},
+                {"$count": "count"}
+            ],
+            "recent_students": [
+                {"$sort": {"created_at": -1, "id": -1}},
+                {"$limit": 5},
+                {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "id", "as": "user"}},
+                {"$project": {
+                    "_id": 0, "id": 1, "full_name": 1, "average_score": 1, "created_at": 1,
+                    "is_cleared": "$finance_record.is_cleared",
+                    "certificate_filename": "$certificate.filename",
+                    "username": {"$arrayElemAt": ["$user.username", 0]}
+                }}
+            ]
+        }}]).to_list(1),
+        db.password_resets.count_documents({"status": "pending"}),
+        db.downloads.count_documents({"is_active": True}),
+        db.student_resources.count_documents({"is_active": True}),
+        db.notifications.count_documents({"is_active": True})
+    )
+    facets = student_facets[0]
+    totals = facets["totals"][0] if facets["totals"] else {}
+    total_students = totals.get("total_students", 0)
+    cleared_students = totals.get("cleared_students", 0)
+    
+    recent_students = []
+    for student in facets["recent_students"]:
+        has_certificate = student.pop("certificate_filename", None) is not None
+        is_cleared = bool(student.pop("is_cleared", False))
+        average_score = student.get("average_score")
+        recent_students.append(OverviewStudent(
+            **student,
+            is_cleared=is_cleared,
+            has_certificate=has_certificate,
+            can_download_certificate=has_certificate and is_cleared and average_score is not None and average_score >= PASS_MARK
+        ))
+    
+    return AdminOverviewResponse(
+        total_students=total_students,
+        cleared_students=cleared_students,
+        uncleared_students=total_students - cleared_students,
+        fees_billed=round(totals.get("fees_billed", 0), 2),
+        fees_collected=round(totals.get("fees_collected", 0), 2),
+        fees_outstanding=round(totals.get("fees_outstanding", 0), 2),
+        average_score=totals.get("average_score"),
+        subject_averages={subject: totals.get(subject) for subject in SUBJECTS},
+        certificates_issued=facets["certificates_issued"][0]["count"] if facets["certificates_issued"] else 0,
+        pending_password_resets=pending_resets,
+        active_downloads=active_downloads,
+        active_resources=active_resources,
+        active_notifications=active_notifications,
+        recent_students=recent_students
+    )
+
+@api_router.get("/admin/overview", response_model=AdminOverviewResponse)
+async def get_admin_overview(admin_user: User = Depends(get_admin_user)):
+    return await admin_overview_cache.get_or_build(ADMIN_OVERVIEW_KEY, build_admin_overview)
+
+async def build_reports() -> dict:
+    rows = await fetch_student_rows(db.students, batch_size=REPORT_BATCH_SIZE)
+    reports = await asyncio.to_thread(report_students, rows)
+    generated_at = datetime.utcnow()
+    return {name: {**report, "generated_at": generated_at} for name, report in reports.items()}
+
+@api_router.get("/admin/reports/academics", response_model=AcademicReportResponse)
+async def get_academic_report(admin_user: User = Depends(get_admin_user)):
+    return (await report_cache.get_or_build("reports", build_reports))["academics"]
+
+@api_router.get("/admin/reports/finance", response_model=FinanceReportResponse)
+async def get_finance_report(admin_user: User = Depends(get_admin_user)):
+    return (await report_cache.get_or_build("reports", build_reports))["finance"]
+
 @api_router.get("/admin/password-resets", response_model=List[PasswordResetResponse])
 async def get_password_reset_requests(admin_user: User = Depends(get_admin_user)):
-    resets = await db.password_resets.find({"status": "pending"}).to_list(1000)
+    resets = await db.password_resets.find(
+        {"status": "pending"}, PASSWORD_RESET_LIST_PROJECTION
+    ).to_list(1000)
     return [PasswordResetResponse(**reset) for reset in resets]
 
 @api_router.put("/admin/password-resets/{reset_id}/approve")
@@ -651,6 +1354,9 @@ async def approve_password_reset(reset_id: str, admin_user: User = Depends(get_a
             "reset_code": otp_code
         }}
     )
+    # Lets other admins drop the request from their pending list
+    await event_broker.publish("password_reset_updated", [ADMIN_TOPIC], {"id": reset_id, "status": "approved"})
+    await invalidate_admin_overview()
     return {"message": "Password reset request approved", "otp_code": otp_code}
 
 @api_router.put("/admin/password-resets/{reset_id}/reject")
@@ -659,6 +1365,8 @@ async def reject_password_reset(reset_id: str, admin_user: User = Depends(get_ad
         {"id": reset_id},
         {"$set": {"status": "rejected", "responded_at": datetime.utcnow(), "admin_response": "Rejected by admin"}}
     )
+    await event_broker.publish("password_reset_updated", [ADMIN_TOPIC], {"id": reset_id, "status": "rejected"})
+    await invalidate_admin_overview()
     return {"message": "Password reset request rejected"}
 
 @api_router.post("/admin/eulogies")
@@ -668,24 +1376,25 @@ async def upload_eulogy(
     file: UploadFile = File(...),
     admin_user: User = Depends(get_admin_user)
 ):
-    # Read file content and encode to base64
-    file_content = await file.read()
-    file_data = base64.b64encode(file_content).decode('utf-8')
+    # Stream the PDF into the blob store
+    blob = await store_upload(blob_store, file, MAX_EULOGY_UPLOAD_BYTES, require_pdf=True)
     
     eulogy = Eulogy(
         title=title,
         description=description,
         filename=file.filename,
-        file_data=file_data,
+        file_hash=blob.sha256,
+        file_size=blob.size,
         uploaded_by=admin_user.id
     )
     
-    await db.eulogies.insert_one(eulogy.dict())
+    await db.eulogies.insert_one(eulogy.model_dump())
+    await invalidate_public_listing("eulogies")
     return {"message": "Eulogy uploaded successfully", "id": eulogy.id}
 
 @api_router.get("/admin/eulogies", response_model=List[EulogyResponse])
 async def get_all_eulogies_admin(admin_user: User = Depends(get_admin_user)):
-    eulogies = await db.eulogies.find().to_list(1000)
+    eulogies = await db.eulogies.find({}, EULOGY_LIST_PROJECTION).to_list(1000)
     result = []
     for eulogy in eulogies:
         days_remaining = max(0, (eulogy["expires_at"] - datetime.utcnow()).days)
@@ -698,15 +1407,13 @@ async def get_all_eulogies_admin(admin_user: User = Depends(get_admin_user)):
 @api_router.delete("/admin/eulogies/{eulogy_id}")
 async def delete_eulogy(eulogy_id: str, admin_user: User = Depends(get_admin_user)):
     await db.eulogies.delete_one({"id": eulogy_id})
+    await invalidate_public_listing("eulogies")
     return {"message": "Eulogy deleted successfully"}
 
 # =============================
 # DOWNLOADS MANAGEMENT ROUTES
 # =============================
 
-DOWNLOADS_DIR = Path(ROOT_DIR) / "uploads" / "downloads"
-DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
-
 @api_router.post("/admin/downloads")
 async def upload_download_file(
     title: str = Form(...),
@@ -718,33 +1425,72 @@ async def upload_download_file(
     if file_type not in ["public", "private"]:
         raise HTTPException(status_code=400, detail="File type must be 'public' or 'private'")
     
-    # Read file content and encode to base64
-    file_content = await file.read()
-    file_data = base64.b64encode(file_content).decode('utf-8')
+    # Stream file content into the blob store
+    blob = await store_upload(blob_store, file, MAX_DOWNLOAD_UPLOAD_BYTES)
     
     download_file = DownloadFile(
         title=title,
         description=description,
         filename=file.filename,
-        file_data=file_data,
+        file_hash=blob.sha256,
+        file_size=blob.size,
         file_type=file_type,
         uploaded_by=admin_user.id
     )
     
-    await db.downloads.insert_one(download_file.dict())
+    await db.downloads.insert_one(download_file.model_dump())
+    await invalidate_public_listing("downloads")
+    await invalidate_admin_overview()
     return {"message": "File uploaded successfully", "id": download_file.id}
 
 @api_router.get("/admin/downloads", response_model=List[DownloadFileResponse])
 async def get_all_downloads_admin(admin_user: User = Depends(get_admin_user)):
-    downloads = await db.downloads.find({"is_active": True}).to_list(1000)
+    downloads = await db.downloads.find({"is_active": True}, DOWNLOAD_LIST_PROJECTION).to_list(1000)
     return [DownloadFileResponse(**download) for download in downloads]
 
+@api_router.get("/admin/downloads/stats", response_model=DownloadStatsResponse)
+async def get_download_stats(
+    days: int = Query(30, ge=1, le=366),
+    download_id: Optional[str] = None,
+    admin_user: User = Depends(get_admin_user)
+):
+    first_day = day_start(datetime.utcnow()) - timedelta(days=days - 1)
+    match = {"day": {"$gte": first_day}}
+    if download_id:
+        match["download_id"] = download_id
+    
+    per_day = {}
+    per_file = {}
+    async for entry in db.download_stats.find(match, {"_id": 0}):
+        day = entry["day"].strftime("%Y-%m-%d")
+        per_day[day] = per_day.get(day, 0) + entry["count"]
+        per_file[entry["download_id"]] = per_file.get(entry["download_id"], 0) + entry["count"]
+    
+    # Every day in the range, including days without downloads
+    series = []
+    for offset in range(days):
+        day = (first_day + timedelta(days=offset)).strftime("%Y-%m-%d")
+        series.append(DownloadDayCount(date=day, count=per_day.get(day, 0)))
+    
+    top_ids = sorted(per_file, key=per_file.get, reverse=True)[:10]
+    titles = {
+        download["id"]: download["title"]
+        async for download in db.downloads.find({"id": {"$in": top_ids}}, {"_id": 0, "id": 1, "title": 1})
+    }
+    top = [
+        DownloadTopFile(download_id=file_id, title=titles.get(file_id), count=per_file[file_id])
+        for file_id in top_ids
+    ]
+    return DownloadStatsResponse(days=series, total=sum(per_file.values()), top=top)
+
 @api_router.delete("/admin/downloads/{download_id}")
 async def delete_download_file(download_id: str, admin_user: User = Depends(get_admin_user)):
     await db.downloads.update_one(
         {"id": download_id},
         {"$set": {"is_active": False}}
     )
+    await invalidate_public_listing("downloads")
+    await invalidate_admin_overview()
     return {"message": "Download file deleted successfully"}
 
 # =============================
@@ -767,29 +1513,42 @@ async def create_notification(
     
     # Handle file attachment
     attachment_filename = None
-    attachment_data = None
+    attachment_hash = None
+    attachment_size = None
     if file:
-        file_content = await file.read()
-        attachment_data = base64.b64encode(file_content).decode('utf-8')
+        blob = await store_upload(blob_store, file, MAX_NOTIFICATION_ATTACHMENT_BYTES)
+        attachment_hash = blob.sha256
+        attachment_size = blob.size
         attachment_filename = file.filename
     
     notification = Notification(
         title=title,
         content=content,
         attachment_filename=attachment_filename,
-        attachment_data=attachment_data,
+        attachment_hash=attachment_hash,
+        attachment_size=attachment_size,
         target_audience=target_audience,
         target_student_ids=target_ids,
+        recipients=notification_recipients(target_audience, target_ids),
         priority=priority,
         created_by=admin_user.id
     )
     
-    await db.notifications.insert_one(notification.dict())
+    await db.notifications.insert_one(notification.model_dump())
+    await adjust_notification_counters(notification.recipients, 1)
+    await event_broker.publish("notification", notification_topics(notification.recipients), {
+        "id": notification.id,
+        "title": notification.title,
+        "priority": notification.priority,
+        "has_attachment": attachment_hash is not None,
+        "created_at": notification.created_at
+    })
+    await invalidate_admin_overview()
     return {"message": "Notification created successfully", "id": notification.id}
 
 @api_router.get("/admin/notifications", response_model=List[NotificationResponse])
 async def get_all_notifications_admin(admin_user: User = Depends(get_admin_user)):
-    notifications = await db.notifications.find({"is_active": True}).to_list(1000)
+    notifications = await db.notifications.find({"is_active": True}, NOTIFICATION_LIST_PROJECTION).to_list(1000)
     return [
         NotificationResponse(
             **notif,
@@ -799,10 +1558,28 @@ async def get_all_notifications_admin(admin_user: User = Depends(get_admin_user)
 
 @api_router.delete("/admin/notifications/{notification_id}")
 async def delete_notification(notification_id: str, admin_user: User = Depends(get_admin_user)):
-    await db.notifications.update_one(
-        {"id": notification_id},
-        {"$set": {"is_active": False}}
+    notification = await db.notifications.find_one_and_update(
+        {"id": notification_id, "is_active": True},
+        {"$set": {"is_active": False}},
+        projection={"recipients": 1, "target_audience": 1, "target_student_ids": 1}
     )
+    
+    # Only count the deactivation once, and take it out of readers' read counts
+    if notification:
+        recipients = notification["recipients"] if "recipients" in notification else notification_recipients(
+            notification["target_audience"], notification["target_student_ids"]
+        )
+        await adjust_notification_counters(recipients, -1)
+        # Receipts are marked retired so that each is uncounted once, here or by a
+        # read that was recording it concurrently (record_notification_reads)
+        retirement = str(uuid.uuid4())
+        await db.notification_reads.update_many(
+            {"notification_id": notification_id, "retired": {"$exists": False}},
+            {"$set": {"retired": retirement}}
+        )
+        readers = await db.notification_reads.distinct("student_id", {"notification_id": notification_id, "retired": retirement})
+        await adjust_read_counters(readers, -1)
+    await invalidate_admin_overview()
     return {"message": "Notification deleted successfully"}
 
 # Student Resources Management
@@ -814,29 +1591,26 @@ async def upload_student_resource(
     file: UploadFile = File(...),
     admin_user: User = Depends(get_admin_user)
 ):
-    # Validate file is PDF
-    if not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are allowed for resources")
-    
-    # Read file content and encode to base64
-    file_content = await file.read()
-    file_data = base64.b64encode(file_content).decode('utf-8')
+    # Stream the PDF into the blob store
+    blob = await store_upload(blob_store, file, MAX_RESOURCE_UPLOAD_BYTES, require_pdf=True)
     
     resource = StudentResource(
         title=title,
         description=description,
         subject=subject,
         filename=file.filename,
-        file_data=file_data,
+        file_hash=blob.sha256,
+        file_size=blob.size,
         uploaded_by=admin_user.id
     )
     
-    await db.student_resources.insert_one(resource.dict())
+    await db.student_resources.insert_one(resource.model_dump())
+    await invalidate_admin_overview()
     return {"message": "Resource uploaded successfully", "id": resource.id}
 
 @api_router.get("/admin/resources", response_model=List[StudentResourceResponse])
 async def get_all_resources_admin(admin_user: User = Depends(get_admin_user)):
-    resources = await db.student_resources.find({"is_active": True}).to_list(1000)
+    resources = await db.student_resources.find({"is_active": True}, RESOURCE_LIST_PROJECTION).to_list(1000)
     return [StudentResourceResponse(**resource) for resource in resources]
 
 @api_router.delete("/admin/resources/{resource_id}")
@@ -845,6 +1619,7 @@ async def delete_student_resource(resource_id: str, admin_user: User = Depends(g
         {"id": resource_id},
         {"$set": {"is_active": False}}
     )
+    await invalidate_admin_overview()
     return {"message": "Resource deleted successfully"}
 
 # WiFi Credentials Management
@@ -866,10 +1641,10 @@ async def update_wifi_credentials(
     if existing:
         await db.wifi_credentials.update_one(
             {"id": existing["id"]},
-            {"$set": wifi_creds.dict()}
+            {"$set": wifi_creds.model_dump()}
         )
     else:
-        await db.wifi_credentials.insert_one(wifi_creds.dict())
+        await db.wifi_credentials.insert_one(wifi_creds.model_dump())
     
     return {"message": "WiFi credentials updated successfully"}
 
@@ -885,17 +1660,19 @@ async def get_wifi_credentials_admin(admin_user: User = Depends(get_admin_user))
 # =============================
 
 @api_router.get("/downloads", response_model=List[DownloadFileResponse])
-async def get_public_downloads():
-    # Get only active public downloads
-    downloads = await db.downloads.find({
-        "is_active": True,
-        "file_type": "public"
-    }).to_list(1000)
+async def get_public_downloads(request: Request):
+    async def build():
+        # Get only active public downloads (may be served by a secondary)
+        downloads = await public_db.downloads.find({
+            "is_active": True,
+            "file_type": "public"
+        }, DOWNLOAD_LIST_PROJECTION).to_list(1000)
+        return serialize_listing(DOWNLOAD_LIST_ADAPTER, [DownloadFileResponse(**download) for download in downloads])
     
-    return [DownloadFileResponse(**download) for download in downloads]
+    return await cached_public_listing(request, "downloads", build)
 
 @api_router.get("/downloads/{download_id}")
-async def download_file(download_id: str):
+async def download_file(download_id: str, request: Request):
     download = await db.downloads.find_one({"id": download_id, "is_active": True})
     if not download:
         raise HTTPException(status_code=404, detail="Download not found")
@@ -904,28 +1681,24 @@ async def download_file(download_id: str):
     if download["file_type"] != "public":
         raise HTTPException(status_code=403, detail="Access denied. File is private.")
     
-    # Increment download count
-    await db.downloads.update_one(
-        {"id": download_id},
-        {"$inc": {"download_count": 1}}
+    # Stream file data from the blob store
+    response = await blob_response(
+        request,
+        blob_store,
+        download["file_hash"],
+        filename=download["filename"],
+        media_type="application/octet-stream",
+        last_modified=download["uploaded_at"]
     )
     
-    # Decode base64 file data
-    file_data = base64.b64decode(download["file_data"])
+    # Count the download (written to the database in batches)
+    if counts_as_download(response):
+        download_counter.increment(download_id)
     
-    # Create a temporary file
-    temp_file = DOWNLOADS_DIR / f"temp_{download_id}_{download['filename']}"
-    with open(temp_file, "wb") as f:
-        f.write(file_data)
-    
-    return FileResponse(
-        path=temp_file,
-        filename=download["filename"],
-        media_type="application/octet-stream"
-    )
+    return response
 
 @api_router.get("/downloads/private/{download_id}")
-async def download_private_file(download_id: str, current_user: User = Depends(get_current_user)):
+async def download_private_file(download_id: str, request: Request, current_user: User = Depends(get_current_user)):
     download = await db.downloads.find_one({"id": download_id, "is_active": True})
     if not download:
         raise HTTPException(status_code=404, detail="Download not found")
@@ -934,25 +1707,21 @@ async def download_private_file(download_id: str, current_user: User = Depends(g
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required for private files")
     
-    # Increment download count
-    await db.downloads.update_one(
-        {"id": download_id},
-        {"$inc": {"download_count": 1}}
+    # Stream file data from the blob store
+    response = await blob_response(
+        request,
+        blob_store,
+        download["file_hash"],
+        filename=download["filename"],
+        media_type="application/octet-stream",
+        last_modified=download["uploaded_at"]
     )
     
-    # Decode base64 file data
-    file_data = base64.b64decode(download["file_data"])
+    # Count the download (written to the database in batches)
+    if counts_as_download(response):
+        download_counter.increment(download_id)
     
-    # Create a temporary file
-    temp_file = DOWNLOADS_DIR / f"temp_{download_id}_{download['filename']}"
-    with open(temp_file, "wb") as f:
-        f.write(file_data)
-    
-    return FileResponse(
-        path=temp_file,
-        filename=download["filename"],
-        media_type="application/octet-stream"
-    )
+    return response
 
 # =============================
 # STUDENT ROUTES
@@ -963,11 +1732,11 @@ async def get_student_profile(current_user: User = Depends(get_current_user)):
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Student access required")
     
-    student = await db.students.find_one({"user_id": current_user.id})
+    student = await db.students.find_one({"user_id": current_user.id}, STUDENT_PROJECTION)
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
     
-    return await get_student_response(Student(**student))
+    return build_student_response(Student(**student), current_user.username)
 
 @api_router.put("/student/parent-contacts")
 async def update_parent_contacts(
@@ -979,16 +1748,16 @@ async def update_parent_contacts(
     
     await db.students.update_one(
         {"user_id": current_user.id},
-        {"$set": {"parent_contacts": parent_contacts.dict(), "updated_at": datetime.utcnow()}}
+        {"$set": {"parent_contacts": parent_contacts.model_dump(), "updated_at": datetime.utcnow()}}
     )
     return {"message": "Parent contacts updated successfully"}
 
 @api_router.get("/student/certificate")
-async def download_certificate(current_user: User = Depends(get_current_user)):
+async def download_certificate(request: Request, current_user: User = Depends(get_current_user)):
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Student access required")
     
-    student = await db.students.find_one({"user_id": current_user.id})
+    student = await db.students.find_one({"user_id": current_user.id}, STUDENT_PROJECTION)
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
     
@@ -999,58 +1768,114 @@ async def download_certificate(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=404, detail="No certificate available")
     
     average_score = calculate_average_score(student_obj.academic_record)
-    if not average_score or average_score < 60:
-        raise HTTPException(status_code=403, detail="Average score must be 60% or above")
+    if not average_score or average_score < PASS_MARK:
+        raise HTTPException(status_code=403, detail=f"Average score must be {PASS_MARK}% or above")
     
     if not student_obj.finance_record or not student_obj.finance_record.is_cleared:
         raise HTTPException(status_code=403, detail="Fees must be cleared")
     
-    # Decode base64 file data
-    file_data = base64.b64decode(student_obj.certificate.file_data)
-    
-    # Create a temporary file
-    temp_file = UPLOAD_DIR / f"temp_{student_obj.id}_{student_obj.certificate.filename}"
-    with open(temp_file, "wb") as f:
-        f.write(file_data)
-    
-    return FileResponse(
-        path=temp_file,
-        filename=student_obj.certificate.filename,
-        media_type="application/pdf"
-    )
+    return await certificate_response(request, {"user_id": current_user.id}, student_obj.certificate)
 
 # =============================
 # NEW STUDENT ROUTES FOR RESOURCES
 # =============================
 
 @api_router.get("/student/notifications", response_model=List[NotificationResponse])
-async def get_student_notifications(current_user: User = Depends(get_current_user)):
-    if current_user.role != "student":
-        raise HTTPException(status_code=403, detail="Student access required")
-    
-    # Get student profile to get student ID
-    student = await db.students.find_one({"user_id": current_user.id})
-    if not student:
-        raise HTTPException(status_code=404, detail="Student profile not found")
-    
-    # Get notifications for this student
-    notifications = await db.notifications.find({
-        "is_active": True,
-        "$or": [
-            {"target_audience": "all"},
-            {"target_audience": "specific", "target_student_ids": {"$in": [student["id"]]}}
-        ]
-    }).to_list(1000)
+async def get_student_notifications(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    priority: Optional[str] = Query(None, pattern="^(low|normal|high|urgent)$"),
+    current_user: User = Depends(get_current_user)
+):
+    student_id = await get_current_student_id(current_user)
+    
+    # Newest first, one range read on the (is_active, recipients, created_at, id)
+    # multikey index. X-Next-Cursor pages towards older notifications while any
+    # remain; X-Latest-Cursor marks the newest one seen, and passing it back as
+    # `since` returns only notifications posted after it.
+    query = {"is_active": True, "recipients": {"$in": [ALL_RECIPIENTS, student_id]}}
+    if priority:
+        query["priority"] = priority
+    ranges = []
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        ranges.append({"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": last_id}}
+        ]})
+    if since:
+        created_at, last_id = decode_cursor(since)
+        ranges.append({"$or": [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "id": {"$gt": last_id}}
+        ]})
+    if ranges:
+        query["$and"] = ranges
+    
+    notifications = await db.notifications.find(query, NOTIFICATION_LIST_PROJECTION).sort(
+        [("created_at", -1), ("id", -1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    if len(notifications) > limit:
+        notifications = notifications[:limit]
+        last = notifications[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last["created_at"], last["id"])
+    if notifications and not cursor:
+        response.headers["X-Latest-Cursor"] = encode_cursor(notifications[0]["created_at"], notifications[0]["id"])
+    elif since:
+        response.headers["X-Latest-Cursor"] = since
+    
+    read_ids = set(await db.notification_reads.distinct("notification_id", {
+        "student_id": student_id,
+        "notification_id": {"$in": [notif["id"] for notif in notifications]}
+    })) if notifications else set()
     
     return [
         NotificationResponse(
             **notif,
-            has_attachment=notif["attachment_filename"] is not None
+            has_attachment=notif["attachment_filename"] is not None,
+            is_read=notif["id"] in read_ids
         ) for notif in notifications
     ]
 
+@api_router.get("/student/notifications/unread-count")
+async def get_unread_notification_count(current_user: User = Depends(get_current_user)):
+    student_id = await get_current_student_id(current_user)
+    return {"unread_count": await unread_notification_count(student_id)}
+
+@api_router.post("/student/notifications/read-all")
+async def mark_all_notifications_read(current_user: User = Depends(get_current_user)):
+    student_id = await get_current_student_id(current_user)
+    
+    visible_ids = await db.notifications.distinct("id", {
+        "is_active": True, "recipients": {"$in": [ALL_RECIPIENTS, student_id]}
+    })
+    read_ids = set(await db.notification_reads.distinct("notification_id", {
+        "student_id": student_id, "notification_id": {"$in": visible_ids}
+    }))
+    unread_ids = [notification_id for notification_id in visible_ids if notification_id not in read_ids]
+    
+    marked = await record_notification_reads(student_id, unread_ids)
+    return {"marked": marked, "unread_count": await unread_notification_count(student_id)}
+
+@api_router.post("/student/notifications/{notification_id}/read")
+async def mark_notification_read(notification_id: str, current_user: User = Depends(get_current_user)):
+    student_id = await get_current_student_id(current_user)
+    
+    notification = await db.notifications.find_one(
+        {"id": notification_id, "is_active": True, "recipients": {"$in": [ALL_RECIPIENTS, student_id]}},
+        {"_id": 0, "id": 1}
+    )
+    if not notification:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    
+    await record_notification_reads(student_id, [notification_id])
+    return {"unread_count": await unread_notification_count(student_id)}
+
 @api_router.get("/student/notifications/{notification_id}/attachment")
-async def download_notification_attachment(notification_id: str, current_user: User = Depends(get_current_user)):
+async def download_notification_attachment(notification_id: str, request: Request, current_user: User = Depends(get_current_user)):
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Student access required")
     
@@ -1058,30 +1883,29 @@ async def download_notification_attachment(notification_id: str, current_user: U
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     
-    if not notification["attachment_data"]:
+    if not notification.get("attachment_hash"):
         raise HTTPException(status_code=404, detail="No attachment found")
     
     # Get student profile to check access
-    student = await db.students.find_one({"user_id": current_user.id})
+    student = await db.students.find_one({"user_id": current_user.id}, {"_id": 0, "id": 1})
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
     
     # Check if student has access to this notification
-    if notification["target_audience"] == "specific" and student["id"] not in notification["target_student_ids"]:
+    recipients = notification["recipients"] if "recipients" in notification else notification_recipients(
+        notification["target_audience"], notification["target_student_ids"]
+    )
+    if ALL_RECIPIENTS not in recipients and student["id"] not in recipients:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Decode base64 file data
-    file_data = base64.b64decode(notification["attachment_data"])
-    
-    # Create a temporary file
-    temp_file = DOWNLOADS_DIR / f"notification_attachment_{notification_id}_{notification['attachment_filename']}"
-    with open(temp_file, "wb") as f:
-        f.write(file_data)
-    
-    return FileResponse(
-        path=temp_file,
+    # Stream file data from the blob store
+    return await blob_response(
+        request,
+        blob_store,
+        notification["attachment_hash"],
         filename=notification["attachment_filename"],
-        media_type="application/octet-stream"
+        media_type="application/octet-stream",
+        last_modified=notification["created_at"]
     )
 
 @api_router.get("/student/resources", response_model=List[StudentResourceResponse])
@@ -1089,11 +1913,11 @@ async def get_student_resources(current_user: User = Depends(get_current_user)):
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Student access required")
     
-    resources = await db.student_resources.find({"is_active": True}).to_list(1000)
+    resources = await db.student_resources.find({"is_active": True}, RESOURCE_LIST_PROJECTION).to_list(1000)
     return [StudentResourceResponse(**resource) for resource in resources]
 
 @api_router.get("/student/resources/{resource_id}/download")
-async def download_student_resource(resource_id: str, current_user: User = Depends(get_current_user)):
+async def download_student_resource(resource_id: str, request: Request, current_user: User = Depends(get_current_user)):
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Student access required")
     
@@ -1101,18 +1925,14 @@ async def download_student_resource(resource_id: str, current_user: User = Depen
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
     
-    # Decode base64 file data
-    file_data = base64.b64decode(resource["file_data"])
-    
-    # Create a temporary file
-    temp_file = DOWNLOADS_DIR / f"resource_{resource_id}_{resource['filename']}"
-    with open(temp_file, "wb") as f:
-        f.write(file_data)
-    
-    return FileResponse(
-        path=temp_file,
+    # Stream file data from the blob store
+    return await blob_response(
+        request,
+        blob_store,
+        resource["file_hash"],
         filename=resource["filename"],
-        media_type="application/pdf"
+        media_type="application/pdf",
+        last_modified=resource["uploaded_at"]
     )
 
 @api_router.get("/student/wifi", response_model=WiFiCredentialsResponse)
@@ -1131,9 +1951,83 @@ async def get_student_downloads(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Student access required")
     
     # Get all downloads (both public and private, but students can only download public ones)
-    downloads = await db.downloads.find({"is_active": True}).to_list(1000)
+    downloads = await db.downloads.find({"is_active": True}, DOWNLOAD_LIST_PROJECTION).to_list(1000)
     return [DownloadFileResponse(**download) for download in downloads]
 
+# =============================
+# EVENT STREAM
+# =============================
+
+def hash_event_ticket(ticket: str) -> str:
+    return hashlib.sha256(ticket.encode()).hexdigest()
+
+@api_router.post("/events/ticket", response_model=EventTicketResponse)
+async def create_event_ticket(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    payload = decode_session_token(credentials.credentials)
+    current_user = await load_principal(payload["sub"], payload.get("tv", 0))
+    
+    # Only the hash is stored; the TTL index removes unused tickets
+    ticket = secrets.token_urlsafe(32)
+    await db.event_tickets.insert_one({
+        "_id": hash_event_ticket(ticket),
+        "username": current_user.username,
+        "token_version": payload.get("tv", 0),
+        "session_expires": payload["exp"],
+        "expires_at": datetime.utcnow() + timedelta(seconds=EVENT_TICKET_TTL_SECONDS)
+    })
+    return EventTicketResponse(ticket=ticket, expires_in=EVENT_TICKET_TTL_SECONDS)
+
+async def redeem_event_ticket(ticket: str) -> dict:
+    session = await db.event_tickets.find_one_and_delete({
+        "_id": hash_event_ticket(ticket),
+        "expires_at": {"$gt": datetime.utcnow()}
+    })
+    if not session:
+        raise HTTPException(status_code=401, detail="Invalid or expired event ticket")
+    return session
+
+@api_router.get("/events")
+async def stream_events(
+    request: Request,
+    ticket: Optional[str] = None,
+    last_event_id: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    if credentials:
+        payload = decode_session_token(credentials.credentials)
+        token_version, session_expires = payload.get("tv", 0), payload["exp"]
+        current_user = await load_principal(payload["sub"], token_version)
+    elif ticket:
+        session = await redeem_event_ticket(ticket)
+        current_user = await load_principal(session["username"], session["token_version"])
+        token_version, session_expires = session["token_version"], session["session_expires"]
+    else:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    if current_user.role == "admin":
+        topics = [ADMIN_TOPIC]
+    else:
+        topics = [ALL_STUDENTS_TOPIC, student_topic(await get_current_student_id(current_user))]
+    
+    async def is_active() -> bool:
+        # End the stream when the session expires or is revoked; the client reconnects with a new ticket
+        return (
+            time.time() < session_expires
+            and not token_revocations.is_revoked(current_user.username, token_version)
+            and not await request.is_disconnected()
+        )
+    
+    return StreamingResponse(
+        event_broker.stream(
+            topics,
+            request.headers.get("last-event-id") or last_event_id,
+            is_active,
+            heartbeat=EVENT_HEARTBEAT_SECONDS
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # =============================
 # PUBLIC ROUTES
 # =============================
@@ -1147,25 +2041,28 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
 @api_router.get("/eulogies", response_model=List[EulogyResponse])
-async def get_public_eulogies():
-    # Get only active eulogies that haven't expired
-    current_time = datetime.utcnow()
-    eulogies = await db.eulogies.find({
-        "is_active": True,
-        "expires_at": {"$gt": current_time}
-    }).to_list(1000)
-    
-    result = []
-    for eulogy in eulogies:
-        days_remaining = max(0, (eulogy["expires_at"] - current_time).days)
-        result.append(EulogyResponse(
-            **eulogy,
-            days_remaining=days_remaining
-        ))
-    return result
+async def get_public_eulogies(request: Request):
+    async def build():
+        # Get only active eulogies that haven't expired (may be served by a secondary)
+        current_time = datetime.utcnow()
+        eulogies = await public_db.eulogies.find({
+            "is_active": True,
+            "expires_at": {"$gt": current_time}
+        }, EULOGY_LIST_PROJECTION).to_list(1000)
+        
+        result = []
+        for eulogy in eulogies:
+            days_remaining = max(0, (eulogy["expires_at"] - current_time).days)
+            result.append(EulogyResponse(
+                **eulogy,
+                days_remaining=days_remaining
+            ))
+        return serialize_listing(EULOGY_LIST_ADAPTER, result)
+    
+    return await cached_public_listing(request, "eulogies", build)
 
 @api_router.get("/eulogies/{eulogy_id}/download")
-async def download_eulogy(eulogy_id: str):
+async def download_eulogy(eulogy_id: str, request: Request):
     eulogy = await db.eulogies.find_one({"id": eulogy_id})
     if not eulogy:
         raise HTTPException(status_code=404, detail="Eulogy not found")
@@ -1174,34 +2071,41 @@ async def download_eulogy(eulogy_id: str):
     if not eulogy["is_active"] or datetime.utcnow() > eulogy["expires_at"]:
         raise HTTPException(status_code=410, detail="Eulogy has expired or is no longer available")
     
-    # Decode base64 file data
-    file_data = base64.b64decode(eulogy["file_data"])
-    
-    # Create a temporary file
-    temp_file = EULOGY_DIR / f"temp_{eulogy_id}_{eulogy['filename']}"
-    with open(temp_file, "wb") as f:
-        f.write(file_data)
-    
-    return FileResponse(
-        path=temp_file,
+    # Stream file data from the blob store
+    return await blob_response(
+        request,
+        blob_store,
+        eulogy["file_hash"],
         filename=eulogy["filename"],
-        media_type="application/pdf"
+        media_type="application/pdf",
+        last_modified=eulogy["uploaded_at"]
     )
 
 # =============================
 # HELPER FUNCTIONS
 # =============================
 
-async def get_student_response(student: Student) -> StudentResponse:
-    user = await db.users.find_one({"id": student.user_id})
-    username = user["username"] if user else "unknown"
+async def get_student_responses(students: List[Student]) -> List[StudentResponse]:
+    # Resolve all usernames with a single $in query instead of one per student
+    user_ids = list({student.user_id for student in students})
+    users = await db.users.find(
+        {"id": {"$in": user_ids}},
+        {"_id": 0, "id": 1, "username": 1}
+    ).to_list(None)
+    usernames = {user["id"]: user["username"] for user in users}
     
+    return [
+        build_student_response(student, usernames.get(student.user_id, "unknown"))
+        for student in students
+    ]
+
+def build_student_response(student: Student, username: str) -> StudentResponse:
     average_score = calculate_average_score(student.academic_record)
     has_certificate = student.certificate is not None
     can_download = (
         has_certificate and
         average_score is not None and
-        average_score >= 60 and
+        average_score >= PASS_MARK and
         student.finance_record is not None and
         student.finance_record.is_cleared
     )
@@ -1216,7 +2120,12 @@ async def get_student_response(student: Student) -> StudentResponse:
         parent_contacts=student.parent_contacts,
         academic_record=student.academic_record,
         finance_record=student.finance_record,
-        certificate=student.certificate,
+        certificate=CertificateSummary(
+            filename=student.certificate.filename,
+            size=student.certificate.file_size,
+            sha256=student.certificate.file_hash,
+            uploaded_at=student.certificate.uploaded_at
+        ) if student.certificate else None,
         has_certificate=has_certificate,
         can_download_certificate=can_download,
         average_score=average_score
@@ -1225,14 +2134,35 @@ async def get_student_response(student: Student) -> StudentResponse:
 # Include the router in the main app
 app.include_router(api_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(app_metrics.render(), media_type="text/plain; version=0.0.4")
+
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits=[
+        ("POST", r"/api/admin/students/[^/]+/certificate", MAX_CERTIFICATE_UPLOAD_BYTES),
+        ("POST", r"/api/admin/eulogies", MAX_EULOGY_UPLOAD_BYTES),
+        ("POST", r"/api/admin/downloads", MAX_DOWNLOAD_UPLOAD_BYTES),
+        ("POST", r"/api/admin/notifications", MAX_NOTIFICATION_ATTACHMENT_BYTES),
+        ("POST", r"/api/admin/resources", MAX_RESOURCE_UPLOAD_BYTES),
+    ]
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Latest-Cursor", "Server-Timing"],
 )
 
+# Outermost, so the timings cover the other middleware too
+app.add_middleware(MetricsMiddleware, metrics=app_metrics, excluded_paths=("/metrics", "/api/events"))
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -1240,8 +2170,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Create declared indexes on startup (see indexes.py)
+async def create_indexes():
+    failed = await ensure_indexes(db)
+    if failed:
+        logger.warning(f"Some indexes could not be created: {', '.join(failed)}")
+
 # Create default admin user on startup
-@app.on_event("startup")
 async def create_default_admin():
     admin_exists = await db.users.find_one({"role": "admin"})
     if not admin_exists:
@@ -1249,10 +2184,10 @@ async def create_default_admin():
             username="admin",
             email="admin@twoem.com",
             role="admin",
-            hashed_password=hash_password("Twoemweb@2020"),
+            hashed_password=await hash_password("Twoemweb@2020"),
             is_first_login=True  # Force password change on first login for security
         )
-        await db.users.insert_one(admin_user.dict())
+        await db.users.insert_one(admin_user.model_dump())
         logger.info("Default admin user created: username=admin, password=Twoemweb@2020 (Password change required on first login)")
     else:
         # Ensure admin user has is_first_login set to True for testing
@@ -1262,6 +2197,25 @@ async def create_default_admin():
         )
         logger.info("Existing admin user updated: is_first_login set to True for testing")
 
+@app.on_event("startup")
+async def run_startup_tasks():
+    # With several workers, only one at a time runs the one-off startup work
+    await run_once(db.startup_locks, "create_indexes", create_indexes)
+    await run_once(db.startup_locks, "create_default_admin", create_default_admin)
+    await token_revocations.start()
+    await invalidation_bus.start()
+    await event_broker.start()
+    download_counter.start()
+    app_metrics.start()
+    slow_op_log.start(client)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await token_revocations.stop()
+    await invalidation_bus.stop()
+    await event_broker.stop()
+    # Write out pending download counts before the connection closes
+    await download_counter.stop()
+    await app_metrics.stop()
+    client.close()
+    password_hasher.shutdown()
\ No newline at end of file
@@ -0,0 +1,95 @@
+import re
+from typing import List, Tuple
+
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+
+from blobstore import BlobStore, StoredBlob
+
+# =============================
+# STREAMING UPLOADS
+# =============================
+# Uploads are copied from the spooled UploadFile into the blob store one chunk
+# at a time. The content is hashed as it streams, so memory per upload stays
+# constant regardless of file size.
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+PDF_SIGNATURE = b"%PDF-"
+
+# Allowance for multipart boundaries and form fields around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File is too large. Maximum size is {max_bytes // (1024 * 1024)} MB"
+    )
+
+
+async def store_upload(
+    blob_store: BlobStore,
+    file: UploadFile,
+    max_bytes: int,
+    require_pdf: bool = False
+) -> StoredBlob:
+    if require_pdf and not (file.filename or "").lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    writer = await blob_store.writer()
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if writer.size == 0 and require_pdf and not chunk.startswith(PDF_SIGNATURE):
+                raise HTTPException(status_code=400, detail="File is not a valid PDF document")
+            if writer.size + len(chunk) > max_bytes:
+                raise _too_large(max_bytes)
+            await writer.write(chunk)
+
+        if writer.size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    except BaseException:
+        await writer.abort()
+        raise
+    return await writer.commit()
+
+
+class UploadSizeLimitMiddleware:
+    """Reject oversize upload requests from their Content-Length header.
+
+    This runs before the multipart body is read, so an oversize upload is
+    refused without spooling it to disk first. store_upload() still enforces
+    the exact limit for chunked requests without a Content-Length.
+    """
+
+    def __init__(self, app, limits: List[Tuple[str, str, int]]):
+        self.app = app
+        self.limits = [
+            (method, re.compile(pattern), max_bytes)
+            for method, pattern, max_bytes in limits
+        ]
+
+    def limit_for(self, method: str, path: str):
+        for limit_method, pattern, max_bytes in self.limits:
+            if method == limit_method and pattern.fullmatch(path):
+                return max_bytes
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            max_bytes = self.limit_for(scope["method"], scope["path"])
+            if max_bytes is not None:
+                content_length = dict(scope["headers"]).get(b"content-length")
+                if content_length and content_length.isdigit() and \
+                        int(content_length) > max_bytes + MULTIPART_OVERHEAD:
+                    response = JSONResponse(
+                        status_code=413,
+                        content={"detail": _too_large(max_bytes).detail}
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
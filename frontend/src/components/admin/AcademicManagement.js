@@ -1,13 +1,16 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import axios from 'axios';
+import { useStudentPages } from '../../utils/students';
 import { PencilIcon, AcademicCapIcon } from '@heroicons/react/24/outline';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API_BASE = `${BACKEND_URL}/api`;
 
 const AcademicManagement = () => {
-  const [students, setStudents] = useState([]);
-  const [loading, setLoading] = useState(true);
+  const [nameFilter, setNameFilter] = useState('');
+  const { students, nextCursor, loading, loadingMore, loadMore, reloadStudent } = useStudentPages({
+    name_prefix: nameFilter
+  });
   const [selectedStudent, setSelectedStudent] = useState(null);
   const [showEditModal, setShowEditModal] = useState(false);
   const [academicData, setAcademicData] = useState({
@@ -18,21 +21,6 @@ const AcademicManagement = () => {
     computer_intro: ''
   });
 
-  useEffect(() => {
-    fetchStudents();
-  }, []);
-
-  const fetchStudents = async () => {
-    try {
-      const response = await axios.get(`${API_BASE}/admin/students`);
-      setStudents(response.data);
-    } catch (error) {
-      console.error('Error fetching students:', error);
-    } finally {
-      setLoading(false);
-    }
-  };
-
   const handleEditScores = (student) => {
     setSelectedStudent(student);
     setAcademicData({
@@ -64,7 +52,7 @@ const AcademicManagement = () => {
 
       await axios.put(`${API_BASE}/admin/students/${selectedStudent.id}/academic`, scoreData);
       setShowEditModal(false);
-      fetchStudents();
+      reloadStudent(selectedStudent.id);
     } catch (error) {
       console.error('Error updating academic record:', error);
       alert('Error updating academic record');
@@ -104,6 +92,16 @@ const AcademicManagement = () => {
         </div>
       </div>
 
+      <div className="mt-6 max-w-sm">
+        <input
+          type="text"
+          placeholder="Search by name..."
+          className="block w-full border-gray-300 rounded-md shadow-sm focus:ring-indigo-500 focus:border-indigo-500 sm:text-sm"
+          value={nameFilter}
+          onChange={(e) => setNameFilter(e.target.value)}
+        />
+      </div>
+
       <div className="mt-8 flex flex-col">
         <div className="-my-2 -mx-4 overflow-x-auto sm:-mx-6 lg:-mx-8">
           <div className="inline-block min-w-full py-2 align-middle md:px-6 lg:px-8">
@@ -204,6 +202,18 @@ const AcademicManagement = () => {
         </div>
       )}
 
+      {nextCursor && (
+        <div className="text-center mt-6">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="inline-flex items-center rounded-md border border-gray-300 bg-white px-4 py-2 text-sm font-medium text-gray-700 shadow-sm hover:bg-gray-50 disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
+
       {/* Edit Scores Modal */}
       {showEditModal && selectedStudent && (
         <div className="fixed inset-0 bg-gray-600 bg-opacity-50 overflow-y-auto h-full w-full z-50">
@@ -10,18 +10,17 @@ import {
 } from '@heroicons/react/24/outline';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
-const API_BASE = `${BACKEND_URL}/api`;
+
+const SUBJECT_NAMES = {
+  ms_word: 'MS Word',
+  ms_excel: 'MS Excel',
+  ms_powerpoint: 'MS PowerPoint',
+  ms_access: 'MS Access',
+  computer_intro: 'Computer Intro'
+};
 
 const AdminOverview = () => {
-  const [stats, setStats] = useState({
-    totalStudents: 0,
-    activeStudents: 0,
-    totalRevenue: 0,
-    pendingPayments: 0,
-    averageScore: 0,
-    certificatesIssued: 0
-  });
-  const [students, setStudents] = useState([]);
+  const [overview, setOverview] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -30,31 +29,9 @@ const AdminOverview = () => {
 
   const fetchOverviewData = async () => {
     try {
-      const response = await axios.get(`${API_BASE}/admin/students`);
-      const studentsData = response.data;
-      setStudents(studentsData);
-
-      // Calculate statistics
-      const totalStudents = studentsData.length;
-      const activeStudents = studentsData.filter(s => s.finance_record?.is_cleared).length;
-      const totalRevenue = studentsData.reduce((sum, s) => sum + (s.finance_record?.paid_amount || 0), 0);
-      const pendingPayments = studentsData.reduce((sum, s) => sum + (s.finance_record?.balance || 0), 0);
-      const certificatesIssued = studentsData.filter(s => s.has_certificate && s.can_download_certificate).length;
-      
-      const scoresArray = studentsData
-        .map(s => s.average_score)
-        .filter(score => score !== null && score !== undefined);
-      const averageScore = scoresArray.length > 0 ? 
-        scoresArray.reduce((sum, score) => sum + score, 0) / scoresArray.length : 0;
-
-      setStats({
-        totalStudents,
-        activeStudents,
-        totalRevenue,
-        pendingPayments,
-        averageScore,
-        certificatesIssued
-      });
+      // Aggregated server-side; no need to download every student
+      const response = await axios.get(`${BACKEND_URL}/api/admin/overview`);
+      setOverview(response.data);
     } catch (error) {
       console.error('Error fetching overview data:', error);
     } finally {
@@ -62,6 +39,16 @@ const AdminOverview = () => {
     }
   };
 
+  const stats = {
+    totalStudents: overview?.total_students || 0,
+    activeStudents: overview?.cleared_students || 0,
+    totalRevenue: overview?.fees_collected || 0,
+    pendingPayments: overview?.fees_outstanding || 0,
+    averageScore: overview?.average_score || 0,
+    certificatesIssued: overview?.certificates_issued || 0
+  };
+  const students = overview?.recent_students || [];
+
   const statCards = [
     {
       title: 'Total Students',
@@ -152,6 +139,49 @@ const AdminOverview = () => {
         })}
       </div>
 
+      {/* Activity and Subject Averages */}
+      {overview && (
+        <div className="grid grid-cols-1 lg:grid-cols-2 gap-6 mb-8">
+          <div className="bg-white shadow rounded-lg p-6">
+            <h3 className="text-lg leading-6 font-medium text-gray-900 mb-4">Activity</h3>
+            <dl className="grid grid-cols-2 gap-4">
+              {[
+                ['Pending Password Resets', overview.pending_password_resets],
+                ['Active Notifications', overview.active_notifications],
+                ['Active Downloads', overview.active_downloads],
+                ['Active Resources', overview.active_resources],
+                ['Fees Billed', `KSh ${overview.fees_billed.toLocaleString()}`],
+                ['Uncleared Students', overview.uncleared_students]
+              ].map(([label, value]) => (
+                <div key={label}>
+                  <dt className="text-sm font-medium text-gray-500">{label}</dt>
+                  <dd className="text-lg font-medium text-gray-900">{value}</dd>
+                </div>
+              ))}
+            </dl>
+          </div>
+          <div className="bg-white shadow rounded-lg p-6">
+            <h3 className="text-lg leading-6 font-medium text-gray-900 mb-4">Average Score by Subject</h3>
+            <div className="space-y-3">
+              {Object.entries(SUBJECT_NAMES).map(([subject, name]) => {
+                const score = overview.subject_averages[subject];
+                return (
+                  <div key={subject}>
+                    <div className="flex justify-between text-sm mb-1">
+                      <span className="text-gray-700">{name}</span>
+                      <span className="text-gray-900 font-medium">{score != null ? `${score.toFixed(1)}%` : 'N/A'}</span>
+                    </div>
+                    <div className="w-full bg-gray-200 rounded-full h-2">
+                      <div className="bg-purple-500 h-2 rounded-full" style={{ width: `${score || 0}%` }}></div>
+                    </div>
+                  </div>
+                );
+              })}
+            </div>
+          </div>
+        </div>
+      )}
+
       {/* Recent Students */}
       <div className="bg-white shadow rounded-lg">
         <div className="px-4 py-5 sm:p-6">
@@ -202,11 +232,11 @@ const AdminOverview = () => {
                     </td>
                     <td className="px-6 py-4 whitespace-nowrap">
                       <span className={`inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium ${
-                        student.finance_record?.is_cleared
+                        student.is_cleared
                           ? 'bg-green-100 text-green-800'
                           : 'bg-red-100 text-red-800'
                       }`}>
-                        {student.finance_record?.is_cleared ? 'Cleared' : 'Pending'}
+                        {student.is_cleared ? 'Cleared' : 'Pending'}
                       </span>
                     </td>
                     <td className="px-6 py-4 whitespace-nowrap">
@@ -1,5 +1,6 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import axios from 'axios';
+import { useStudentPages } from '../../utils/students';
 import { 
   DocumentIcon, 
   CloudArrowUpIcon, 
@@ -12,28 +13,17 @@ const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API_BASE = `${BACKEND_URL}/api`;
 
 const CertificateManagement = () => {
-  const [students, setStudents] = useState([]);
-  const [loading, setLoading] = useState(true);
+  const [nameFilter, setNameFilter] = useState('');
+  const [certificateFilter, setCertificateFilter] = useState('');
+  const { students, nextCursor, loading, loadingMore, loadMore, reloadStudent } = useStudentPages({
+    name_prefix: nameFilter,
+    has_certificate: certificateFilter
+  });
   const [uploading, setUploading] = useState(false);
   const [selectedFile, setSelectedFile] = useState(null);
   const [selectedStudent, setSelectedStudent] = useState(null);
   const [showUploadModal, setShowUploadModal] = useState(false);
 
-  useEffect(() => {
-    fetchStudents();
-  }, []);
-
-  const fetchStudents = async () => {
-    try {
-      const response = await axios.get(`${API_BASE}/admin/students`);
-      setStudents(response.data);
-    } catch (error) {
-      console.error('Error fetching students:', error);
-    } finally {
-      setLoading(false);
-    }
-  };
-
   const handleUploadCertificate = (student) => {
     setSelectedStudent(student);
     setSelectedFile(null);
@@ -78,7 +68,7 @@ const CertificateManagement = () => {
       setShowUploadModal(false);
       setSelectedFile(null);
       setSelectedStudent(null);
-      fetchStudents();
+      reloadStudent(selectedStudent.id);
       alert('Certificate uploaded successfully!');
     } catch (error) {
       console.error('Error uploading certificate:', error);
@@ -141,6 +131,25 @@ const CertificateManagement = () => {
         </div>
       </div>
 
+      <div className="mt-6 flex flex-col sm:flex-row gap-4">
+        <input
+          type="text"
+          placeholder="Search by name..."
+          className="block w-full sm:max-w-sm border-gray-300 rounded-md shadow-sm focus:ring-indigo-500 focus:border-indigo-500 sm:text-sm"
+          value={nameFilter}
+          onChange={(e) => setNameFilter(e.target.value)}
+        />
+        <select
+          value={certificateFilter}
+          onChange={(e) => setCertificateFilter(e.target.value)}
+          className="block border-gray-300 rounded-md shadow-sm focus:ring-indigo-500 focus:border-indigo-500 sm:text-sm"
+        >
+          <option value="">All students</option>
+          <option value="true">Certificate uploaded</option>
+          <option value="false">No certificate</option>
+        </select>
+      </div>
+
       <div className="mt-8 flex flex-col">
         <div className="-my-2 -mx-4 overflow-x-auto sm:-mx-6 lg:-mx-8">
           <div className="inline-block min-w-full py-2 align-middle md:px-6 lg:px-8">
@@ -258,6 +267,18 @@ const CertificateManagement = () => {
         </div>
       )}
 
+      {nextCursor && (
+        <div className="text-center mt-6">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="inline-flex items-center rounded-md border border-gray-300 bg-white px-4 py-2 text-sm font-medium text-gray-700 shadow-sm hover:bg-gray-50 disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
+
       {/* Upload Certificate Modal */}
       {showUploadModal && selectedStudent && (
         <div className="fixed inset-0 bg-gray-600 bg-opacity-50 overflow-y-auto h-full w-full z-50">
@@ -12,6 +12,7 @@ import {
 
 const DownloadsManagement = () => {
   const [downloads, setDownloads] = useState([]);
+  const [downloadStats, setDownloadStats] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
@@ -26,6 +27,7 @@ const DownloadsManagement = () => {
 
   useEffect(() => {
     fetchDownloads();
+    fetchDownloadStats();
   }, []);
 
   const fetchDownloads = async () => {
@@ -46,6 +48,21 @@ const DownloadsManagement = () => {
     }
   };
 
+  const fetchDownloadStats = async () => {
+    try {
+      const response = await axios.get(
+        `${process.env.REACT_APP_BACKEND_URL}/api/admin/downloads/stats`,
+        {
+          params: { days: 30 },
+          headers: { Authorization: `Bearer ${token}` }
+        }
+      );
+      setDownloadStats(response.data);
+    } catch (error) {
+      console.error('Error fetching download stats:', error);
+    }
+  };
+
   const handleUpload = async (e) => {
     e.preventDefault();
     
@@ -168,6 +185,29 @@ const DownloadsManagement = () => {
         </div>
       )}
 
+      {/* Downloads per day (last 30 days) */}
+      {downloadStats && (
+        <div className="mb-6 bg-white shadow sm:rounded-md p-6">
+          <div className="flex justify-between items-center mb-4">
+            <h3 className="text-lg font-medium text-gray-900">Downloads in the last 30 days</h3>
+            <span className="text-sm text-gray-500">{downloadStats.total} total</span>
+          </div>
+          <div className="flex items-end h-24 space-x-1">
+            {downloadStats.days.map((day) => {
+              const max = Math.max(1, ...downloadStats.days.map((d) => d.count));
+              return (
+                <div
+                  key={day.date}
+                  title={`${day.date}: ${day.count} downloads`}
+                  className="flex-1 bg-indigo-500 rounded-t"
+                  style={{ height: `${(day.count / max) * 100}%`, minHeight: day.count ? '2px' : '0' }}
+                />
+              );
+            })}
+          </div>
+        </div>
+      )}
+
       {/* Upload Form Modal */}
       {showUploadForm && (
         <div className="fixed inset-0 bg-gray-600 bg-opacity-50 overflow-y-auto h-full w-full z-50">
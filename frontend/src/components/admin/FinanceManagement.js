@@ -1,13 +1,19 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import { useStudentPages } from '../../utils/students';
 import { PencilIcon, CurrencyDollarIcon, CheckCircleIcon, XCircleIcon } from '@heroicons/react/24/outline';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API_BASE = `${BACKEND_URL}/api`;
 
 const FinanceManagement = () => {
-  const [students, setStudents] = useState([]);
-  const [loading, setLoading] = useState(true);
+  const [nameFilter, setNameFilter] = useState('');
+  const [clearedFilter, setClearedFilter] = useState('');
+  const { students, nextCursor, loading, loadingMore, loadMore, reloadStudent } = useStudentPages({
+    name_prefix: nameFilter,
+    cleared: clearedFilter
+  });
+  const [report, setReport] = useState(null);
   const [selectedStudent, setSelectedStudent] = useState(null);
   const [showEditModal, setShowEditModal] = useState(false);
   const [financeData, setFinanceData] = useState({
@@ -17,17 +23,16 @@ const FinanceManagement = () => {
   });
 
   useEffect(() => {
-    fetchStudents();
+    fetchReport();
   }, []);
 
-  const fetchStudents = async () => {
+  // Totals cover every student, not just the pages loaded
+  const fetchReport = async () => {
     try {
-      const response = await axios.get(`${API_BASE}/admin/students`);
-      setStudents(response.data);
+      const response = await axios.get(`${API_BASE}/admin/reports/finance`);
+      setReport(response.data);
     } catch (error) {
-      console.error('Error fetching students:', error);
-    } finally {
-      setLoading(false);
+      console.error('Error fetching finance report:', error);
     }
   };
 
@@ -58,23 +63,21 @@ const FinanceManagement = () => {
 
       await axios.put(`${API_BASE}/admin/students/${selectedStudent.id}/finance`, updateData);
       setShowEditModal(false);
-      fetchStudents();
+      reloadStudent(selectedStudent.id);
+      fetchReport();
     } catch (error) {
       console.error('Error updating finance record:', error);
       alert('Error updating finance record');
     }
   };
 
-  const getTotalStats = () => {
-    const totalRevenue = students.reduce((sum, s) => sum + (s.finance_record?.paid_amount || 0), 0);
-    const totalPending = students.reduce((sum, s) => sum + (s.finance_record?.balance || 0), 0);
-    const clearedCount = students.filter(s => s.finance_record?.is_cleared).length;
-    
-    return { totalRevenue, totalPending, clearedCount };
+  const stats = {
+    totalRevenue: report?.fees_collected || 0,
+    totalPending: report?.fees_outstanding || 0,
+    clearedCount: report?.cleared_students || 0,
+    studentCount: report?.students || 0
   };
 
-  const stats = getTotalStats();
-
   if (loading) {
     return (
       <div className="p-8">
@@ -160,7 +163,7 @@ const FinanceManagement = () => {
                     Cleared Students
                   </dt>
                   <dd className="text-lg font-medium text-gray-900">
-                    {stats.clearedCount} / {students.length}
+                    {stats.clearedCount} / {stats.studentCount}
                   </dd>
                 </dl>
               </div>
@@ -169,6 +172,25 @@ const FinanceManagement = () => {
         </div>
       </div>
 
+      <div className="mt-6 flex flex-col sm:flex-row gap-4">
+        <input
+          type="text"
+          placeholder="Search by name..."
+          className="block w-full sm:max-w-sm border-gray-300 rounded-md shadow-sm focus:ring-indigo-500 focus:border-indigo-500 sm:text-sm"
+          value={nameFilter}
+          onChange={(e) => setNameFilter(e.target.value)}
+        />
+        <select
+          value={clearedFilter}
+          onChange={(e) => setClearedFilter(e.target.value)}
+          className="block border-gray-300 rounded-md shadow-sm focus:ring-indigo-500 focus:border-indigo-500 sm:text-sm"
+        >
+          <option value="">All students</option>
+          <option value="true">Fees cleared</option>
+          <option value="false">Fees pending</option>
+        </select>
+      </div>
+
       <div className="mt-8 flex flex-col">
         <div className="-my-2 -mx-4 overflow-x-auto sm:-mx-6 lg:-mx-8">
           <div className="inline-block min-w-full py-2 align-middle md:px-6 lg:px-8">
@@ -272,6 +294,18 @@ const FinanceManagement = () => {
         </div>
       )}
 
+      {nextCursor && (
+        <div className="text-center mt-6">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="inline-flex items-center rounded-md border border-gray-300 bg-white px-4 py-2 text-sm font-medium text-gray-700 shadow-sm hover:bg-gray-50 disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
+
       {/* Edit Finance Modal */}
       {showEditModal && selectedStudent && (
         <div className="fixed inset-0 bg-gray-600 bg-opacity-50 overflow-y-auto h-full w-full z-50">
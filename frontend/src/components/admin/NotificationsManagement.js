@@ -15,7 +15,6 @@ const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const NotificationsManagement = () => {
   const { token } = useAuth();
   const [notifications, setNotifications] = useState([]);
-  const [students, setStudents] = useState([]);
   const [loading, setLoading] = useState(true);
   const [showCreateModal, setShowCreateModal] = useState(false);
   const [formData, setFormData] = useState({
@@ -30,7 +29,6 @@ const NotificationsManagement = () => {
 
   useEffect(() => {
     fetchNotifications();
-    fetchStudents();
   }, []);
 
   const fetchNotifications = async () => {
@@ -47,17 +45,6 @@ const NotificationsManagement = () => {
     }
   };
 
-  const fetchStudents = async () => {
-    try {
-      const response = await axios.get(`${BACKEND_URL}/api/admin/students`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setStudents(response.data);
-    } catch (error) {
-      console.error('Error fetching students:', error);
-    }
-  };
-
   const handleSubmit = async (e) => {
     e.preventDefault();
     setLoading(true);
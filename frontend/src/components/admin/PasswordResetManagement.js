@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import { useAuth } from '../../contexts/AuthContext';
+import { subscribeToEvents } from '../../utils/events';
 import { 
   ClockIcon, 
   CheckIcon, 
@@ -17,6 +18,13 @@ const PasswordResetManagement = () => {
 
   useEffect(() => {
     fetchPasswordResetRequests();
+    // New requests, and requests handled by another admin, are pushed
+    return subscribeToEvents(token, {
+      password_reset_requested: fetchPasswordResetRequests,
+      password_reset_updated: (reset) => {
+        setResetRequests(prev => prev.filter(request => request.id !== reset.id));
+      }
+    });
   }, []);
 
   const fetchPasswordResetRequests = async () => {
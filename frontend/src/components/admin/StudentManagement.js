@@ -1,18 +1,23 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import axios from 'axios';
 import { useAuth } from '../../contexts/AuthContext';
+import { useStudentPages } from '../../utils/students';
 import { PlusIcon, PencilIcon, EyeIcon, TrashIcon } from '@heroicons/react/24/outline';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API_BASE = `${BACKEND_URL}/api`;
 
 const StudentManagement = () => {
-  const [students, setStudents] = useState([]);
-  const [loading, setLoading] = useState(true);
   const [showCreateModal, setShowCreateModal] = useState(false);
   const [selectedStudent, setSelectedStudent] = useState(null);
   const [showDetailsModal, setShowDetailsModal] = useState(false);
+  const [nameFilter, setNameFilter] = useState('');
   const { token } = useAuth();
+  const {
+    students, nextCursor, loading, loadingMore, loadMore, refresh: fetchStudents
+  } = useStudentPages({ name_prefix: nameFilter }, {
+    headers: { Authorization: `Bearer ${token}` }
+  });
 
   const [newStudent, setNewStudent] = useState({
     username: '',
@@ -23,23 +28,6 @@ const StudentManagement = () => {
     phone: ''
   });
 
-  useEffect(() => {
-    fetchStudents();
-  }, []);
-
-  const fetchStudents = async () => {
-    try {
-      const response = await axios.get(`${API_BASE}/admin/students`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setStudents(response.data);
-    } catch (error) {
-      console.error('Error fetching students:', error);
-    } finally {
-      setLoading(false);
-    }
-  };
-
   const handleCreateStudent = async (e) => {
     e.preventDefault();
     try {
@@ -119,6 +107,16 @@ const StudentManagement = () => {
         </div>
       </div>
 
+      <div className="mt-6 max-w-sm">
+        <input
+          type="text"
+          placeholder="Search by name..."
+          className="block w-full border-gray-300 rounded-md shadow-sm focus:ring-indigo-500 focus:border-indigo-500 sm:text-sm"
+          value={nameFilter}
+          onChange={(e) => setNameFilter(e.target.value)}
+        />
+      </div>
+
       <div className="mt-8 flex flex-col">
         <div className="-my-2 -mx-4 overflow-x-auto sm:-mx-6 lg:-mx-8">
           <div className="inline-block min-w-full py-2 align-middle md:px-6 lg:px-8">
@@ -214,6 +212,18 @@ const StudentManagement = () => {
         </div>
       )}
 
+      {nextCursor && (
+        <div className="text-center mt-6">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="inline-flex items-center rounded-md border border-gray-300 bg-white px-4 py-2 text-sm font-medium text-gray-700 shadow-sm hover:bg-gray-50 disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
+
       {/* Create Student Modal */}
       {showCreateModal && (
         <div className="fixed inset-0 bg-gray-600 bg-opacity-50 overflow-y-auto h-full w-full z-50">
@@ -1,6 +1,7 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 import { useAuth } from '../../contexts/AuthContext';
+import { subscribeToEvents } from '../../utils/events';
 import { 
   BellIcon, 
   BookOpenIcon, 
@@ -22,6 +23,9 @@ const StudentResources = () => {
   const { token } = useAuth();
   const [activeTab, setActiveTab] = useState('notifications');
   const [notifications, setNotifications] = useState([]);
+  const [notificationsCursor, setNotificationsCursor] = useState(null);
+  const [unreadCount, setUnreadCount] = useState(0);
+  const latestCursor = useRef(null);
   const [resources, setResources] = useState([]);
   const [downloads, setDownloads] = useState([]);
   const [wifiCredentials, setWifiCredentials] = useState(null);
@@ -31,6 +35,13 @@ const StudentResources = () => {
 
   useEffect(() => {
     fetchAllData();
+    // New notifications are pushed; fetch only the ones newer than the latest shown
+    return subscribeToEvents(token, {
+      notification: () => {
+        fetchNewNotifications();
+        fetchUnreadCount();
+      }
+    });
   }, []);
 
   const fetchAllData = async () => {
@@ -38,6 +49,7 @@ const StudentResources = () => {
       setLoading(true);
       await Promise.all([
         fetchNotifications(),
+        fetchUnreadCount(),
         fetchResources(),
         fetchDownloads(),
         fetchWifiCredentials()
@@ -49,17 +61,88 @@ const StudentResources = () => {
     }
   };
 
-  const fetchNotifications = async () => {
+  const fetchNotifications = async (cursor = null) => {
     try {
       const response = await axios.get(`${BACKEND_URL}/api/student/notifications`, {
+        params: cursor ? { cursor } : {},
         headers: { Authorization: `Bearer ${token}` }
       });
-      setNotifications(response.data);
+      // Newest first; older pages are appended by "Load older notifications"
+      setNotifications(prev => (cursor ? [...prev, ...response.data] : response.data));
+      setNotificationsCursor(response.headers['x-next-cursor'] || null);
+      if (!cursor) {
+        latestCursor.current = response.headers['x-latest-cursor'] || null;
+      }
     } catch (error) {
       console.error('Error fetching notifications:', error);
     }
   };
 
+  const fetchNewNotifications = async () => {
+    if (!latestCursor.current) {
+      return fetchNotifications();
+    }
+    try {
+      // More may have been posted than fit in one page; follow X-Next-Cursor
+      // (towards older, still newer than `since`) until the gap is filled
+      const since = latestCursor.current;
+      const newNotifications = [];
+      let latest = null;
+      let cursor = null;
+      do {
+        const response = await axios.get(`${BACKEND_URL}/api/student/notifications`, {
+          params: cursor ? { since, cursor } : { since },
+          headers: { Authorization: `Bearer ${token}` }
+        });
+        newNotifications.push(...response.data);
+        latest = latest || response.headers['x-latest-cursor'];
+        cursor = response.headers['x-next-cursor'] || null;
+      } while (cursor);
+      setNotifications(prev => {
+        const shown = new Set(prev.map(notification => notification.id));
+        return [...newNotifications.filter(notification => !shown.has(notification.id)), ...prev];
+      });
+      latestCursor.current = latest || latestCursor.current;
+    } catch (error) {
+      console.error('Error fetching new notifications:', error);
+    }
+  };
+
+  const fetchUnreadCount = async () => {
+    try {
+      const response = await axios.get(`${BACKEND_URL}/api/student/notifications/unread-count`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setUnreadCount(response.data.unread_count);
+    } catch (error) {
+      console.error('Error fetching unread count:', error);
+    }
+  };
+
+  const markNotificationRead = async (notificationId) => {
+    try {
+      const response = await axios.post(`${BACKEND_URL}/api/student/notifications/${notificationId}/read`, {}, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setNotifications(prev => prev.map(n => (n.id === notificationId ? { ...n, is_read: true } : n)));
+      setUnreadCount(response.data.unread_count);
+    } catch (error) {
+      console.error('Error marking notification as read:', error);
+    }
+  };
+
+  const markAllNotificationsRead = async () => {
+    try {
+      const response = await axios.post(`${BACKEND_URL}/api/student/notifications/read-all`, {}, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setNotifications(prev => prev.map(n => ({ ...n, is_read: true })));
+      setUnreadCount(response.data.unread_count);
+    } catch (error) {
+      console.error('Error marking notifications as read:', error);
+    }
+  };
+
   const fetchResources = async () => {
     try {
       const response = await axios.get(`${BACKEND_URL}/api/student/resources`, {
@@ -200,7 +283,7 @@ const StudentResources = () => {
   };
 
   const tabs = [
-    { id: 'notifications', name: 'Notifications', icon: BellIcon, count: notifications.length },
+    { id: 'notifications', name: 'Notifications', icon: BellIcon, count: unreadCount },
     { id: 'resources', name: 'Study Materials', icon: BookOpenIcon, count: resources.length },
     { id: 'downloads', name: 'Downloads', icon: DocumentArrowDownIcon, count: downloads.length },
     { id: 'wifi', name: 'WiFi Access', icon: WifiIcon, count: null }
@@ -272,6 +355,16 @@ const StudentResources = () => {
         {/* Notifications Tab */}
         {activeTab === 'notifications' && (
           <div className="space-y-4">
+            {unreadCount > 0 && (
+              <div className="flex justify-end">
+                <button
+                  onClick={markAllNotificationsRead}
+                  className="text-blue-600 hover:text-blue-800 text-sm font-medium"
+                >
+                  Mark all as read
+                </button>
+              </div>
+            )}
             {notifications.length === 0 ? (
               <div className="text-center py-12 bg-white rounded-lg border border-gray-200">
                 <BellIcon className="h-12 w-12 text-gray-400 mx-auto mb-4" />
@@ -280,7 +373,9 @@ const StudentResources = () => {
               </div>
             ) : (
               notifications.map((notification) => (
-                <div key={notification.id} className="bg-white rounded-lg border border-gray-200 p-6 hover:shadow-md transition-shadow">
+                <div key={notification.id} className={`rounded-lg border p-6 hover:shadow-md transition-shadow ${
+                  notification.is_read ? 'bg-white border-gray-200' : 'bg-blue-50 border-blue-200'
+                }`}>
                   <div className="flex justify-between items-start mb-4">
                     <div className="flex-1">
                       <div className="flex items-center space-x-3 mb-2">
@@ -301,6 +396,15 @@ const StudentResources = () => {
                         <span className="text-sm text-gray-500">
                           Posted: {new Date(notification.created_at).toLocaleDateString()}
                         </span>
+                        {!notification.is_read && (
+                          <button
+                            onClick={() => markNotificationRead(notification.id)}
+                            className="text-gray-600 hover:text-gray-800 text-sm font-medium flex items-center space-x-1"
+                          >
+                            <CheckCircleIcon className="h-4 w-4" />
+                            <span>Mark as read</span>
+                          </button>
+                        )}
                         {notification.has_attachment && (
                           <button
                             onClick={() => downloadNotificationAttachment(notification.id, notification.attachment_filename)}
@@ -316,6 +420,16 @@ const StudentResources = () => {
                 </div>
               ))
             )}
+            {notificationsCursor && (
+              <div className="text-center">
+                <button
+                  onClick={() => fetchNotifications(notificationsCursor)}
+                  className="px-4 py-2 border border-gray-300 rounded-md text-sm font-medium text-gray-700 bg-white hover:bg-gray-50"
+                >
+                  Load older notifications
+                </button>
+              </div>
+            )}
           </div>
         )}
 
@@ -85,9 +85,15 @@ export const AuthProvider = ({ children }) => {
 
   const changePassword = async (newPassword) => {
     try {
-      await axios.post(`${API_BASE}/auth/change-password`, {
+      const response = await axios.post(`${API_BASE}/auth/change-password`, {
         new_password: newPassword
       });
+
+      // Changing the password revokes existing sessions; switch to the new token
+      const { access_token } = response.data;
+      localStorage.setItem('token', access_token);
+      setToken(access_token);
+      axios.defaults.headers.common['Authorization'] = `Bearer ${access_token}`;
       
       // Update user info to reflect password change
       const userResponse = await axios.get(`${API_BASE}/auth/me`);
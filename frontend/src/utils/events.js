@@ -0,0 +1,70 @@
+import axios from 'axios';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+
+// Wait before reconnecting, like the server's SSE retry interval
+const RECONNECT_DELAY_MS = 5000;
+
+// Server-sent events from /api/events. EventSource cannot send an Authorization
+// header, and a session token in the URL would end up in access logs, so each
+// connection is opened with a short-lived single-use ticket. A ticket can't be
+// reused, so reconnects are done here with a new one, passing the last event
+// id so the server replays whatever was missed.
+export const subscribeToEvents = (token, handlers) => {
+  let source = null;
+  let lastEventId = null;
+  let retryTimer = null;
+  let closed = false;
+
+  const scheduleReconnect = () => {
+    if (!closed) {
+      retryTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+    }
+  };
+
+  const connect = async () => {
+    let ticket;
+    try {
+      const response = await axios.post(
+        `${BACKEND_URL}/api/events/ticket`,
+        {},
+        { headers: { Authorization: `Bearer ${token}` } }
+      );
+      ticket = response.data.ticket;
+    } catch (error) {
+      // Expired or revoked sessions get a 401; the app logs out on its own
+      if (error.response?.status !== 401) {
+        scheduleReconnect();
+      }
+      return;
+    }
+    if (closed) {
+      return;
+    }
+
+    const params = new URLSearchParams({ ticket });
+    if (lastEventId) {
+      params.set('last_event_id', lastEventId);
+    }
+    source = new EventSource(`${BACKEND_URL}/api/events?${params}`);
+    Object.entries(handlers).forEach(([type, handler]) => {
+      source.addEventListener(type, (event) => {
+        lastEventId = event.lastEventId || lastEventId;
+        handler(JSON.parse(event.data));
+      });
+    });
+    source.onerror = () => {
+      source.close();
+      scheduleReconnect();
+    };
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (source) {
+      source.close();
+    }
+  };
+};
@@ -0,0 +1,90 @@
+import { useState, useEffect, useRef } from 'react';
+import axios from 'axios';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+const API_BASE = `${BACKEND_URL}/api`;
+
+export const STUDENT_PAGE_SIZE = 50;
+
+// /admin/students is paginated with a keyset cursor returned in X-Next-Cursor
+export const fetchStudentPage = async (params = {}, config = {}) => {
+  const response = await axios.get(`${API_BASE}/admin/students`, { ...config, params });
+  return {
+    students: response.data,
+    nextCursor: response.headers['x-next-cursor'] || null
+  };
+};
+
+// Drops unset filters so they are not sent as empty query parameters
+const activeFilters = (filters) => Object.fromEntries(
+  Object.entries(filters).filter(([, value]) => value !== '' && value !== null && value !== undefined)
+);
+
+// Admin student lists: loads one page at a time ("Load more" appends the
+// next), with search and filters applied by the server. The query re-runs,
+// debounced, whenever the filters change.
+export const useStudentPages = (filters = {}, config = {}) => {
+  const [students, setStudents] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Ignore responses to queries that have since been replaced
+  const latestQuery = useRef(0);
+  const filterKey = JSON.stringify(activeFilters(filters));
+
+  const pageQuery = (cursor) => ({
+    limit: STUDENT_PAGE_SIZE,
+    ...activeFilters(filters),
+    ...(cursor && { cursor })
+  });
+
+  const refresh = async () => {
+    const queryId = ++latestQuery.current;
+    try {
+      const page = await fetchStudentPage(pageQuery(), config);
+      if (queryId === latestQuery.current) {
+        setStudents(page.students);
+        setNextCursor(page.nextCursor);
+      }
+    } catch (error) {
+      console.error('Error fetching students:', error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  useEffect(() => {
+    const timer = setTimeout(refresh, 300);
+    return () => clearTimeout(timer);
+  }, [filterKey]);
+
+  const loadMore = async () => {
+    const queryId = latestQuery.current;
+    setLoadingMore(true);
+    try {
+      const page = await fetchStudentPage(pageQuery(nextCursor), config);
+      if (queryId === latestQuery.current) {
+        setStudents((current) => [...current, ...page.students]);
+        setNextCursor(page.nextCursor);
+      }
+    } catch (error) {
+      console.error('Error fetching students:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Re-reads one student after an edit instead of reloading the list
+  const reloadStudent = async (studentId) => {
+    try {
+      const response = await axios.get(`${API_BASE}/admin/students/${studentId}`, config);
+      setStudents((current) => current.map((student) => (
+        student.id === studentId ? response.data : student
+      )));
+    } catch (error) {
+      console.error('Error fetching student:', error);
+    }
+  };
+
+  return { students, nextCursor, loading, loadingMore, loadMore, refresh, reloadStudent };
+};
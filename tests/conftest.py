@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# The backend is a flat set of modules run from its own directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# server.py reads its settings at import time: keep uploads in a scratch
+# directory and use an in-memory MongoDB stand-in (requirements-dev.txt)
+os.environ.setdefault("BLOB_DIR", tempfile.mkdtemp(prefix="twoem-tests-"))
+os.environ.setdefault("DB_NAME", "twoem_tests")
+
+import motor.motor_asyncio  # noqa: E402
+import mongomock_motor  # noqa: E402
+
+motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The app, started once for the session and logged in as the default admin.
+
+    Shutdown stops the app's thread pools, so it can't be restarted per test.
+    """
+    from fastapi.testclient import TestClient
+
+    import server
+
+    with TestClient(server.app) as test_client:
+        token = test_client.post(
+            "/api/auth/login", json={"username": "admin", "password": "Twoemweb@2020"}
+        ).json()["access_token"]
+        test_client.headers["Authorization"] = f"Bearer {token}"
+        yield test_client
@@ -0,0 +1,102 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from cache import PrincipalCache, TTLCache
+from coordination import InvalidationBus
+from revocations import TokenRevocations
+
+
+def test_principal_cache_matches_token_version():
+    cache = PrincipalCache(TTLCache(maxsize=10, ttl=60))
+    cache.set("jane", 1, "user")
+    assert cache.get("jane", 1) == "user"
+    # Tokens issued before or after the cached version miss
+    assert cache.get("jane", 0) is None
+    assert cache.get("jane", 2) is None
+
+    cache.invalidate("jane")
+    assert cache.get("jane", 1) is None
+
+
+def test_principal_invalidation_reaches_other_workers():
+    async def scenario():
+        collection = AsyncMongoMockClient()["auth_tests"]["cache_invalidations"]
+        cache = PrincipalCache(TTLCache(maxsize=10, ttl=60))
+        bus = InvalidationBus(collection)
+        bus.subscribe("principal", cache.invalidate)
+        await bus.refresh()
+
+        cache.set("jane", 0, "user")
+        cache.set("john", 0, "user")
+        await collection.insert_one({
+            "channel": "principal", "key": "jane", "origin": "other-worker", "created_at": datetime.utcnow()
+        })
+        await bus.refresh()
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.get("jane", 0) is None
+    assert cache.get("john", 0) == "user"
+
+
+def test_revocations_are_shared_between_workers():
+    async def scenario():
+        collection = AsyncMongoMockClient()["auth_tests"]["token_revocations"]
+        first = TokenRevocations(collection)
+        await first.refresh()
+        await first.revoke("jane", 2)
+        # A version lower than the current minimum never un-revokes tokens
+        await first.revoke("jane", 1)
+
+        # A worker that starts later loads every revocation
+        second = TokenRevocations(collection)
+        await second.refresh()
+        before = second.min_version("jane")
+
+        await first.revoke("jane", 3)
+        await second.refresh()
+        return first, second, before
+
+    first, second, before = asyncio.run(scenario())
+    assert first.is_revoked("jane", 1) and first.is_revoked("jane", 2)
+    assert not first.is_revoked("jane", 3)
+    assert before == 2
+    assert second.is_revoked("jane", 2)
+    assert not second.is_revoked("jane", 3)
+    assert not second.is_revoked("john", 0)
+
+
+def create_student(client):
+    username = f"session-{uuid.uuid4().hex[:8]}"
+    client.post("/api/admin/students", json={
+        "username": username, "password": "password", "full_name": username, "id_number": username
+    })
+    token = client.post("/api/auth/login", json={"username": username, "password": "password"}).json()["access_token"]
+    return username, {"Authorization": f"Bearer {token}"}
+
+
+def test_password_change_revokes_older_tokens(client):
+    username, headers = create_student(client)
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    response = client.post("/api/auth/change-password", json={"new_password": "changed"}, headers=headers).json()
+    new_headers = {"Authorization": f"Bearer {response['access_token']}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    assert client.get("/api/auth/me", headers=new_headers).json()["username"] == username
+
+
+def test_token_version_is_checked_without_the_revocation_map(client):
+    username, headers = create_student(client)
+    client.get("/api/auth/me", headers=headers)
+    response = client.post("/api/auth/change-password", json={"new_password": "changed"}, headers=headers).json()
+
+    # As in a worker that has not seen the revocation yet: the cached user is
+    # keyed by the old version, and the database lookup rejects it
+    server.token_revocations.min_versions.pop(username)
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    new_headers = {"Authorization": f"Bearer {response['access_token']}"}
+    assert client.get("/api/auth/me", headers=new_headers).status_code == 200
@@ -0,0 +1,116 @@
+import asyncio
+import hashlib
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import blobstore
+from blobstore import BlobNotFound, GridFSBlobStore, LocalBlobStore
+
+CONTENT = b"certificate " * 1000
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+# LocalBlobStore
+
+def test_local_put_is_content_addressed(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    blob = asyncio.run(store.put(CONTENT))
+    assert (blob.sha256, blob.size) == (SHA256, len(CONTENT))
+    assert asyncio.run(store.get(SHA256)) == CONTENT
+
+
+def test_local_duplicate_is_stored_once(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    first = asyncio.run(store.put(CONTENT))
+    second = asyncio.run(store.put(CONTENT))
+    assert first == second
+    assert [path for path in tmp_path.rglob("*") if path.is_file()] == [store.path_for(SHA256)]
+
+
+def test_local_abort_discards_upload(tmp_path):
+    async def upload():
+        writer = await store.writer()
+        await writer.write(CONTENT)
+        await writer.abort()
+
+    store = LocalBlobStore(tmp_path)
+    asyncio.run(upload())
+    assert not any(path.is_file() for path in tmp_path.rglob("*"))
+    assert not asyncio.run(store.exists(SHA256))
+    with pytest.raises(BlobNotFound):
+        asyncio.run(store.get(SHA256))
+
+
+# GridFSBlobStore, against an in-memory bucket (mongomock has no GridFS)
+
+class FakeGridIn:
+    def __init__(self, bucket, file_id, filename):
+        self.bucket = bucket
+        self.file_id = file_id
+        self.filename = filename
+        self.chunks = []
+
+    async def write(self, chunk: bytes):
+        if self.bucket.fail_writes:
+            raise ConnectionError("connection reset")
+        self.chunks.append(chunk)
+
+    async def close(self):
+        # Like GridIn, the file document is only written on close
+        data = b"".join(self.chunks)
+        self.bucket.contents[self.file_id] = data
+        await self.bucket.files.insert_one({"_id": self.file_id, "filename": self.filename, "length": len(data)})
+
+    async def abort(self):
+        self.bucket.aborted.append(self.file_id)
+
+
+class FakeBucket:
+    def __init__(self, db, bucket_name: str):
+        self.files = db[f"{bucket_name}.files"]
+        self.contents = {}
+        self.aborted = []
+        self.fail_writes = False
+
+    def open_upload_stream_with_id(self, file_id, filename):
+        return FakeGridIn(self, file_id, filename)
+
+    async def rename(self, file_id, new_filename):
+        await self.files.update_one({"_id": file_id}, {"$set": {"filename": new_filename}})
+
+    async def delete(self, file_id):
+        del self.contents[file_id]
+        await self.files.delete_one({"_id": file_id})
+
+
+@pytest.fixture
+def gridfs_store(monkeypatch):
+    monkeypatch.setattr(blobstore, "AsyncIOMotorGridFSBucket", FakeBucket)
+    return GridFSBlobStore(AsyncMongoMockClient()["blobstore_tests"])
+
+
+def stored_files(store):
+    return asyncio.run(store.files.find({}, {"_id": 0, "filename": 1}).to_list(None))
+
+
+def test_gridfs_commit_renames_to_hash(gridfs_store):
+    blob = asyncio.run(gridfs_store.put(CONTENT))
+    assert (blob.sha256, blob.size) == (SHA256, len(CONTENT))
+    assert stored_files(gridfs_store) == [{"filename": SHA256}]
+    assert asyncio.run(gridfs_store.exists(SHA256))
+
+
+def test_gridfs_duplicate_is_deleted_on_commit(gridfs_store):
+    asyncio.run(gridfs_store.put(CONTENT))
+    asyncio.run(gridfs_store.put(CONTENT))
+    assert stored_files(gridfs_store) == [{"filename": SHA256}]
+    assert list(gridfs_store.bucket.contents.values()) == [CONTENT]
+
+
+def test_gridfs_failed_write_aborts(gridfs_store):
+    gridfs_store.bucket.fail_writes = True
+    with pytest.raises(ConnectionError):
+        asyncio.run(gridfs_store.put(CONTENT))
+    assert len(gridfs_store.bucket.aborted) == 1
+    assert stored_files(gridfs_store) == []
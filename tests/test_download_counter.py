@@ -0,0 +1,111 @@
+import asyncio
+from collections import Counter
+
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from counters import DownloadCounter
+
+
+class FakeCollection:
+    """Applies $inc updates to a Counter; failures are scripted per call."""
+
+    def __init__(self, name: str, key_fields):
+        self.name = name
+        self.key_fields = key_fields
+        self.totals = Counter()
+        self.failures = []
+        self.release: asyncio.Event = None
+
+    async def bulk_write(self, operations, ordered=True):
+        if self.release:
+            await self.release.wait()
+        failure = self.failures.pop(0) if self.failures else None
+        if failure == "network":
+            raise AutoReconnect("connection reset")
+        write_errors = []
+        for index, operation in enumerate(operations):
+            if failure and index in failure:
+                write_errors.append({"index": index, "code": 2, "errmsg": "failed"})
+                continue
+            key = tuple(operation._filter[field] for field in self.key_fields)
+            self.totals[key] += sum(operation._doc["$inc"].values())
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors, "nMatched": len(operations) - len(write_errors)})
+
+
+def make_counter():
+    downloads = FakeCollection("downloads", ["id"])
+    download_stats = FakeCollection("download_stats", ["download_id"])
+    return DownloadCounter(downloads, download_stats), downloads, download_stats
+
+
+def test_increments_are_coalesced():
+    counter, downloads, download_stats = make_counter()
+    for download_id in ["a", "a", "b"]:
+        counter.increment(download_id)
+    asyncio.run(counter.flush())
+    assert downloads.totals == {("a",): 2, ("b",): 1}
+    assert download_stats.totals == {("a",): 2, ("b",): 1}
+    assert counter.stats()["pending_increments"] == 0
+    assert counter.stats()["flushed_increments"] == 3
+
+
+def test_failed_flush_is_retried():
+    counter, downloads, download_stats = make_counter()
+    downloads.failures = ["network"]
+    counter.increment("a")
+    asyncio.run(counter.flush())
+    assert downloads.totals == {}
+    assert counter.stats()["pending_increments"] == 1
+
+    asyncio.run(counter.flush())
+    assert downloads.totals == {("a",): 1}
+    assert download_stats.totals == {("a",): 1}
+
+
+def test_partial_failure_retries_only_failed_updates():
+    counter, downloads, download_stats = make_counter()
+    downloads.failures = [{1}]
+    for download_id in ["a", "b", "b", "c"]:
+        counter.increment(download_id)
+    asyncio.run(counter.flush())
+    assert downloads.totals == {("a",): 1, ("c",): 1}
+    # The series of a file whose count failed is kept back with it
+    assert download_stats.totals == {("a",): 1, ("c",): 1}
+    assert counter.pending == {"b": 2}
+
+    asyncio.run(counter.flush())
+    assert downloads.totals == {("a",): 1, ("b",): 2, ("c",): 1}
+    assert download_stats.totals == {("a",): 1, ("b",): 2, ("c",): 1}
+
+
+def test_failed_series_is_retried_without_recounting():
+    counter, downloads, download_stats = make_counter()
+    download_stats.failures = ["network"]
+    counter.increment("a")
+    asyncio.run(counter.flush())
+    asyncio.run(counter.flush())
+    assert downloads.totals == {("a",): 1}
+    assert download_stats.totals == {("a",): 1}
+
+
+def test_stop_keeps_a_flush_in_progress():
+    async def scenario():
+        counter, downloads, download_stats = make_counter()
+        counter.flush_interval = 0
+        downloads.release = asyncio.Event()
+        counter.increment("a")
+        counter.start()
+        # Wait until the loop is blocked writing the batch, then stop
+        while counter.flushing is None:
+            await asyncio.sleep(0)
+        counter.increment("a")
+        stopping = asyncio.create_task(counter.stop())
+        await asyncio.sleep(0)
+        downloads.release.set()
+        await stopping
+        return downloads, download_stats
+
+    downloads, download_stats = asyncio.run(scenario())
+    assert downloads.totals == {("a",): 2}
+    assert download_stats.totals == {("a",): 2}
@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from blobstore import LocalBlobStore
+from file_responses import blob_response, http_date, if_range_matches, is_not_modified, parse_range
+
+SIZE = 1000
+ETAG = '"abc123"'
+LAST_MODIFIED = datetime(2024, 5, 1, 12, 30, 15, 250000)
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+# parse_range
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 100)),
+    ("bytes=100-", (100, SIZE)),           # open-ended
+    ("bytes=-100", (SIZE - 100, SIZE)),    # suffix
+    ("bytes=-5000", (0, SIZE)),            # suffix longer than the file
+    ("bytes=900-5000", (900, SIZE)),       # end clamped to the file
+    ("bytes=999-999", (999, SIZE)),
+])
+def test_parse_range_satisfiable(header, expected):
+    assert parse_range(header, SIZE) == expected
+
+
+@pytest.mark.parametrize("header", [
+    "bytes=0-99,200-299",  # multiple ranges are served as a full response
+    "items=0-99",
+    "bytes=abc-",
+    "bytes=50-10",
+    "bytes=-0",
+    "bytes=-",
+    "bytes=100",
+])
+def test_parse_range_ignored(header):
+    assert parse_range(header, SIZE) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=5000-6000"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(HTTPException) as error:
+        parse_range(header, SIZE)
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == f"bytes */{SIZE}"
+
+
+# if_range_matches
+
+def test_if_range_absent_matches():
+    assert if_range_matches(make_request(), ETAG, LAST_MODIFIED)
+
+
+def test_if_range_etag():
+    assert if_range_matches(make_request(if_range=ETAG), ETAG, LAST_MODIFIED)
+    assert not if_range_matches(make_request(if_range='"stale"'), ETAG, LAST_MODIFIED)
+    # Weak validators never match If-Range
+    assert not if_range_matches(make_request(if_range=f"W/{ETAG}"), ETAG, LAST_MODIFIED)
+
+
+def test_if_range_date():
+    assert if_range_matches(make_request(if_range=http_date(LAST_MODIFIED)), ETAG, LAST_MODIFIED)
+    stale = http_date(LAST_MODIFIED - timedelta(days=1))
+    assert not if_range_matches(make_request(if_range=stale), ETAG, LAST_MODIFIED)
+    assert not if_range_matches(make_request(if_range=stale), ETAG, None)
+
+
+# is_not_modified
+
+def test_not_modified_by_etag():
+    assert is_not_modified(make_request(if_none_match=ETAG), ETAG, LAST_MODIFIED)
+    assert is_not_modified(make_request(if_none_match=f'"other", W/{ETAG}'), ETAG, LAST_MODIFIED)
+    assert is_not_modified(make_request(if_none_match="*"), ETAG, LAST_MODIFIED)
+    assert not is_not_modified(make_request(if_none_match='"other"'), ETAG, LAST_MODIFIED)
+
+
+def test_if_none_match_takes_precedence_over_date():
+    request = make_request(if_none_match='"other"', if_modified_since=http_date(LAST_MODIFIED))
+    assert not is_not_modified(request, ETAG, LAST_MODIFIED)
+
+
+def test_not_modified_by_date():
+    # Sub-second precision is dropped, as in the Last-Modified header
+    assert is_not_modified(make_request(if_modified_since=http_date(LAST_MODIFIED)), ETAG, LAST_MODIFIED)
+    earlier = http_date(LAST_MODIFIED - timedelta(seconds=1))
+    assert not is_not_modified(make_request(if_modified_since=earlier), ETAG, LAST_MODIFIED)
+    assert not is_not_modified(make_request(if_modified_since="not a date"), ETAG, LAST_MODIFIED)
+    assert not is_not_modified(make_request(), ETAG, LAST_MODIFIED)
+
+
+# blob_response
+
+CONTENT = bytes(range(256)) * 4
+# Blobs are content-addressed, so the ETag is the quoted SHA-256
+CONTENT_ETAG = f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+
+
+@pytest.fixture
+def client(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    blob = asyncio.run(store.put(CONTENT))
+    app = FastAPI()
+
+    @app.get("/file")
+    async def download(request: Request):
+        return await blob_response(
+            request, store, blob.sha256, filename="file.bin",
+            media_type="application/octet-stream", last_modified=LAST_MODIFIED
+        )
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_full_download(client):
+    response = client.get("/file")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == CONTENT_ETAG
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["last-modified"] == http_date(LAST_MODIFIED)
+
+
+def test_partial_download(client):
+    response = client.get("/file", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+    assert response.headers["content-length"] == "10"
+
+
+def test_suffix_download(client):
+    response = client.get("/file", headers={"Range": "bytes=-24"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[-24:]
+
+
+def test_multi_range_is_served_in_full(client):
+    response = client.get("/file", headers={"Range": "bytes=0-1,5-6"})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_unsatisfiable_range(client):
+    response = client.get("/file", headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_stale_if_range_sends_whole_file(client):
+    response = client.get("/file", headers={"Range": "bytes=10-19", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_matching_if_range_resumes(client):
+    response = client.get("/file", headers={"Range": "bytes=10-19", "If-Range": CONTENT_ETAG})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+
+
+def test_revalidation(client):
+    response = client.get("/file", headers={"If-None-Match": CONTENT_ETAG})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == CONTENT_ETAG
+
+    response = client.get("/file", headers={"If-Modified-Since": http_date(LAST_MODIFIED)})
+    assert response.status_code == 304
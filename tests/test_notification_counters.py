@@ -0,0 +1,149 @@
+import uuid
+
+import pytest
+
+import server
+from migrations import rebuild_notification_counters
+
+
+@pytest.fixture(autouse=True)
+def empty_notifications(client):
+    for collection in ("notifications", "notification_reads", "notification_counters"):
+        client.portal.call(server.db[collection].delete_many, {})
+
+
+def create_student(client):
+    username = f"student-{uuid.uuid4().hex[:8]}"
+    student = client.post("/api/admin/students", json={
+        "username": username, "password": "password", "full_name": username, "id_number": username
+    }).json()
+    token = client.post("/api/auth/login", json={"username": username, "password": "password"}).json()["access_token"]
+    return student["id"], {"Authorization": f"Bearer {token}"}
+
+
+def notify(client, title, student_ids=()):
+    data = {"title": title, "content": "content"}
+    if student_ids:
+        data.update(target_audience="specific", target_student_ids=",".join(student_ids))
+    return client.post("/api/admin/notifications", data=data).json()["id"]
+
+
+def unread_count(client, headers):
+    return client.get("/api/student/notifications/unread-count", headers=headers).json()["unread_count"]
+
+
+def counters(client):
+    cursor = server.db.notification_counters.find({}, {"_id": 1, "count": 1, "targeted": 1, "read": 1})
+    docs = client.portal.call(cursor.to_list, None)
+    # Missing fields, zero counters and all-zero documents are equivalent
+    nonzero = {
+        doc["_id"]: {field: value for field, value in doc.items() if field != "_id" and value}
+        for doc in docs
+    }
+    return {counter_id: values for counter_id, values in nonzero.items() if values}
+
+
+def assert_counters_consistent(client):
+    maintained = counters(client)
+    client.portal.call(rebuild_notification_counters, server.db)
+    assert maintained == counters(client)
+
+
+def test_delete_read_notification(client):
+    student_id, headers = create_student(client)
+    everyone = notify(client, "everyone")
+    targeted = notify(client, "targeted", [student_id])
+    assert unread_count(client, headers) == 2
+
+    client.post(f"/api/student/notifications/{everyone}/read", headers=headers)
+    assert unread_count(client, headers) == 1
+
+    # Deleting a notification the student has read must not make another unread
+    client.delete(f"/api/admin/notifications/{everyone}")
+    assert unread_count(client, headers) == 1
+    assert_counters_consistent(client)
+
+    client.delete(f"/api/admin/notifications/{targeted}")
+    assert unread_count(client, headers) == 0
+    assert_counters_consistent(client)
+
+
+def test_delete_twice_counts_once(client):
+    student_id, headers = create_student(client)
+    notify(client, "kept")
+    deleted = notify(client, "deleted", [student_id])
+    client.delete(f"/api/admin/notifications/{deleted}")
+    client.delete(f"/api/admin/notifications/{deleted}")
+    assert unread_count(client, headers) == 1
+    assert_counters_consistent(client)
+
+
+def test_read_all(client):
+    student_id, headers = create_student(client)
+    other_id, other_headers = create_student(client)
+    first = notify(client, "first")
+    notify(client, "second")
+    notify(client, "targeted", [student_id])
+    notify(client, "someone else", [other_id])
+
+    client.post(f"/api/student/notifications/{first}/read", headers=headers)
+    response = client.post("/api/student/notifications/read-all", headers=headers).json()
+    assert response == {"marked": 2, "unread_count": 0}
+    assert unread_count(client, other_headers) == 3
+
+    response = client.post("/api/student/notifications/read-all", headers=headers).json()
+    assert response == {"marked": 0, "unread_count": 0}
+    assert_counters_consistent(client)
+
+
+def test_concurrent_reads_are_counted_once(client):
+    student_id, headers = create_student(client)
+    ids = [notify(client, f"notification {index}") for index in range(3)]
+
+    # Receipts already written (e.g. by a concurrent request) are skipped
+    assert client.portal.call(server.record_notification_reads, student_id, ids[:2]) == 2
+    assert client.portal.call(server.record_notification_reads, student_id, ids) == 1
+    assert unread_count(client, headers) == 0
+    assert_counters_consistent(client)
+
+
+def test_read_racing_a_delete_is_not_counted(client):
+    student_id, headers = create_student(client)
+    notify(client, "kept")
+    deleted = notify(client, "deleted")
+
+    # The read checked the notification just before it was deleted
+    client.delete(f"/api/admin/notifications/{deleted}")
+    assert client.portal.call(server.record_notification_reads, student_id, [deleted]) == 0
+    assert unread_count(client, headers) == 1
+    assert_counters_consistent(client)
+
+
+def test_receipt_recorded_during_a_delete_is_uncounted_once(client):
+    student_id, headers = create_student(client)
+    notify(client, "kept")
+    deleted = notify(client, "deleted")
+
+    # The deletion ran between the receipt insert and the read's own re-check,
+    # so both find the receipt of an inactive notification
+    client.post(f"/api/student/notifications/{deleted}/read", headers=headers)
+    client.delete(f"/api/admin/notifications/{deleted}")
+    assert client.portal.call(server.retire_inactive_reads, student_id, [deleted]) == [deleted]
+    assert unread_count(client, headers) == 1
+    assert_counters_consistent(client)
+
+
+def test_delete_student_removes_them_from_recipients(client):
+    student_id, headers = create_student(client)
+    other_id, other_headers = create_student(client)
+    targeted = notify(client, "targeted", [student_id, other_id])
+    client.post(f"/api/student/notifications/{targeted}/read", headers=headers)
+
+    client.delete(f"/api/admin/students/{student_id}")
+    notification = client.portal.call(server.db.notifications.find_one, {"id": targeted})
+    assert notification["recipients"] == [other_id]
+    assert_counters_consistent(client)
+
+    client.delete(f"/api/admin/notifications/{targeted}")
+    assert unread_count(client, other_headers) == 0
+    assert_counters_consistent(client)
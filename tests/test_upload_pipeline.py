@@ -0,0 +1,88 @@
+import hashlib
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from blobstore import LocalBlobStore
+from upload_pipeline import MULTIPART_OVERHEAD, UploadSizeLimitMiddleware, store_upload
+
+MAX_BYTES = 1000
+PDF = b"%PDF-1.4\n" + b"x" * 500
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalBlobStore(tmp_path)
+
+
+@pytest.fixture
+def client(store):
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        app.state.calls += 1
+        blob = await store_upload(store, file, MAX_BYTES, require_pdf=True)
+        return blob.model_dump()
+
+    app.add_middleware(UploadSizeLimitMiddleware, limits=[("POST", "/upload", MAX_BYTES)])
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def stored_files(store):
+    return [path for path in store.root.rglob("*") if path.is_file()]
+
+
+def upload(client, content: bytes, filename: str = "certificate.pdf"):
+    return client.post("/upload", files={"file": (filename, content, "application/pdf")})
+
+
+def test_pdf_is_stored(client, store):
+    response = upload(client, PDF)
+    assert response.status_code == 200
+    assert response.json() == {"sha256": hashlib.sha256(PDF).hexdigest(), "size": len(PDF)}
+    assert stored_files(store) == [store.path_for(hashlib.sha256(PDF).hexdigest())]
+
+
+def test_oversize_request_is_rejected_before_the_body_is_read(client, store):
+    response = upload(client, PDF + b"x" * (MAX_BYTES + MULTIPART_OVERHEAD))
+    assert response.status_code == 413
+    assert response.json()["detail"].startswith("File is too large")
+    assert client.app.state.calls == 0
+    assert stored_files(store) == []
+
+
+def test_oversize_file_within_the_multipart_allowance_is_rejected(client, store):
+    # Passes the Content-Length check; store_upload enforces the exact limit
+    response = upload(client, PDF + b"x" * MAX_BYTES)
+    assert response.status_code == 413
+    assert client.app.state.calls == 1
+    assert stored_files(store) == []
+
+
+def test_file_at_the_limit_is_accepted(client):
+    response = upload(client, PDF + b"x" * (MAX_BYTES - len(PDF)))
+    assert response.status_code == 200
+    assert response.json()["size"] == MAX_BYTES
+
+
+@pytest.mark.parametrize("content, filename, detail", [
+    (PDF, "certificate.docx", "Only PDF files are allowed"),
+    (b"PK\x03\x04" + b"x" * 100, "certificate.pdf", "File is not a valid PDF document"),
+    (b"", "certificate.pdf", "Uploaded file is empty"),
+])
+def test_invalid_upload_is_rejected(client, store, content, filename, detail):
+    response = upload(client, content, filename)
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
+    assert stored_files(store) == []
+
+
+def test_other_routes_are_not_limited():
+    middleware = UploadSizeLimitMiddleware(None, limits=[("POST", "/upload", MAX_BYTES)])
+    assert middleware.limit_for("POST", "/upload") == MAX_BYTES
+    assert middleware.limit_for("PUT", "/upload") is None
+    assert middleware.limit_for("POST", "/upload/extra") is None